@@ -29,6 +29,8 @@ __email__ = 'joel@carrickbender.com'
 from . import comm
 from . import task
 from . import singleton
+from . import loopstats
+from . import worker
 
 #
 #   Link Layer Modules
@@ -100,6 +100,11 @@ def decode_max_apdu_length_accepted(arg):
 @bacpypes_debugging
 class APCI(PCI, DebugContents):
 
+    __slots__ = ('apduType', 'apduSeg', 'apduMor', 'apduSA', 'apduSrv'
+        , 'apduNak', 'apduSeq', 'apduWin', 'apduMaxSegs', 'apduMaxResp'
+        , 'apduService', 'apduInvokeID', 'apduAbortRejectReason'
+        )
+
     _debug_contents = ('apduType', 'apduSeg', 'apduMor', 'apduSA', 'apduSrv'
         , 'apduNak', 'apduSeq', 'apduWin', 'apduMaxSegs', 'apduMaxResp'
         , 'apduService', 'apduInvokeID', 'apduAbortRejectReason'
@@ -351,6 +356,8 @@ class APCI(PCI, DebugContents):
 
 class APDU(APCI, PDUData):
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         if _debug: APDU._debug("__init__ %r %r", args, kwargs)
         super(APDU, self).__init__(*args, **kwargs)
@@ -395,9 +402,11 @@ class APDU(APCI, PDUData):
 
 class _APDU(APDU):
 
+    __slots__ = ()
+
     def encode(self, pdu):
         APCI.update(pdu, self)
-        pdu.put_data(self.pduData)
+        pdu.share_data(self.pduData)
 
     def decode(self, pdu):
         APCI.update(self, pdu)
@@ -431,6 +440,7 @@ class _APDU(APDU):
 
 @bacpypes_debugging
 class ConfirmedRequestPDU(_APDU):
+    __slots__ = ()
     pduType = 0
 
     def __init__(self, choice=None, *args, **kwargs):
@@ -449,6 +459,7 @@ register_apdu_type(ConfirmedRequestPDU)
 
 @bacpypes_debugging
 class UnconfirmedRequestPDU(_APDU):
+    __slots__ = ()
     pduType = 1
 
     def __init__(self, choice=None, *args, **kwargs):
@@ -466,6 +477,7 @@ register_apdu_type(UnconfirmedRequestPDU)
 
 @bacpypes_debugging
 class SimpleAckPDU(_APDU):
+    __slots__ = ()
     pduType = 2
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -489,6 +501,7 @@ register_apdu_type(SimpleAckPDU)
 
 @bacpypes_debugging
 class ComplexAckPDU(_APDU):
+    __slots__ = ()
     pduType = 3
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -512,6 +525,7 @@ register_apdu_type(ComplexAckPDU)
 
 @bacpypes_debugging
 class SegmentAckPDU(_APDU):
+    __slots__ = ()
     pduType = 4
 
     def __init__(self, nak=None, srv=None, invokeID=None, sequenceNumber=None, windowSize=None, *args, **kwargs):
@@ -533,6 +547,7 @@ register_apdu_type(SegmentAckPDU)
 
 @bacpypes_debugging
 class ErrorPDU(_APDU):
+    __slots__ = ()
     pduType = 5
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -573,6 +588,7 @@ expand_enumerations(RejectReason)
 
 @bacpypes_debugging
 class RejectPDU(_APDU):
+    __slots__ = ()
     pduType = 6
 
     def __init__(self, invokeID=None, reason=None, context=None, *args, **kwargs):
@@ -619,6 +635,7 @@ expand_enumerations(AbortReason)
 
 @bacpypes_debugging
 class AbortPDU(_APDU):
+    __slots__ = ()
     pduType = 7
 
     def __init__(self, srv=None, invokeID=None, reason=None, context=None, *args, **kwargs):
@@ -661,12 +678,90 @@ class APCISequence(APCI, Sequence):
         # start with an empty tag list
         self._tag_list = None
 
+        # the encoded service parameters, if they are already known
+        self._service_data = None
+
+        # true when the parameters have not been decoded yet
+        self._service_pending = False
+
+    def __getattr__(self, attr):
+        # only called for missing attributes, the elements of a sequence
+        # that was decoded lazily are missing until it is decoded
+        if (attr[0] != '_') and self.__dict__.get('_service_pending'):
+            self.decode_service_data()
+            return getattr(self, attr)
+
+        raise AttributeError("%r object has no attribute %r" % (self.__class__.__name__, attr))
+
+    def __setattr__(self, attr, value):
+        # the encoded parameters no longer match when an element is changed,
+        # so decode the rest of them first and encode them all from now on
+        if (attr[0] != '_') and (self.__dict__.get('_service_data') is not None):
+            for element in self.sequenceElements:
+                if element.name == attr:
+                    self.decode_service_data()
+                    self._service_data = None
+                    break
+
+        super(APCISequence, self).__setattr__(attr, value)
+
+    def set_service_data(self, data):
+        """Use the octets as the encoded service parameters rather than
+        encoding the sequence elements, they must match.  Changing one of
+        the elements afterwards drops them."""
+        if _debug: APCISequence._debug("set_service_data %r", data)
+
+        self._service_data = data
+
+    def get_service_data(self):
+        """Return the encoded service parameters.  When the sequence was
+        decoded lazily and none of the elements have been read these are
+        the octets from the APDU, otherwise the elements are encoded."""
+        if _debug: APCISequence._debug("get_service_data")
+
+        if self._service_data is not None:
+            return self._service_data
+
+        tag_list = TagList()
+        Sequence.encode(self, tag_list)
+
+        pdu = PDUData()
+        tag_list.encode(pdu)
+
+        return bytes(pdu.pduData)
+
+    def decode_service_data(self):
+        """Decode the service parameters that were kept by a lazy decode,
+        this is called when one of the elements is first read."""
+        if not self._service_pending:
+            return
+        if _debug: APCISequence._debug("decode_service_data")
+
+        # the elements are set as they are decoded
+        self._service_pending = False
+        try:
+            self.decode_parameters(PDUData(self._service_data))
+        except:
+            # still not decoded, the next read will fail the same way
+            self._service_pending = True
+            for element in self.sequenceElements:
+                self.__dict__.pop(element.name, None)
+            raise
+
+        # changes to the elements are encoded from now on
+        self._service_data = None
+
     def encode(self, apdu):
         if _debug: APCISequence._debug("encode %r", apdu)
 
         # copy the header fields
         apdu.update(self)
 
+        # the parameters have already been encoded
+        if self._service_data is not None:
+            apdu.put_data(self._service_data)
+            return
+
         # create a tag list
         self._tag_list = TagList()
         Sequence.encode(self, self._tag_list)
@@ -674,12 +769,28 @@ class APCISequence(APCI, Sequence):
         # encode the tag list
         self._tag_list.encode(apdu)
 
-    def decode(self, apdu):
-        if _debug: APCISequence._debug("decode %r", apdu)
+    def decode(self, apdu, lazy=False):
+        if _debug: APCISequence._debug("decode %r lazy=%r", apdu, lazy)
 
         # copy the header fields
         self.update(apdu)
 
+        # keep the rest of the data until one of the elements is read
+        if lazy:
+            self._service_data = bytes(apdu.pduData)
+            self._service_pending = True
+            apdu.pduData = bytearray()
+
+            # the elements were set to None by the constructor
+            for element in self.sequenceElements:
+                self.__dict__.pop(element.name, None)
+            return
+
+        self.decode_parameters(apdu)
+
+    def decode_parameters(self, apdu):
+        if _debug: APCISequence._debug("decode_parameters %r", apdu)
+
         # create a tag list and decode the rest of the data
         self._tag_list = TagList()
         self._tag_list.decode(apdu)
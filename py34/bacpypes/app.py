@@ -6,6 +6,8 @@ Application Module
 
 from .debugging import bacpypes_debugging, DebugContents, ModuleLogger
 from .comm import ApplicationServiceElement, bind
+from .core import call_soon_threadsafe
+from .worker import is_blocking, in_worker_thread
 
 from .pdu import Address, LocalStation, RemoteStation
 
@@ -16,14 +18,15 @@ from .appservice import StateMachineAccessPoint, ApplicationServiceAccessPoint
 from .netservice import NetworkServiceAccessPoint, NetworkServiceElement
 from .bvllservice import BIPSimple, BIPForeign, AnnexJCodec, UDPMultiplexer
 
-from .object import Property, PropertyError, DeviceObject, \
+from .object import Object, Property, PropertyError, DeviceObject, \
     registered_object_types, register_object_type
-from .apdu import ConfirmedRequestPDU, SimpleAckPDU, RejectPDU, RejectReason
-from .apdu import IAmRequest, ReadPropertyACK, Error
+from .apdu import APDU, ConfirmedRequestPDU, SimpleAckPDU, RejectPDU, \
+    RejectReason, AbortPDU
+from .apdu import IAmRequest, ReadPropertyACK, WritePropertyRequest, Error
 from .errors import ExecutionError, \
     RejectException, UnrecognizedService, MissingRequiredParameter, \
         ParameterOutOfRange, \
-    AbortException
+    AbortException, OutOfResources
 
 # for computing protocol services supported
 from .apdu import confirmed_request_types, unconfirmed_request_types, \
@@ -48,6 +51,17 @@ _log = ModuleLogger(globals())
 @bacpypes_debugging
 class DeviceInfo(DebugContents):
 
+    __slots__ = (
+        'deviceIdentifier',
+        'address',
+        'maxApduLengthAccepted',
+        'segmentationSupported',
+        'vendorID',
+        'maxNpduLength',
+        'maxSegmentsAccepted',
+        '_cache_keys',
+        )
+
     _debug_contents = (
         'deviceIdentifier',
         'address',
@@ -302,6 +316,18 @@ class LocalDeviceObject(DeviceObject):
 @bacpypes_debugging
 class Application(ApplicationServiceElement):
 
+    # the values of these properties are not expected to change, so the
+    # ReadProperty responses for them are encoded once and kept until the
+    # property is written or the object is added or deleted
+    cachedProperties = set([
+        'objectIdentifier', 'objectName', 'objectType',
+        'vendorIdentifier', 'vendorName', 'modelName',
+        'firmwareRevision', 'applicationSoftwareVersion',
+        'protocolVersion', 'protocolRevision',
+        'protocolServicesSupported', 'protocolObjectTypesSupported',
+        'propertyList',
+        ])
+
     def __init__(self, localDevice, localAddress, deviceInfoCache=None, aseID=None):
         if _debug: Application._debug("__init__ %r %r deviceInfoCache=%r aseID=%r", localDevice, localAddress, deviceInfoCache, aseID)
         ApplicationServiceElement.__init__(self, aseID)
@@ -328,6 +354,16 @@ class Application(ApplicationServiceElement):
         self.objectName = {localDevice.objectName:localDevice}
         self.objectIdentifier = {localDevice.objectIdentifier:localDevice}
 
+        # a worker.WorkerPool for blocking helpers and properties
+        self.workerPool = None
+
+        # encoded responses by object, then by response class and parameters,
+        # only changed in the core thread
+        self.responseCache = {}
+
+        # counts the invalidations, responses read before one are not kept
+        self.responseGeneration = 0
+
     def add_object(self, obj):
         """Add an object to the local collection."""
         if _debug: Application._debug("add_object %r", obj)
@@ -360,6 +396,10 @@ class Application(ApplicationServiceElement):
         # let the object know which application stack it belongs to
         obj._app = self
 
+        # the object list has changed
+        self.invalidate_responses(self.localDevice)
+        self.invalidate_responses(obj)
+
     def delete_object(self, obj):
         """Add an object to the local collection."""
         if _debug: Application._debug("delete_object %r", obj)
@@ -379,6 +419,10 @@ class Application(ApplicationServiceElement):
         # make sure the object knows it's detached from an application
         obj._app = None
 
+        # the object list has changed and the object is gone
+        self.invalidate_responses(self.localDevice)
+        self.invalidate_responses(obj)
+
     def get_object_id(self, objid):
         """Return a local object or None."""
         return self.objectIdentifier.get(objid, None)
@@ -391,6 +435,84 @@ class Application(ApplicationServiceElement):
         """Iterate over the objects."""
         return iter(self.objectIdentifier.values())
 
+    def is_cacheable(self, obj, propertyIdentifier):
+        """Return true if the ReadProperty response for the property of the
+        object can be encoded once and kept."""
+        if propertyIdentifier not in self.cachedProperties:
+            return False
+
+        # values that are computed when they are read are not kept, by the
+        # property or by the object
+        if type(obj).ReadProperty is not Object.ReadProperty:
+            return False
+        prop = obj._properties.get(propertyIdentifier)
+        if not prop:
+            return False
+
+        return type(prop).ReadProperty is Property.ReadProperty
+
+    def get_cached_response(self, obj, key, **kwargs):
+        """Return a new response built from one that was encoded before, or
+        None.  The keyword arguments are passed to its constructor."""
+        entry = self.responseCache.get(obj, {}).get(key)
+        if not entry:
+            return None
+        if _debug: Application._debug("get_cached_response %r %r", obj, key)
+
+        klass, values, data = entry
+
+        # the service parameters are not encoded again
+        resp = klass(**kwargs)
+        for name, value in values:
+            setattr(resp, name, value)
+        resp.set_service_data(data)
+
+        return resp
+
+    def put_cached_response(self, obj, key, resp, generation=None):
+        """Encode the response and keep it to build the next one.  The
+        generation is the responseGeneration from before the values were
+        read, if the responses have been invalidated since then it is not
+        kept."""
+        if _debug: Application._debug("put_cached_response %r %r %r %r", obj, key, resp, generation)
+
+        xpdu = APDU()
+        resp.encode(xpdu)
+        data = bytes(xpdu.pduData)
+
+        values = [(element.name, getattr(resp, element.name))
+            for element in resp.sequenceElements]
+        entry = (resp.__class__, values, data)
+
+        # this one does not need to be encoded again either
+        resp.set_service_data(data)
+
+        # helpers running in a worker thread keep it in the core thread
+        if in_worker_thread():
+            call_soon_threadsafe(self.keep_cached_response, obj, key, entry, generation)
+        else:
+            self.keep_cached_response(obj, key, entry, generation)
+
+    def keep_cached_response(self, obj, key, entry, generation):
+        """Keep an encoded response, called in the core thread."""
+        if (generation is not None) and (generation != self.responseGeneration):
+            if _debug: Application._debug("keep_cached_response %r %r (out of date)", obj, key)
+            return
+
+        self.responseCache.setdefault(obj, {})[key] = entry
+
+    def invalidate_responses(self, obj):
+        """The properties of the object have changed, forget the responses
+        that were encoded from them."""
+        # writes running in a worker thread forget them in the core thread
+        if in_worker_thread():
+            call_soon_threadsafe(self.invalidate_responses, obj)
+            return
+
+        self.responseGeneration += 1
+        if self.responseCache.pop(obj, None) is not None:
+            if _debug: Application._debug("invalidate_responses %r", obj)
+
     def get_services_supported(self):
         """Return a ServicesSupported bit string based in introspection, look
         for helper methods that match confirmed and unconfirmed services."""
@@ -417,6 +539,55 @@ class Application(ApplicationServiceElement):
 
     #-----
 
+    def request(self, apdu):
+        if _debug: Application._debug("request %r", apdu)
+
+        # helpers running in a worker thread continue in the core thread
+        if in_worker_thread():
+            call_soon_threadsafe(ApplicationServiceElement.request, self, apdu)
+        else:
+            ApplicationServiceElement.request(self, apdu)
+
+    def response(self, apdu):
+        if _debug: Application._debug("response %r", apdu)
+
+        # helpers running in a worker thread continue in the core thread
+        if in_worker_thread():
+            call_soon_threadsafe(ApplicationServiceElement.response, self, apdu)
+        else:
+            ApplicationServiceElement.response(self, apdu)
+
+    def is_blocking(self, apdu, helperFn):
+        """Return true if the helper function, or the property that a
+        ReadProperty or WriteProperty request refers to, is blocking."""
+        if is_blocking(helperFn):
+            return True
+
+        # check the property
+        propertyIdentifier = getattr(apdu, 'propertyIdentifier', None)
+        if propertyIdentifier is None:
+            return False
+
+        objId = apdu.objectIdentifier
+        if (objId == ('device', 4194303)):
+            objId = self.localDevice.objectIdentifier
+
+        obj = self.get_object_id(objId)
+        if not obj:
+            return False
+
+        prop = obj._properties.get(propertyIdentifier)
+        if not prop:
+            return False
+
+        # writes read the property first to see if it exists
+        if is_blocking(prop.ReadProperty):
+            return True
+        if isinstance(apdu, WritePropertyRequest) and is_blocking(prop.WriteProperty):
+            return True
+
+        return False
+
     def indication(self, apdu):
         if _debug: Application._debug("indication %r", apdu)
 
@@ -431,6 +602,18 @@ class Application(ApplicationServiceElement):
                 raise UnrecognizedService("no function %s" % (helperName,))
             return
 
+        # pass slow ones to the worker pool
+        if self.workerPool and self.is_blocking(apdu, helperFn):
+            if _debug: Application._debug("    - blocking")
+
+            future = self.workerPool.submit(
+                lambda future: self.blocking_complete(apdu, future),
+                helperFn, apdu,
+                )
+            if not future:
+                raise OutOfResources("worker pool saturated")
+            return
+
         # pass the apdu on to the helper function
         try:
             helperFn(apdu)
@@ -456,6 +639,34 @@ class Application(ApplicationServiceElement):
                 resp = Error(errorClass='device', errorCode='operationalProblem', context=apdu)
                 self.response(resp)
 
+    def blocking_complete(self, apdu, future):
+        """A helper function running in the worker pool has finished, turn
+        any exception into a response like indication() does."""
+        if _debug: Application._debug("blocking_complete %r %r", apdu, future)
+
+        err = future.exception()
+        if not err:
+            return
+
+        if isinstance(err, RejectException):
+            if _debug: Application._debug("    - reject exception: %r", err)
+            resp = RejectPDU(reason=err.rejectReason)
+            resp.set_context(apdu)
+        elif isinstance(err, AbortException):
+            if _debug: Application._debug("    - abort exception: %r", err)
+            resp = AbortPDU(reason=err.abortReason)
+            resp.set_context(apdu)
+        elif isinstance(err, ExecutionError):
+            if _debug: Application._debug("    - execution error: %r", err)
+            resp = Error(errorClass=err.errorClass, errorCode=err.errorCode, context=apdu)
+        else:
+            Application._error("exception: %r", err, exc_info=err)
+            resp = Error(errorClass='device', errorCode='operationalProblem', context=apdu)
+
+        # send back the error
+        if isinstance(apdu, ConfirmedRequestPDU):
+            self.response(resp)
+
     def do_WhoIsRequest(self, apdu):
         """Respond to a Who-Is request."""
         if _debug: Application._debug("do_WhoIsRequest %r", apdu)
@@ -484,13 +695,19 @@ class Application(ApplicationServiceElement):
             if (self.localDevice.objectIdentifier[1] > high_limit):
                 return
 
+        # the I-Am is the same every time unless the device changes
+        generation = self.responseGeneration
+        iAm = self.get_cached_response(self.localDevice, (IAmRequest,))
+        if not iAm:
+            iAm = IAmRequest()
+            iAm.iAmDeviceIdentifier = self.localDevice.objectIdentifier
+            iAm.maxAPDULengthAccepted = self.localDevice.maxApduLengthAccepted
+            iAm.segmentationSupported = self.localDevice.segmentationSupported
+            iAm.vendorID = self.localDevice.vendorIdentifier
+            self.put_cached_response(self.localDevice, (IAmRequest,), iAm, generation)
+
         # create a I-Am "response" back to the source
-        iAm = IAmRequest()
         iAm.pduDestination = apdu.pduSource
-        iAm.iAmDeviceIdentifier = self.localDevice.objectIdentifier
-        iAm.maxAPDULengthAccepted = self.localDevice.maxApduLengthAccepted
-        iAm.segmentationSupported = self.localDevice.segmentationSupported
-        iAm.vendorID = self.localDevice.vendorIdentifier
         if _debug: Application._debug("    - iAm: %r", iAm)
 
         # away it goes
@@ -516,6 +733,16 @@ class Application(ApplicationServiceElement):
         obj = self.get_object_id(objId)
         if _debug: Application._debug("    - object: %r", obj)
 
+        # look for a response that was encoded before
+        cacheable = obj and self.is_cacheable(obj, apdu.propertyIdentifier)
+        if cacheable:
+            generation = self.responseGeneration
+            cache_key = (ReadPropertyACK, apdu.propertyIdentifier, apdu.propertyArrayIndex)
+            resp = self.get_cached_response(obj, cache_key, context=apdu)
+            if resp:
+                self.response(resp)
+                return
+
         if not obj:
             resp = Error(errorClass='object', errorCode='unknownObject', context=apdu)
         else:
@@ -556,6 +783,10 @@ class Application(ApplicationServiceElement):
                 resp.propertyValue = Any()
                 resp.propertyValue.cast_in(value)
 
+                # keep it for the next time
+                if cacheable:
+                    self.put_cached_response(obj, cache_key, resp, generation)
+
             except PropertyError:
                 resp = Error(errorClass='object', errorCode='unknownProperty', context=apdu)
         if _debug: Application._debug("    - resp: %r", resp)
@@ -1288,6 +1288,10 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
         ApplicationServiceElement.__init__(self, aseID)
         ServiceAccessPoint.__init__(self, sapID)
 
+        # decode the service parameters of requests and complex acks when
+        # they are first read rather than when they arrive
+        self.lazyDecoding = False
+
     def indication(self, apdu):
         if _debug: ApplicationServiceAccessPoint._debug("indication %r", apdu)
 
@@ -1302,7 +1306,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
 
             try:
                 xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu.decode(apdu, lazy=self.lazyDecoding)
             except RejectException as err:
                 ApplicationServiceAccessPoint._debug("    - decoding reject: %r", err)
                 error_found = err
@@ -1353,7 +1357,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
 
             try:
                 xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu.decode(apdu, lazy=self.lazyDecoding)
             except RejectException as err:
                 ApplicationServiceAccessPoint._debug("    - decoding reject: %r", err)
                 return
@@ -1379,7 +1383,6 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
             try:
                 xpdu = ConfirmedRequestPDU()
                 apdu.encode(xpdu)
-                apdu._xpdu = xpdu
             except Exception as err:
                 ApplicationServiceAccessPoint._exception("confirmed request encoding error: %r", err)
                 return
@@ -1388,7 +1391,6 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
             try:
                 xpdu = UnconfirmedRequestPDU()
                 apdu.encode(xpdu)
-                apdu._xpdu = xpdu
             except Exception as err:
                 ApplicationServiceAccessPoint._exception("unconfirmed request encoding error: %r", err)
                 return
@@ -1422,7 +1424,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
 
             try:
                 xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu.decode(apdu, lazy=self.lazyDecoding)
             except Exception as err:
                 ApplicationServiceAccessPoint._exception("unconfirmed request decoding error: %r", err)
                 return
@@ -7,7 +7,7 @@ BACnet Virtual Link Layer Module
 from .errors import EncodingError, DecodingError
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
 
-from .pdu import Address, PCI, PDUData, unpack_ip_addr
+from .pdu import Address, PCI, PDUData, intern_address, unpack_ip_addr
 
 # some debugging
 _debug = 0
@@ -26,6 +26,8 @@ def register_bvlpdu_type(klass):
 @bacpypes_debugging
 class BVLCI(PCI, DebugContents):
 
+    __slots__ = ('bvlciType', 'bvlciFunction', 'bvlciLength')
+
     _debug_contents = ('bvlciType', 'bvlciFunction', 'bvlciLength')
 
     result                              = 0x00
@@ -110,6 +112,8 @@ class BVLCI(PCI, DebugContents):
 @bacpypes_debugging
 class BVLPDU(BVLCI, PDUData):
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         if _debug: BVLPDU._debug("__init__ %r %r", args, kwargs)
         super(BVLPDU, self).__init__(*args, **kwargs)
@@ -331,6 +335,8 @@ register_bvlpdu_type(ReadBroadcastDistributionTableAck)
 
 class ForwardedNPDU(BVLPDU):
 
+    __slots__ = ('bvlciAddress',)
+
     _debug_contents = ('bvlciAddress',)
 
     messageType = BVLCI.forwardedNPDU
@@ -357,8 +363,8 @@ class ForwardedNPDU(BVLPDU):
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
 
-        # get the address
-        self.bvlciAddress = Address(unpack_ip_addr(bvlpdu.get_data(6)))
+        # get the address, shared with other packets from the same device
+        self.bvlciAddress = intern_address(unpack_ip_addr(bvlpdu.get_data(6)))
 
         # get the rest of the data
         self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
@@ -565,6 +571,8 @@ register_bvlpdu_type(DeleteForeignDeviceTableEntry)
 
 class DistributeBroadcastToNetwork(BVLPDU):
 
+    __slots__ = ()
+
     messageType = BVLCI.distributeBroadcastToNetwork
 
     def __init__(self, *args, **kwargs):
@@ -576,7 +584,7 @@ class DistributeBroadcastToNetwork(BVLPDU):
     def encode(self, bvlpdu):
         self.bvlciLength = 4 + len(self.pduData)
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.share_data( self.pduData )
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
@@ -608,6 +616,7 @@ register_bvlpdu_type(DistributeBroadcastToNetwork)
 #
 
 class OriginalUnicastNPDU(BVLPDU):
+    __slots__ = ()
     messageType = BVLCI.originalUnicastNPDU
 
     def __init__(self, *args, **kwargs):
@@ -619,7 +628,7 @@ class OriginalUnicastNPDU(BVLPDU):
     def encode(self, bvlpdu):
         self.bvlciLength = 4 + len(self.pduData)
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.share_data( self.pduData )
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
@@ -651,6 +660,7 @@ register_bvlpdu_type(OriginalUnicastNPDU)
 #
 
 class OriginalBroadcastNPDU(BVLPDU):
+    __slots__ = ()
     messageType = BVLCI.originalBroadcastNPDU
 
     def __init__(self, *args, **kwargs):
@@ -662,7 +672,7 @@ class OriginalBroadcastNPDU(BVLPDU):
     def encode(self, bvlpdu):
         self.bvlciLength = 4 + len(self.pduData)
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.share_data( self.pduData )
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
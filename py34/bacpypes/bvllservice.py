@@ -16,7 +16,7 @@ from .comm import Client, Server, bind, \
     ServiceAccessPoint, ApplicationServiceElement
 
 from .pdu import Address, LocalBroadcast, LocalStation, PDU, \
-    unpack_ip_addr
+    intern_address, unpack_ip_addr
 from .bvll import BVLPDU, DeleteForeignDeviceTableEntry, \
     DistributeBroadcastToNetwork, FDTEntry, ForwardedNPDU, \
     OriginalBroadcastNPDU, OriginalUnicastNPDU, \
@@ -115,7 +115,10 @@ class UDPMultiplexer:
         else:
             raise RuntimeError("invalid destination address type")
 
-        self.directPort.indication(PDU(pdu, destination=dest))
+        xpdu = PDU(destination=dest)
+        xpdu.share_data(pdu.pduData)
+
+        self.directPort.indication(xpdu)
 
     def confirmation(self, client, pdu):
         if _debug: UDPMultiplexer._debug("confirmation %r %r", client, pdu)
@@ -125,8 +128,8 @@ class UDPMultiplexer:
             if _debug: UDPMultiplexer._debug("    - from us!")
             return
 
-        # the PDU source is a tuple, convert it to an Address instance
-        src = Address(pdu.pduSource)
+        # the PDU source is a tuple, convert it to a shared Address instance
+        src = intern_address(pdu.pduSource)
 
         # match the destination in case the stack needs it
         if client is self.direct:
@@ -146,13 +149,19 @@ class UDPMultiplexer:
 
         # check for the message type
         if msg_type == 0x01:
-            if self.annexH.serverPeer:
-                self.annexH.response(PDU(pdu, source=src, destination=dest))
+            server = self.annexH
         elif msg_type == 0x81:
-            if self.annexJ.serverPeer:
-                self.annexJ.response(PDU(pdu, source=src, destination=dest))
+            server = self.annexJ
         else:
             UDPMultiplexer._warning("unsupported message")
+            return
+
+        if server.serverPeer:
+            # this is finished with the data, pass it along
+            xpdu = PDU(source=src, destination=dest)
+            xpdu.pduData = pdu.get_data(len(pdu.pduData))
+
+            server.response(xpdu)
 
 #
 #   BTR
@@ -324,7 +333,8 @@ class BIPSimple(BIPSAP, Client, Server):
         # check for local stations
         if pdu.pduDestination.addrType == Address.localStationAddr:
             # make an original unicast PDU
-            xpdu = OriginalUnicastNPDU(pdu, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu = OriginalUnicastNPDU(destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             if _debug: BIPSimple._debug("    - xpdu: %r", xpdu)
 
             # send it downstream
@@ -333,7 +343,8 @@ class BIPSimple(BIPSAP, Client, Server):
         # check for broadcasts
         elif pdu.pduDestination.addrType == Address.localBroadcastAddr:
             # make an original broadcast PDU
-            xpdu = OriginalBroadcastNPDU(pdu, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu = OriginalBroadcastNPDU(destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             if _debug: BIPSimple._debug("    - xpdu: %r", xpdu)
 
             # send it downstream
@@ -360,7 +371,8 @@ class BIPSimple(BIPSAP, Client, Server):
 
         elif isinstance(pdu, OriginalUnicastNPDU):
             # build a vanilla PDU
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu = PDU(source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu.pduData = pdu.get_data(len(pdu.pduData))
             if _debug: BIPSimple._debug("    - xpdu: %r", xpdu)
 
             # send it upstream
@@ -368,7 +380,8 @@ class BIPSimple(BIPSAP, Client, Server):
 
         elif isinstance(pdu, OriginalBroadcastNPDU):
             # build a PDU with a local broadcast address
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(source=pdu.pduSource, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu.pduData = pdu.get_data(len(pdu.pduData))
             if _debug: BIPSimple._debug("    - xpdu: %r", xpdu)
 
             # send it upstream
@@ -376,7 +389,8 @@ class BIPSimple(BIPSAP, Client, Server):
 
         elif isinstance(pdu, ForwardedNPDU):
             # build a PDU with the source from the real source
-            xpdu = PDU(pdu.pduData, source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu.pduData = pdu.get_data(len(pdu.pduData))
             if _debug: BIPSimple._debug("    - xpdu: %r", xpdu)
 
             # send it upstream
@@ -428,7 +442,8 @@ class BIPForeign(BIPSAP, Client, Server, OneShotTask, DebugContents):
         # check for local stations
         if pdu.pduDestination.addrType == Address.localStationAddr:
             # make an original unicast PDU
-            xpdu = OriginalUnicastNPDU(pdu, user_data=pdu.pduUserData)
+            xpdu = OriginalUnicastNPDU(user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             xpdu.pduDestination = pdu.pduDestination
 
             # send it downstream
@@ -437,7 +452,8 @@ class BIPForeign(BIPSAP, Client, Server, OneShotTask, DebugContents):
         # check for broadcasts
         elif pdu.pduDestination.addrType == Address.localBroadcastAddr:
             # make an original broadcast PDU
-            xpdu = DistributeBroadcastToNetwork(pdu, user_data=pdu.pduUserData)
+            xpdu = DistributeBroadcastToNetwork(user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             xpdu.pduDestination = self.bbmdAddress
 
             # send it downstream
@@ -487,14 +503,16 @@ class BIPForeign(BIPSAP, Client, Server, OneShotTask, DebugContents):
 
         elif isinstance(pdu, OriginalUnicastNPDU):
             # build a vanilla PDU
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu = PDU(source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu.pduData = pdu.get_data(len(pdu.pduData))
 
             # send it upstream
             self.response(xpdu)
 
         elif isinstance(pdu, ForwardedNPDU):
             # build a PDU with the source from the real source
-            xpdu = PDU(pdu.pduData, source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu = PDU(source=pdu.bvlciAddress, destination=LocalBroadcast(), user_data=pdu.pduUserData)
+            xpdu.pduData = pdu.get_data(len(pdu.pduData))
 
             # send it upstream
             self.response(xpdu)
@@ -571,7 +589,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
         # check for local stations
         if pdu.pduDestination.addrType == Address.localStationAddr:
             # make an original unicast PDU
-            xpdu = OriginalUnicastNPDU(pdu, user_data=pdu.pduUserData)
+            xpdu = OriginalUnicastNPDU(user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             xpdu.pduDestination = pdu.pduDestination
             if _debug: BIPBBMD._debug("    - xpdu: %r", xpdu)
 
@@ -581,7 +600,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
         # check for broadcasts
         elif pdu.pduDestination.addrType == Address.localBroadcastAddr:
             # make an original broadcast PDU
-            xpdu = OriginalBroadcastNPDU(pdu, user_data=pdu.pduUserData)
+            xpdu = OriginalBroadcastNPDU(user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             xpdu.pduDestination = pdu.pduDestination
             if _debug: BIPBBMD._debug("    - original broadcast xpdu: %r", xpdu)
 
@@ -589,7 +609,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
             self.request(xpdu)
 
             # make a forwarded PDU
-            xpdu = ForwardedNPDU(self.bbmdAddress, pdu, user_data=pdu.pduUserData)
+            xpdu = ForwardedNPDU(self.bbmdAddress, user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             if _debug: BIPBBMD._debug("    - forwarded xpdu: %r", xpdu)
 
             # send it to the peers
@@ -646,7 +667,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
             self.response(xpdu)
 
             # build a forwarded NPDU to send out
-            xpdu = ForwardedNPDU(pdu.bvlciAddress, pdu, destination=None, user_data=pdu.pduUserData)
+            xpdu = ForwardedNPDU(pdu.bvlciAddress, destination=None, user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             if _debug: BIPBBMD._debug("    - forwarded xpdu: %r", xpdu)
 
             # look for self as first entry in the BDT
@@ -705,7 +727,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
             self.response(xpdu)
 
             # build a forwarded NPDU to send out
-            xpdu = ForwardedNPDU(pdu.pduSource, pdu, user_data=pdu.pduUserData)
+            xpdu = ForwardedNPDU(pdu.pduSource, user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             if _debug: BIPBBMD._debug("    - forwarded xpdu: %r", xpdu)
 
             # send it to the peers
@@ -728,7 +751,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
 
         elif isinstance(pdu, OriginalUnicastNPDU):
             # build a vanilla PDU
-            xpdu = PDU(pdu.pduData, source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu = PDU(source=pdu.pduSource, destination=pdu.pduDestination, user_data=pdu.pduUserData)
+            xpdu.pduData = pdu.get_data(len(pdu.pduData))
             if _debug: BIPBBMD._debug("    - upstream xpdu: %r", xpdu)
 
             # send it upstream
@@ -743,7 +767,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
             self.response(xpdu)
 
             # make a forwarded PDU
-            xpdu = ForwardedNPDU(pdu.pduSource, pdu, user_data=pdu.pduUserData)
+            xpdu = ForwardedNPDU(pdu.pduSource, user_data=pdu.pduUserData)
+            xpdu.share_data(pdu.pduData)
             if _debug: BIPBBMD._debug("    - forwarded xpdu: %r", xpdu)
 
             # send it to the peers
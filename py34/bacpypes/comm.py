@@ -19,6 +19,9 @@ _log = ModuleLogger(globals())
 _short_mask = 0xFFFF
 _long_mask = 0xFFFFFFFF
 
+_short_struct = struct.Struct('>H')
+_long_struct = struct.Struct('>L')
+
 # maps of named clients and servers
 client_map = {}
 server_map = {}
@@ -28,12 +31,27 @@ service_map = {}
 element_map = {}
 
 
+#
+#   _PDUSlots
+#
+#   PCI and PDUData are mixed together in every PDU class, but Python only
+#   allows one base class with slots of its own.  So the slots for both of
+#   them are here, and they share this layout.  A PCI by itself never sets
+#   pduData.
+#
+
+class _PDUSlots(object):
+
+    __slots__ = ('pduUserData', 'pduSource', 'pduDestination', 'pduData')
+
 #
 #   PCI
 #
 
 @bacpypes_debugging
-class PCI(DebugContents):
+class PCI(_PDUSlots, DebugContents):
+
+    __slots__ = ()
 
     _debug_contents = ('pduUserData+', 'pduSource', 'pduDestination')
 
@@ -98,7 +116,9 @@ class PCI(DebugContents):
 #
 
 @bacpypes_debugging
-class PDUData(object):
+class PDUData(_PDUSlots):
+
+    __slots__ = ()
 
     def __init__(self, data=None, *args, **kwargs):
         if _debug: PDUData._debug("__init__ %r %r %r", data, args, kwargs)
@@ -130,6 +150,12 @@ class PDUData(object):
         if len(self.pduData) < dlen:
             raise DecodingError("no more packet data")
 
+        # the rest of it, take it rather than copy it
+        if dlen == len(self.pduData):
+            data = self.pduData
+            self.pduData = bytearray()
+            return data
+
         data = self.pduData[:dlen]
         del self.pduData[:dlen]
 
@@ -158,6 +184,16 @@ class PDUData(object):
         # regular append works
         self.pduData += data
 
+    def share_data(self, data):
+        """Append the data, but if there is nothing here yet refer to the
+        same octets rather than copy them.  The encoders on the way down
+        the stack that do not add any octets of their own use this, so
+        neither PDU may change the data afterwards."""
+        if self.pduData or not isinstance(data, bytearray):
+            self.put_data(data)
+        else:
+            self.pduData = data
+
     def put_short(self, n):
         self.pduData += struct.pack('>H',n & _short_mask)
 
@@ -200,6 +236,93 @@ class PDUData(object):
 
         return self.pdudata_contents(use_dict=use_dict, as_class=as_class)
 
+#
+#   PDUCursor
+#
+#   Decoding from a PDUData deletes the octets from the front of the data
+#   as they are read.  A cursor reads the same data through a memoryview
+#   and moves an offset along, so nothing is copied or moved until the
+#   octets are returned by get_data().  It can be passed to the decode()
+#   functions in place of a PDU, but it is read only.  Given a PDU it reads
+#   the data of the PDU and carries the PCI fields along like a copy.
+#
+
+class PDUCursor(PDUData):
+
+    __slots__ = ('_view', 'pduOffset', 'pduLength')
+
+    def __init__(self, data, **kwargs):
+        # pick up some optional kwargs
+        user_data = kwargs.get('user_data', None)
+        source = kwargs.get('source', None)
+        destination = kwargs.get('destination', None)
+
+        # carry source and destination from another PDU
+        if isinstance(data, PCI):
+            user_data = user_data or data.pduUserData
+            source = source or data.pduSource
+            destination = destination or data.pduDestination
+        if isinstance(data, PDUData):
+            data = data.pduData
+
+        # the decoders copy these with PCI.update()
+        self.pduUserData = user_data
+        self.pduSource = source
+        self.pduDestination = destination
+
+        # skip the PDUData initialization, it would make a copy
+        self._view = memoryview(data)
+        self.pduOffset = 0
+        self.pduLength = len(self._view)
+
+    @property
+    def pduData(self):
+        """The data that has not been read."""
+        return self._view[self.pduOffset:]
+
+    def get(self):
+        try:
+            octet = self._view[self.pduOffset]
+        except IndexError:
+            raise DecodingError("no more packet data")
+
+        self.pduOffset += 1
+        return octet
+
+    def get_data(self, dlen):
+        offset = self.pduOffset
+        end = offset + dlen
+        if end > self.pduLength:
+            raise DecodingError("no more packet data")
+
+        self.pduOffset = end
+        return self._view[offset:end].tobytes()
+
+    def get_short(self):
+        offset = self.pduOffset
+        if offset + 2 > self.pduLength:
+            raise DecodingError("no more packet data")
+
+        self.pduOffset = offset + 2
+        return _short_struct.unpack_from(self._view, offset)[0]
+
+    def get_long(self):
+        offset = self.pduOffset
+        if offset + 4 > self.pduLength:
+            raise DecodingError("no more packet data")
+
+        self.pduOffset = offset + 4
+        return _long_struct.unpack_from(self._view, offset)[0]
+
+    def put(self, n):
+        raise TypeError("cursors are read only")
+
+    put_data = put_short = put_long = put
+
+    def release(self):
+        """Release the view so the data can be changed again."""
+        self._view.release()
+
 #
 #   PDU
 #
@@ -207,6 +330,8 @@ class PDUData(object):
 @bacpypes_debugging
 class PDU(PCI, PDUData):
 
+    __slots__ = ()
+
     def __init__(self, data='', **kwargs):
         if _debug: PDU._debug("__init__ %r %r", data, kwargs)
 
@@ -9,6 +9,7 @@ import asyncore
 
 from .debugging import bacpypes_debugging, ModuleLogger
 
+from . import core
 from .core import deferred
 from .comm import PDU, Client, Server
 
@@ -42,6 +43,10 @@ class ConsoleClient(asyncore.file_dispatcher, Client):
         asyncore.file_dispatcher.__init__(self, sys.stdin)
         Client.__init__(self, cid)
 
+        # an asyncio event loop watches stdin rather than asyncore
+        if core.asyncioLoop:
+            core.asyncio_reader(self)
+
     def readable(self):
         return True     # We are always happy to read
 
@@ -73,6 +78,10 @@ class ConsoleServer(asyncore.file_dispatcher, Server):
         asyncore.file_dispatcher.__init__(self, sys.stdin)
         Server.__init__(self, sid)
 
+        # an asyncio event loop watches stdin rather than asyncore
+        if core.asyncioLoop:
+            core.asyncio_reader(self)
+
     def readable(self):
         return True     # We are always happy to read
 
@@ -83,7 +83,7 @@ class ConsoleCmd(cmd.Cmd, Thread, Logging):
         if _debug: ConsoleCmd._debug("    - done cmdloop")
 
         # tell the main thread to stop, this thread will exit
-        core.deferred(core.stop)
+        core.call_soon_threadsafe(core.stop)
 
     def onecmd(self, cmdString):
         if _debug: ConsoleCmd._debug('onecmd %r', cmdString)
@@ -236,6 +236,30 @@ class ConsoleCmd(cmd.Cmd, Thread, Logging):
 
     #-----
 
+    def do_sample(self, args):
+        """sample [ <seconds> [ <rate> [ <filename> ] ] ] - sample the stack of the core"""
+        args = args.split()
+        if _debug: ConsoleCmd._debug("do_sample %r", args)
+
+        try:
+            duration = float(args[0]) if len(args) > 0 else None
+            rate = float(args[1]) if len(args) > 1 else None
+        except ValueError:
+            self.stdout.write("invalid number\n")
+            return
+        filename = args[2] if len(args) > 2 else None
+
+        try:
+            sampler = core.start_sampling(rate, duration, filename)
+        except ValueError as err:
+            self.stdout.write("%s\n" % (err,))
+            return
+
+        if sampler:
+            self.stdout.write("sampling %r/s for %rs to %s\n" % (sampler.rate, sampler.duration, sampler.filename))
+        else:
+            self.stdout.write("already sampling\n")
+
     def do_exit(self, args):
         """Exits from the console."""
         if _debug: ConsoleCmd._debug("do_exit %r", args)
@@ -295,7 +319,7 @@ class ConsoleCmd(cmd.Cmd, Thread, Logging):
             self.stdout.write("Exiting...\n")
 
         # tell the core we have stopped
-        core.deferred(core.stop)
+        core.call_soon_threadsafe(core.stop)
 
     def precmd(self, line):
         """ This method is called after the line has been input but before
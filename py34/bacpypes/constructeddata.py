@@ -5,13 +5,22 @@ Constructed Data
 """
 
 import sys
+import struct
+import array
 
 from .errors import DecodingError, \
     MissingRequiredParameter, InvalidParameterDatatype, InvalidTag
 from .debugging import ModuleLogger, bacpypes_debugging
 
 from .primitivedata import Atomic, ClosingTag, OpeningTag, Tag, TagList, \
-    Unsigned
+    Unsigned, Real, Double, Enumerated, ApplicationTag, ContextTag, \
+    enumeration_tables
+
+# numpy is used for arrays of values when it is installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # some debugging
 _debug = 0
@@ -78,12 +87,22 @@ class Sequence(object):
         """
         """
         if _debug: Sequence._debug("encode %r", taglist)
-        global _sequence_of_classes
 
         # make sure we're dealing with a tag list
         if not isinstance(taglist, TagList):
             raise TypeError("TagList expected")
 
+        if compileSequences:
+            for encoder in _sequence_codec(self.__class__).encoders:
+                encoder(self, taglist)
+        else:
+            self.encode_elements(taglist)
+
+    def encode_elements(self, taglist):
+        """Encode the elements by going through the sequenceElements, the
+        generic version of what the compiled encoders do."""
+        global _sequence_of_classes
+
         for element in self.sequenceElements:
             value = getattr(self, element.name, None)
             if element.optional and value is None:
@@ -140,6 +159,15 @@ class Sequence(object):
         if not isinstance(taglist, TagList):
             raise TypeError("TagList expected")
 
+        if compileSequences:
+            for decoder in _sequence_codec(self.__class__).decoders:
+                decoder(self, taglist)
+        else:
+            self.decode_elements(taglist)
+
+    def decode_elements(self, taglist):
+        """Decode the elements by going through the sequenceElements, the
+        generic version of what the compiled decoders do."""
         for element in self.sequenceElements:
             tag = taglist.Peek()
 
@@ -256,10 +284,10 @@ class Sequence(object):
                     taglist.Pop()
 
                 try:
-                    # make a backup of the tag list in case the structure manages to
-                    # decode some content but not all of it.  This is not supposed to
-                    # happen if the ASN.1 has been formed correctly.
-                    backup = taglist.tagList[:]
+                    # save the position in the tag list in case the structure manages
+                    # to decode some content but not all of it.  This is not supposed
+                    # to happen if the ASN.1 has been formed correctly.
+                    backup = taglist.tell()
 
                     # build a value and decode it
                     value = element.klass()
@@ -274,8 +302,8 @@ class Sequence(object):
                         # omitted optional element
                         setattr(self, element.name, None)
 
-                        # restore the backup
-                        taglist.tagList = backup
+                        # go back to the saved position
+                        taglist.seek(backup)
                     else:
                         raise
 
@@ -347,6 +375,474 @@ class Sequence(object):
         # return what we built/updated
         return use_dict
 
+#
+#   Compiled Sequences
+#
+#   The encode() and decode() functions of a Sequence look at each element
+#   to decide what kind of thing it is, whether it is context encoded and
+#   so on, every time they are called.  Those decisions only depend on the
+#   class, so when compileSequences is true they are made the first time a
+#   class is encoded or decoded and a function is built for each element
+#   that does just what is needed for it.  The results are the same as
+#   the generic encode_elements() and decode_elements().
+#
+
+compileSequences = True
+
+class _SequenceCodec:
+
+    def __init__(self, cls):
+        self.elements = cls.sequenceElements
+        self.encoders = tuple(_element_encoder(cls, element) for element in self.elements)
+        self.decoders = tuple(_element_decoder(cls, element) for element in self.elements)
+
+def _sequence_codec(cls):
+    """Return the codec for a Sequence class, building it if necessary."""
+    codec = cls.__dict__.get('_sequenceCodec')
+    if (codec is None) or (codec.elements is not cls.sequenceElements):
+        codec = _SequenceCodec(cls)
+        cls._sequenceCodec = codec
+
+    return codec
+
+def _plain_enumeration(klass):
+    """Return true if the class is an enumeration that encodes and decodes
+    like Enumerated, so its tables can be used directly."""
+    if not issubclass(klass, Enumerated):
+        return False
+    if (klass.__init__ is not Enumerated.__init__) \
+            or (klass.encode is not Enumerated.encode) \
+            or (klass.decode is not Enumerated.decode):
+        return False
+
+    # make sure the class has its own tables
+    enumeration_tables(klass)
+
+    return True
+
+def _element_encoder(cls, element):
+    """Return a function that encodes an element of a sequence."""
+    name = element.name
+    klass = element.klass
+    context = element.context
+    optional = element.optional
+    missing = "%s is a missing required element of %s" % (name, cls.__name__)
+
+    if klass in _sequence_of_classes:
+        def encode(self, taglist):
+            value = getattr(self, name, None)
+            if value is None:
+                if optional:
+                    return
+                raise MissingRequiredParameter(missing)
+
+            if context is not None:
+                taglist.append(OpeningTag(context))
+            klass(value).encode(taglist)
+            if context is not None:
+                taglist.append(ClosingTag(context))
+
+    elif _plain_enumeration(klass):
+        def encode(self, taglist):
+            value = getattr(self, name, None)
+            if value is None:
+                if optional:
+                    return
+                raise MissingRequiredParameter(missing)
+
+            # the name is looked up rather than building an instance
+            data = klass.encode_octets(value)
+            if context is not None:
+                taglist.append(ContextTag(context, data))
+            else:
+                taglist.append(ApplicationTag(Tag.enumeratedAppTag, data))
+
+    elif issubclass(klass, (Atomic, AnyAtomic)):
+        def encode(self, taglist):
+            value = getattr(self, name, None)
+            if value is None:
+                if optional:
+                    return
+                raise MissingRequiredParameter(missing)
+
+            tag = Tag()
+            klass(value).encode(tag)
+            if context is not None:
+                tag = tag.app_to_context(context)
+            taglist.append(tag)
+
+    else:
+        def encode(self, taglist):
+            value = getattr(self, name, None)
+            if value is None:
+                if optional:
+                    return
+                raise MissingRequiredParameter(missing)
+            if not isinstance(value, klass):
+                raise TypeError("%s must be of type %s" % (name, klass.__name__))
+
+            if context is not None:
+                taglist.append(OpeningTag(context))
+            value.encode(taglist)
+            if context is not None:
+                taglist.append(ClosingTag(context))
+
+    return encode
+
+def _element_decoder(cls, element):
+    """Return a function that decodes an element of a sequence."""
+    name = element.name
+    klass = element.klass
+    context = element.context
+    optional = element.optional
+    missing = "%s is a missing required element of %s" % (name, cls.__name__)
+
+    sequence_of = klass in _sequence_of_classes
+
+    def absent(self, tag):
+        """Return true if there is no tag for the element."""
+        if tag is None:
+            if optional:
+                setattr(self, name, None)
+            elif sequence_of:
+                setattr(self, name, [])
+            else:
+                raise MissingRequiredParameter(missing)
+            return True
+
+        if tag.tagClass == Tag.closingTagClass:
+            if not optional:
+                raise MissingRequiredParameter(missing)
+            setattr(self, name, None)
+            return True
+
+        return False
+
+    if sequence_of:
+        def decode(self, taglist):
+            tag = taglist.Peek()
+            if absent(self, tag):
+                return
+
+            if context is not None:
+                if tag.tagClass != Tag.openingTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise MissingRequiredParameter("%s expected opening tag %d" % (name, context))
+                    setattr(self, name, [])
+                    return
+                taglist.Pop()
+
+            helper = klass()
+            helper.decode(taglist)
+            setattr(self, name, helper.value)
+
+            if context is not None:
+                tag = taglist.Pop()
+                if tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                    raise InvalidTag("%s expected closing tag %d" % (name, context))
+
+    elif _plain_enumeration(klass):
+        def decode(self, taglist):
+            tag = taglist.Peek()
+            if absent(self, tag):
+                return
+
+            if context is not None:
+                if tag.tagClass != Tag.contextTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise InvalidTag("%s expected context tag %d" % (name, context))
+                    setattr(self, name, None)
+                    return
+            elif tag.tagClass != Tag.applicationTagClass or tag.tagNumber != Tag.enumeratedAppTag:
+                if not optional:
+                    raise InvalidParameterDatatype("%s expected application tag %s" % (name, Tag._app_tag_name[Tag.enumeratedAppTag]))
+                setattr(self, name, None)
+                return
+
+            # the value is looked up rather than building an instance
+            taglist.Pop()
+            setattr(self, name, klass.decode_octets(tag.tagData))
+
+    elif issubclass(klass, Atomic):
+        app_tag = klass._app_tag
+
+        def decode(self, taglist):
+            tag = taglist.Peek()
+            if absent(self, tag):
+                return
+
+            if context is not None:
+                if tag.tagClass != Tag.contextTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise InvalidTag("%s expected context tag %d" % (name, context))
+                    setattr(self, name, None)
+                    return
+                tag = tag.context_to_app(app_tag)
+            elif tag.tagClass != Tag.applicationTagClass or tag.tagNumber != app_tag:
+                if not optional:
+                    raise InvalidParameterDatatype("%s expected application tag %s" % (name, Tag._app_tag_name[app_tag]))
+                setattr(self, name, None)
+                return
+
+            taglist.Pop()
+            setattr(self, name, klass(tag).value)
+
+    elif issubclass(klass, AnyAtomic):
+        def decode(self, taglist):
+            tag = taglist.Peek()
+            if absent(self, tag):
+                return
+
+            if context is not None:
+                if tag.tagClass != Tag.contextTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise InvalidTag("%s expected context tag %d" % (name, context))
+                    setattr(self, name, None)
+                    return
+                tag = tag.context_to_app(klass._app_tag)
+            elif tag.tagClass != Tag.applicationTagClass:
+                if not optional:
+                    raise InvalidParameterDatatype("%s expected application tag" % (name,))
+                setattr(self, name, None)
+                return
+
+            taglist.Pop()
+            setattr(self, name, klass(tag).value)
+
+    else:
+        def decode(self, taglist):
+            tag = taglist.Peek()
+            if absent(self, tag):
+                return
+
+            if context is not None:
+                if tag.tagClass != Tag.openingTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise InvalidTag("%s expected opening tag %d" % (name, context))
+                    setattr(self, name, None)
+                    return
+                taglist.Pop()
+
+            backup = taglist.tell()
+            try:
+                value = klass()
+                value.decode(taglist)
+                setattr(self, name, value)
+            except DecodingError:
+                if context is None and optional:
+                    setattr(self, name, None)
+                    taglist.seek(backup)
+                else:
+                    raise
+
+            if context is not None:
+                tag = taglist.Pop()
+                if (not tag) or tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                    raise InvalidTag("%s expected closing tag %d" % (name, context))
+
+    return decode
+
+#
+#   encode_values, decode_values
+#
+#   The values in a SequenceOf or an ArrayOf of an atomic type are encoded
+#   into a tag for each one, and decoded from them.  Real and Double values
+#   are packed and unpacked all at once and Unsigned values without building
+#   a helper for each one.
+#
+
+# struct format, length of the tag data and NumPy type by class
+_packed_formats = {
+    Real: ('f', 4, '>f4'),
+    Double: ('d', 8, '>f8'),
+    }
+
+def encode_values(klass, values, taglist):
+    """Encode the values of an atomic type and append the tags to the tag
+    list.  The values can also be in an array.array or a NumPy array."""
+    append = taglist.append
+
+    if klass in _packed_formats:
+        fmt, size, dtype = _packed_formats[klass]
+        app_tag = klass._app_tag
+
+        if (numpy is not None) and isinstance(values, numpy.ndarray):
+            data = values.astype(dtype).tobytes()
+        elif isinstance(values, array.array) and (values.typecode == fmt):
+            values = array.array(fmt, values)
+            if sys.byteorder == 'little':
+                values.byteswap()
+            data = values.tobytes()
+        elif all(isinstance(value, (float, int)) for value in values):
+            data = struct.pack('>%d%s' % (len(values), fmt), *values)
+        else:
+            # let the helpers sort out the instances or complain
+            data = None
+
+        if data is not None:
+            for i in range(0, len(data), size):
+                tag = Tag()
+                tag.set_app_data(app_tag, data[i:i + size])
+                append(tag)
+            return
+
+    elif klass is Unsigned:
+        if (numpy is not None) and isinstance(values, numpy.ndarray):
+            values = values.tolist()
+
+        for value in values:
+            try:
+                data = Unsigned.encode_octets(value)
+            except TypeError:
+                # an Unsigned instance or something it does not like
+                data = Unsigned.encode_octets(Unsigned(value).value)
+
+            tag = Tag()
+            tag.set_app_data(Tag.unsignedAppTag, data)
+            append(tag)
+        return
+
+    for value in values:
+        # a helper cooperates between the atomic value and the tag
+        helper = klass(value)
+
+        # build a tag and encode the data into it
+        tag = Tag()
+        helper.encode(tag)
+
+        # now encode the tag
+        append(tag)
+
+def decode_values(klass, taglist, as_array=False):
+    """Decode the values of an atomic type from the front of the tag list up
+    to a closing tag or the end of the list and return them in a list.  When
+    as_array is true the Real, Double and Unsigned values are returned in a
+    NumPy array, or an array.array when NumPy is not installed."""
+    if (klass not in _packed_formats) and (klass is not Unsigned):
+        if as_array:
+            raise TypeError("%s values cannot be returned in an array" % (klass.__name__,))
+
+        values = []
+        while len(taglist) != 0:
+            tag = taglist.Peek()
+            if tag.tagClass == Tag.closingTagClass:
+                break
+            taglist.Pop()
+
+            # a helper cooperates between the atomic value and the tag
+            values.append(klass(tag).value)
+
+        return values
+
+    if klass is Unsigned:
+        size = None
+    else:
+        fmt, size, dtype = _packed_formats[klass]
+    app_tag = klass._app_tag
+
+    # collect the data from the tags
+    octets = []
+    while True:
+        tag = taglist.Peek()
+        if (tag is None) or (tag.tagClass == Tag.closingTagClass):
+            break
+        if (tag.tagClass != Tag.applicationTagClass) or (tag.tagNumber != app_tag) \
+                or ((size is not None) and (len(tag.tagData) != size)):
+            # let the helper complain about the tag
+            klass(tag)
+            raise InvalidTag("%s application tag required" % (klass.__name__,))
+
+        taglist.Pop()
+        octets.append(tag.tagData)
+
+    if klass is Unsigned:
+        values = [Unsigned.decode_octets(data) for data in octets]
+        if not as_array:
+            return values
+        if numpy is not None:
+            return numpy.array(values, dtype=numpy.uint64)
+        return array.array('Q', values)
+
+    data = b''.join(octets)
+    if not as_array:
+        return list(struct.unpack('>%d%s' % (len(octets), fmt), data))
+
+    if numpy is not None:
+        return numpy.frombuffer(data, dtype=dtype).astype(dtype[1:])
+
+    values = array.array(fmt, data)
+    if sys.byteorder == 'little':
+        values.byteswap()
+    return values
+
+def _is_array(value):
+    """Return true if the value is an array.array or a NumPy array."""
+    if isinstance(value, array.array):
+        return True
+    return (numpy is not None) and isinstance(value, numpy.ndarray)
+
+def _array_item(values, item):
+    """Return an item or a slice of an array as Python values."""
+    value = values[item]
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return value
+
+#
+#   _ArrayValue
+#
+#   The value of an ArrayOf is a list with the length first.  When it is
+#   built from an array.array or a NumPy array that is kept as it is, and
+#   this reads like the list would, so value[0] is the length and value[1:]
+#   are the values.  It is read only, the ArrayOf changes it into a list
+#   before changing the values.
+#
+
+class _ArrayValue(object):
+
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values) + 1
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.tolist()[item]
+
+        if item < 0:
+            item += len(self.values) + 1
+        if item == 0:
+            return len(self.values)
+        if (item < 0) or (item > len(self.values)):
+            raise IndexError("index out of range")
+
+        return _array_item(self.values, item - 1)
+
+    def __iter__(self):
+        yield len(self.values)
+        for value in self.values.tolist():
+            yield value
+
+    def __eq__(self, other):
+        if isinstance(other, _ArrayValue):
+            other = other.tolist()
+        return self.tolist() == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def tolist(self):
+        """Return the list with the length first."""
+        return [len(self.values)] + self.values.tolist()
+
 #
 #   SequenceOf
 #
@@ -388,10 +884,19 @@ def SequenceOf(klass):
                 self.value = []
             elif isinstance(value, list):
                 self.value = value
+            elif _is_array(value):
+                # kept as it is until the values change
+                self.value = value
             else:
                 raise TypeError("invalid constructor datatype")
 
+        def _as_list(self):
+            """Change an array of values into a list."""
+            if _is_array(self.value):
+                self.value = self.value.tolist()
+
         def append(self, value):
+            self._as_list()
             if issubclass(self.subtype, Atomic):
                 pass
             elif issubclass(self.subtype, AnyAtomic) and not isinstance(value, Atomic):
@@ -404,22 +909,20 @@ def SequenceOf(klass):
             return len(self.value)
 
         def __getitem__(self, item):
+            if _is_array(self.value):
+                return _array_item(self.value, item)
             return self.value[item]
 
         def encode(self, taglist):
             if _debug: _SequenceOf._debug("(%r)encode %r", self.__class__.__name__, taglist)
-            for value in self.value:
-                if issubclass(self.subtype, (Atomic, AnyAtomic)):
-                    # a helper cooperates between the atomic value and the tag
-                    helper = self.subtype(value)
 
-                    # build a tag and encode the data into it
-                    tag = Tag()
-                    helper.encode(tag)
+            # atomic values are encoded together
+            if issubclass(self.subtype, (Atomic, AnyAtomic)):
+                encode_values(self.subtype, self.value, taglist)
+                return
 
-                    # now encode the tag
-                    taglist.append(tag)
-                elif isinstance(value, self.subtype):
+            for value in self.value:
+                if isinstance(value, self.subtype):
                     # it must have its own encoder
                     value.encode(taglist)
                 else:
@@ -428,6 +931,12 @@ def SequenceOf(klass):
         def decode(self, taglist):
             if _debug: _SequenceOf._debug("(%r)decode %r", self.__class__.__name__, taglist)
 
+            # atomic values are decoded together
+            if issubclass(self.subtype, (Atomic, AnyAtomic)):
+                self._as_list()
+                self.value.extend(decode_values(self.subtype, taglist))
+                return
+
             while len(taglist) != 0:
                 tag = taglist.Peek()
                 if tag.tagClass == Tag.closingTagClass:
@@ -454,6 +963,8 @@ def SequenceOf(klass):
                     self.value.append(value)
 
         def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
+            self._as_list()
+
             i = 0
             for value in self.value:
                 if issubclass(self.subtype, (Atomic, AnyAtomic)):
@@ -466,6 +977,8 @@ def SequenceOf(klass):
                 i += 1
 
         def dict_contents(self, use_dict=None, as_class=dict):
+            self._as_list()
+
             # return sequences as arrays
             mapped_value = []
 
@@ -538,10 +1051,19 @@ def ArrayOf(klass):
             elif isinstance(value, list):
                 self.value = [len(value)]
                 self.value.extend(value)
+            elif _is_array(value):
+                # kept as it is until the values change
+                self.value = _ArrayValue(value)
             else:
                 raise TypeError("invalid constructor datatype")
 
+        def _as_list(self):
+            """Change an array of values into a list with the length first."""
+            if isinstance(self.value, _ArrayValue):
+                self.value = self.value.tolist()
+
         def append(self, value):
+            self._as_list()
             if issubclass(self.subtype, Atomic):
                 pass
             elif issubclass(self.subtype, AnyAtomic) and not isinstance(value, Atomic):
@@ -562,6 +1084,8 @@ def ArrayOf(klass):
             return self.value[item]
 
         def __setitem__(self, item, value):
+            self._as_list()
+
             # no wrapping index
             if (item < 1) or (item > self.value[0]):
                 raise IndexError("index out of range")
@@ -581,6 +1105,8 @@ def ArrayOf(klass):
                 self.value[item] = value
 
         def __delitem__(self, item):
+            self._as_list()
+
             # no wrapping index
             if (item < 1) or (item > self.value[0]):
                 raise IndexError("index out of range")
@@ -601,18 +1127,16 @@ def ArrayOf(klass):
         def encode(self, taglist):
             if _debug: ArrayOf._debug("(%r)encode %r", self.__class__.__name__, taglist)
 
-            for value in self.value[1:]:
-                if issubclass(self.subtype, (Atomic, AnyAtomic)):
-                    # a helper cooperates between the atomic value and the tag
-                    helper = self.subtype(value)
-
-                    # build a tag and encode the data into it
-                    tag = Tag()
-                    helper.encode(tag)
+            # atomic values are encoded together
+            if issubclass(self.subtype, (Atomic, AnyAtomic)):
+                if isinstance(self.value, _ArrayValue):
+                    encode_values(self.subtype, self.value.values, taglist)
+                else:
+                    encode_values(self.subtype, self.value[1:], taglist)
+                return
 
-                    # now encode the tag
-                    taglist.append(tag)
-                elif isinstance(value, self.subtype):
+            for value in self.value[1:]:
+                if isinstance(value, self.subtype):
                     # it must have its own encoder
                     value.encode(taglist)
                 else:
@@ -624,6 +1148,12 @@ def ArrayOf(klass):
             # start with an empty array
             self.value = [0]
 
+            # atomic values are decoded together
+            if issubclass(self.subtype, (Atomic, AnyAtomic)):
+                self.value.extend(decode_values(self.subtype, taglist))
+                self.value[0] = len(self.value) - 1
+                return
+
             while len(taglist) != 0:
                 tag = taglist.Peek()
                 if tag.tagClass == Tag.closingTagClass:
@@ -1033,9 +1563,28 @@ class Any:
 
         self.tagList.extend(t.tagList)
 
-    def cast_out(self, klass):
-        """Interpret the content as a particular class."""
-        if _debug: Any._debug("cast_out %r", klass)
+    def cast_out(self, klass, as_array=False):
+        """Interpret the content as a particular class.  When as_array is
+        true a sequence or array of Real, Double or Unsigned values is
+        returned in a NumPy array, or an array.array without NumPy."""
+        if _debug: Any._debug("cast_out %r as_array=%r", klass, as_array)
+
+        # unpack the values into an array
+        if as_array:
+            if (klass not in _sequence_of_classes) and (klass not in _array_of_classes):
+                raise TypeError("sequence or array class required")
+
+            # make a copy of the tag list
+            t = TagList(self.tagList[:])
+
+            # decode the values
+            values = decode_values(klass.subtype, t, as_array=True)
+
+            # make sure everything was consumed
+            if len(t) != 0:
+                raise DecodingError("incomplete cast")
+
+            return values
 
         # check for a sequence element
         if klass in _sequence_of_classes:
@@ -6,11 +6,18 @@ Core
 
 import sys
 import asyncore
+import asyncio
+import selectors
 import signal
 import time
 import traceback
 
+from collections import deque
+from functools import partial
+
 from .task import TaskManager
+from .loopstats import LoopStats
+from .sampler import StackSampler
 from .debugging import bacpypes_debugging, ModuleLogger
 
 # some debugging
@@ -20,8 +27,17 @@ _log = ModuleLogger(globals())
 # globals
 running = False
 taskManager = None
-deferredFns = []
+deferredFns = deque()
+deferredHighWater = 0
+deferredCount = None
+deferredDuration = None
 sleeptime = 0.0
+asyncioLoop = None
+selectorMap = None
+loopStats = None
+stackSampler = None
+samplingRate = 100.0
+samplingDuration = 10.0
 
 #
 #   run
@@ -32,7 +48,11 @@ SPIN = 1.0
 @bacpypes_debugging
 def run(spin=SPIN):
     if _debug: run._debug("run spin=%r", spin)
-    global running, taskManager, deferredFns, sleeptime
+    global running, taskManager, sleeptime
+
+    # the asyncio event loop has its own way of doing things
+    if asyncioLoop:
+        return run_asyncio()
 
     # reference the task manager (a singleton)
     taskManager = TaskManager()
@@ -52,7 +72,10 @@ def run(spin=SPIN):
             # if there is a task to process, do it
             if task:
                 # if _debug: run._debug("    - task: %r", task)
-                taskManager.process_task(task)
+                if loopStats:
+                    loopStats.process_task(taskManager, task)
+                else:
+                    taskManager.process_task(task)
 
             # if delta is None, there are no tasks, default to spinning
             if delta is None:
@@ -63,27 +86,28 @@ def run(spin=SPIN):
                 time.sleep(sleeptime)
                 delta -= sleeptime
 
-            # if there are deferred functions, use a small delta
+            # if there are deferred functions, don't wait
             if deferredFns:
-                delta = min(delta, 0.001)
+                delta = 0.0
 #           if _debug: run._debug("    - delta: %r", delta)
 
             # loop for socket activity
-            asyncore.loop(timeout=delta, count=1)
-
-            # check for deferred functions
-            while deferredFns:
-                # get a reference to the list
-                fnlist = deferredFns
-                deferredFns = []
-
-                # call the functions
-                for fn, args, kwargs in fnlist:
-                    # if _debug: run._debug("    - call: %r %r %r", fn, args, kwargs)
-                    fn( *args, **kwargs)
-
-                # done with this list
-                del fnlist
+            if loopStats:
+                loopStats.iterations += 1
+                start = time.time()
+                if selectorMap:
+                    selectorMap.poll(delta)
+                else:
+                    asyncore.loop(timeout=delta, count=1)
+                loopStats.poll.record(time.time() - start)
+            elif selectorMap:
+                selectorMap.poll(delta)
+            else:
+                asyncore.loop(timeout=delta, count=1)
+
+            # call the deferred functions, what doesn't fit in the budget
+            # is left for the next time around
+            call_deferred(deferredCount, deferredDuration)
 
         except KeyboardInterrupt:
             if _debug: run._info("keyboard interrupt")
@@ -93,6 +117,196 @@ def run(spin=SPIN):
 
     running = False
 
+#
+#   _SelectorMap
+#
+#   An instance of this class replaces the asyncore socket map when the
+#   core is using a selector.  Dispatchers are registered with the selector
+#   when they are added to the map and unregistered when they are removed,
+#   rather than the whole map being rebuilt into fd sets every time around
+#   the loop.  The events a dispatcher is interested in are checked when
+#   it is added, after it has handled an event, and when it is passed to
+#   update_interest().
+#
+
+@bacpypes_debugging
+class _SelectorMap(dict):
+
+    def __init__(self, selector):
+        if _debug: _SelectorMap._debug("__init__ %r", selector)
+        dict.__init__(self)
+
+        self.selector = selector
+
+        # fd -> registered events
+        self.events = {}
+
+        # dispatchers whose interest needs to be checked
+        self.pending = set()
+
+    def __setitem__(self, fd, obj):
+        if fd in self:
+            del self[fd]
+        dict.__setitem__(self, fd, obj)
+
+        # it might not be finished initializing, check it later
+        self.pending.add(obj)
+
+    def __delitem__(self, fd):
+        dict.__delitem__(self, fd)
+
+        if self.events.pop(fd, 0):
+            self.selector.unregister(fd)
+
+    def update(self, obj):
+        """Bring the events registered for a dispatcher up to date."""
+        fd = obj._fileno
+        if (fd is None) or (self.get(fd) is not obj):
+            return
+
+        # same rules as asyncore.poll()
+        events = 0
+        if obj.readable():
+            events |= selectors.EVENT_READ
+        if obj.writable() and not obj.accepting:
+            events |= selectors.EVENT_WRITE
+
+        old_events = self.events.get(fd, 0)
+        if events == old_events:
+            return
+
+        if not old_events:
+            self.selector.register(fd, events, obj)
+        elif not events:
+            self.selector.unregister(fd)
+        else:
+            self.selector.modify(fd, events, obj)
+
+        if events:
+            self.events[fd] = events
+        else:
+            del self.events[fd]
+
+    def poll(self, timeout):
+        """Wait for socket activity and dispatch it, like asyncore.poll()."""
+        if self.pending:
+            pending, self.pending = self.pending, set()
+            for obj in pending:
+                self.update(obj)
+
+        for key, mask in self.selector.select(timeout):
+            obj = key.data
+
+            # it may have been closed by an earlier one
+            if self.get(key.fd) is not obj:
+                continue
+
+            if mask & selectors.EVENT_READ:
+                asyncore.read(obj)
+            if (mask & selectors.EVENT_WRITE) and (self.get(key.fd) is obj):
+                asyncore.write(obj)
+
+            self.update(obj)
+
+#
+#   _AsyncioTrigger
+#
+#   An instance of this class replaces the task manager trigger when the
+#   core is running on an asyncio event loop.  Rather than writing to a
+#   pipe to break out of select(), setting it schedules one more pass
+#   through the tasks.
+#
+
+class _AsyncioTrigger:
+
+    def __init__(self, loop, fn):
+        self.loop = loop
+        self.fn = fn
+        self.pending = False
+
+    def set(self):
+        if not self.pending:
+            self.pending = True
+            self.loop.call_soon(self._fire)
+
+    def clear(self):
+        pass
+
+    def _fire(self):
+        self.pending = False
+        self.fn()
+
+#
+#   run_asyncio
+#
+
+# the timer handle for the next task
+_asyncioTimer = None
+
+@bacpypes_debugging
+def _asyncio_process_tasks():
+    """Process the tasks that are due and arm a timer for the next one."""
+    global _asyncioTimer
+
+    # this pass makes any previous timer redundant
+    if _asyncioTimer:
+        _asyncioTimer.cancel()
+        _asyncioTimer = None
+
+    while running:
+        # get the next task
+        task, delta = taskManager.get_next_task()
+
+        # if there is a task to process, do it and check for another one
+        if task:
+            try:
+                if loopStats:
+                    loopStats.process_task(taskManager, task)
+                else:
+                    taskManager.process_task(task)
+            except Exception as err:
+                if _debug: _asyncio_process_tasks._exception("an error has occurred: %s", err)
+            continue
+
+        # wake up when the next one is due
+        if delta is not None:
+            _asyncioTimer = asyncioLoop.call_later(delta, _asyncio_process_tasks)
+        break
+
+@bacpypes_debugging
+def run_asyncio():
+    """Like the run() function, but socket IO, tasks and deferred functions
+    are all callbacks from an asyncio event loop."""
+    if _debug: run_asyncio._debug("run_asyncio")
+    global running, taskManager, _asyncioTimer
+
+    if not asyncioLoop:
+        raise RuntimeError("asyncio not enabled")
+
+    # reference the task manager (a singleton)
+    taskManager = TaskManager()
+
+    # tasks being installed or suspended reschedule the timer
+    if not isinstance(taskManager.trigger, _AsyncioTrigger):
+        taskManager.trigger = _AsyncioTrigger(asyncioLoop, _asyncio_process_tasks)
+
+    running = True
+
+    # make the first pass through the tasks
+    taskManager.trigger.set()
+
+    try:
+        asyncioLoop.run_forever()
+    except KeyboardInterrupt:
+        if _debug: run_asyncio._info("keyboard interrupt")
+
+    running = False
+
+    # the loop might be used again
+    if _asyncioTimer:
+        _asyncioTimer.cancel()
+        _asyncioTimer = None
+
 #
 #   run_once
 #
@@ -105,7 +319,7 @@ def run_once():
     socket IO actviity) and the timers.
     """
     if _debug: run_once._debug("run_once")
-    global taskManager, deferredFns
+    global taskManager
 
     # reference the task manager (a singleton)
     taskManager = TaskManager()
@@ -119,21 +333,13 @@ def run_once():
 
             # if there is a task to process, do it
             if task:
-                taskManager.process_task(task)
-
-            # check for deferred functions
-            while deferredFns:
-                # get a reference to the list
-                fnlist = deferredFns
-                deferredFns = []
-
-                # call the functions
-                for fn, args, kwargs in fnlist:
-                    if _debug: run_once._debug("    - call: %r %r %r", fn, args, kwargs)
-                    fn( *args, **kwargs)
+                if loopStats:
+                    loopStats.process_task(taskManager, task)
+                else:
+                    taskManager.process_task(task)
 
-                # done with this list
-                del fnlist
+            # call all of the deferred functions
+            call_deferred()
 
     except KeyboardInterrupt:
         if _debug: run_once._info("keyboard interrupt")
@@ -157,6 +363,12 @@ def stop(*args):
 
     running = False
 
+    # stop the asyncio event loop, this could be from another thread
+    if asyncioLoop:
+        if _debug: stop._debug("    - stop event loop")
+        asyncioLoop.call_soon_threadsafe(asyncioLoop.stop)
+        return
+
     # trigger the task manager event
     if taskManager and taskManager.trigger:
         if _debug: stop._debug("    - trigger")
@@ -174,13 +386,14 @@ if hasattr(signal, 'SIGTERM'):
 def print_stack(sig, frame):
     """Signal handler to print a stack trace and some interesting values."""
     if _debug: print_stack._debug("print_stack, %r, %r", sig, frame)
-    global running, deferredFns, sleeptime
+    global running, sleeptime
 
     sys.stderr.write("==== USR1 Signal, %s\n" % time.strftime("%d-%b-%Y %H:%M:%S"))
 
     sys.stderr.write("---------- globals\n")
     sys.stderr.write("    running: %r\n" % (running,))
     sys.stderr.write("    deferredFns: %r\n" % (deferredFns,))
+    sys.stderr.write("    deferredHighWater: %r\n" % (deferredHighWater,))
     sys.stderr.write("    sleeptime: %r\n" % (sleeptime,))
 
     sys.stderr.write("---------- stack\n")
@@ -206,17 +419,226 @@ def print_stack(sig, frame):
 if hasattr(signal, 'SIGUSR1'):
     signal.signal(signal.SIGUSR1, print_stack)
 
+#
+#   start_sampling
+#
+
+@bacpypes_debugging
+def start_sampling(rate=None, duration=None, filename=None):
+    """Start sampling the stack of the main thread, which is usually the
+    one running the core, and return the sampler.  Returns None if it is
+    already sampling."""
+    if _debug: start_sampling._debug("start_sampling rate=%r duration=%r filename=%r", rate, duration, filename)
+    global stackSampler
+
+    if stackSampler and stackSampler.is_alive():
+        return None
+
+    stackSampler = StackSampler(
+        rate=samplingRate if rate is None else rate,
+        duration=samplingDuration if duration is None else duration,
+        filename=filename,
+        )
+    stackSampler.start()
+
+    return stackSampler
+
+#
+#   set_sampling
+#
+
+def set_sampling(rate=None, duration=None):
+    """Set the number of samples per second and the number of seconds to
+    sample when the USR2 signal is received."""
+    global samplingRate, samplingDuration
+
+    if rate is not None:
+        if rate <= 0.0:
+            raise ValueError("rate must be positive")
+        samplingRate = rate
+    if duration is not None:
+        if duration <= 0.0:
+            raise ValueError("duration must be positive")
+        samplingDuration = duration
+
+#
+#   sample_stacks
+#
+
+@bacpypes_debugging
+def sample_stacks(sig, frame):
+    """Signal handler to start sampling the stack."""
+    if _debug: sample_stacks._debug("sample_stacks, %r, %r", sig, frame)
+
+    sys.stderr.write("==== USR2 Signal, %s\n" % time.strftime("%d-%b-%Y %H:%M:%S"))
+
+    sampler = start_sampling()
+    if sampler:
+        sys.stderr.write("==== sampling %r/s for %rs to %s\n" % (sampler.rate, sampler.duration, sampler.filename))
+    else:
+        sys.stderr.write("==== already sampling\n")
+    sys.stderr.flush()
+
+# set a USR2 signal handler to sample the stack
+if hasattr(signal, 'SIGUSR2'):
+    signal.signal(signal.SIGUSR2, sample_stacks)
+
 #
 #   deferred
 #
 
 def deferred(fn, *args, **kwargs):
     # _log.debug("deferred %r %r %r", fn, args, kwargs)
-    global deferredFns
+    global deferredHighWater
+
+    # the asyncio event loop has its own list
+    if asyncioLoop:
+        if kwargs:
+            fn = partial(fn, **kwargs)
+        asyncioLoop.call_soon(fn, *args)
+        return
 
-    # append it to the list
+    # append it to the queue
     deferredFns.append((fn, args, kwargs))
 
+    # keep track of how deep it gets
+    if len(deferredFns) > deferredHighWater:
+        deferredHighWater = len(deferredFns)
+
+#
+#   call_soon_threadsafe
+#
+
+def call_soon_threadsafe(fn, *args, **kwargs):
+    """Like deferred(), but may be called from other threads.  Appending to
+    the deque is atomic so there is no lock, and the task manager trigger
+    breaks the loop out of select() so the function is called right away
+    rather than after the loop wakes up on its own."""
+    # _log.debug("call_soon_threadsafe %r %r %r", fn, args, kwargs)
+    global deferredHighWater
+
+    # the asyncio event loop has its own way of doing this
+    if asyncioLoop:
+        if kwargs:
+            fn = partial(fn, **kwargs)
+        asyncioLoop.call_soon_threadsafe(fn, *args)
+        return
+
+    # append it to the queue
+    deferredFns.append((fn, args, kwargs))
+
+    # keep track of how deep it gets, close enough across threads
+    if len(deferredFns) > deferredHighWater:
+        deferredHighWater = len(deferredFns)
+
+    # wake up the loop, if it's not running yet it will get it later
+    if taskManager and taskManager.trigger:
+        taskManager.trigger.set()
+
+#
+#   call_deferred
+#
+
+def call_deferred(count=None, duration=None):
+    """Call the deferred functions in order, including the ones they defer,
+    until the queue is empty or the budget of the number of calls or the
+    number of seconds has been used up.  Returns the number of calls."""
+    # _log.debug("call_deferred %r %r", count, duration)
+
+    if duration is not None:
+        deadline = time.time() + duration
+
+    calls = 0
+    while deferredFns:
+        fn, args, kwargs = deferredFns.popleft()
+        if loopStats:
+            loopStats.call(fn, args, kwargs)
+        else:
+            fn(*args, **kwargs)
+        calls += 1
+
+        # check the budget
+        if (count is not None) and (calls >= count):
+            break
+        if (duration is not None) and (time.time() >= deadline):
+            break
+
+    return calls
+
+#
+#   set_deferred_budget
+#
+
+@bacpypes_debugging
+def set_deferred_budget(count=None, duration=None):
+    """Limit the number of deferred function calls or the number of seconds
+    spent calling them each time through the run() loop.  None means there
+    is no limit, which is the default."""
+    if _debug: set_deferred_budget._debug("set_deferred_budget %r %r", count, duration)
+    global deferredCount, deferredDuration
+
+    if (count is not None) and (count < 1):
+        raise ValueError("count must be at least one")
+    if (duration is not None) and (duration <= 0.0):
+        raise ValueError("duration must be greater than zero")
+
+    deferredCount = count
+    deferredDuration = duration
+
+#
+#   deferred_stats
+#
+
+def deferred_stats(reset=False):
+    """Return the current depth of the deferred function queue and the
+    deepest it has been, optionally resetting the high water mark."""
+    global deferredHighWater
+
+    stats = {
+        'depth': len(deferredFns),
+        'highWater': deferredHighWater,
+        }
+    if reset:
+        deferredHighWater = len(deferredFns)
+
+    return stats
+
+#
+#   enable_loop_stats
+#
+
+@bacpypes_debugging
+def enable_loop_stats(enable=True):
+    """Turn the collection of loop statistics on or off.  It may be turned
+    on and off while the application is running and when it is off it
+    costs next to nothing."""
+    if _debug: enable_loop_stats._debug("enable_loop_stats %r", enable)
+    global loopStats
+
+    if not enable:
+        loopStats = None
+    elif not loopStats:
+        loopStats = LoopStats()
+
+    return loopStats
+
+#
+#   loop_stats
+#
+
+def loop_stats(reset=False):
+    """Return a snapshot of the loop statistics and the deferred function
+    queue, or None if they are not being collected."""
+    if not loopStats:
+        return None
+
+    stats = loopStats.snapshot()
+    stats['deferredQueue'] = deferred_stats(reset)
+    if reset:
+        loopStats.reset()
+
+    return stats
+
 #
 #   enable_sleeping
 #
@@ -228,3 +650,81 @@ def enable_sleeping(stime=0.001):
 
     # set the sleep time
     sleeptime = stime
+
+#
+#   enable_asyncio
+#
+
+@bacpypes_debugging
+def enable_asyncio(loop=None):
+    """Run the core on an asyncio event loop rather than asyncore.  This
+    must be called before any directors, clients or servers are created,
+    and the loop may be shared with other asyncio applications."""
+    if _debug: enable_asyncio._debug("enable_asyncio %r", loop)
+    global asyncioLoop
+
+    # use the one provided or make a new one
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    asyncioLoop = loop
+
+    return loop
+
+#
+#   enable_selectors
+#
+
+@bacpypes_debugging
+def enable_selectors(selector=None):
+    """Use a selector, epoll on Linux, rather than select() for socket
+    activity.  This replaces the asyncore socket map, so it should be
+    called before any directors, clients or servers are created."""
+    if _debug: enable_selectors._debug("enable_selectors %r", selector)
+    global selectorMap
+
+    if selector is None:
+        selector = selectors.DefaultSelector()
+
+    # move over anything that was already created
+    old_map = asyncore.socket_map
+    selectorMap = _SelectorMap(selector)
+    for fd, obj in old_map.items():
+        obj._map = selectorMap
+        selectorMap[fd] = obj
+    old_map.clear()
+
+    asyncore.socket_map = selectorMap
+
+    return selectorMap
+
+#
+#   update_interest
+#
+
+def update_interest(dispatcher):
+    """Called when something other than the dispatcher itself might have
+    made it readable or writable, like queuing data to send.  When using
+    a selector it is checked the next time around the loop."""
+    if selectorMap:
+        selectorMap.pending.add(dispatcher)
+
+#
+#   asyncio_reader
+#
+
+@bacpypes_debugging
+def asyncio_reader(dispatcher):
+    """Move a dispatcher that is only interested in reading out of the
+    asyncore socket map and have the event loop call it back instead.
+    Returns the file descriptor so it can be removed later."""
+    if _debug: asyncio_reader._debug("asyncio_reader %r", dispatcher)
+
+    fd = dispatcher.socket.fileno()
+
+    # take it out of the socket map and give it to the event loop
+    dispatcher.del_channel()
+    asyncioLoop.add_reader(fd, dispatcher.handle_read_event)
+
+    return fd
@@ -90,6 +90,9 @@ _log = ModuleLogger(globals())
 
 class DebugContents(object):
 
+    # no instance dictionary required, subclasses may have slots
+    __slots__ = ()
+
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         """Debug the contents of an object."""
         if _debug: _log.debug("debug_contents indent=%r file=%r _ids=%r", indent, file, _ids)
@@ -300,6 +303,7 @@ class _LoggingMetaclass(type):
 
 class Logging(object):
     __metaclass__ = _LoggingMetaclass
+    __slots__ = ()
 
 #
 #   class_debugging
@@ -33,9 +33,21 @@ class WaitableEvent(asyncore.file_dispatcher, Logging):
         # continue with init
         asyncore.file_dispatcher.__init__(self, self._read_fd)
 
+        # an asyncio event loop watches the pipe rather than asyncore
+        from . import core
+        if core.asyncioLoop:
+            self._loop = core.asyncioLoop
+            self._loop_fd = core.asyncio_reader(self)
+        else:
+            self._loop = None
+
     def __del__(self):
         if _debug: WaitableEvent._debug("__del__")
 
+        # stop watching the pipe
+        if self._loop:
+            self._loop.remove_reader(self._loop_fd)
+
         # close the file descriptors
         os.close(self._read_fd)
         os.close(self._write_fd)
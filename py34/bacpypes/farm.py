@@ -0,0 +1,577 @@
+#!/usr/bin/python
+
+"""
+Worker Farm
+
+A front end process owns the BACnet/IP port and passes the datagrams to
+a number of worker processes, each running its own application stack,
+so the decoding, encoding and application work is spread across cores.
+"""
+
+import os
+import socket
+import struct
+import asyncore
+import multiprocessing
+
+from multiprocessing.shared_memory import SharedMemory
+
+from .debugging import bacpypes_debugging, DebugContents, ModuleLogger
+
+from . import core
+from .comm import bind
+from .pdu import Address, LocalBroadcast, PDU
+
+from .app import Application
+from .appservice import StateMachineAccessPoint, ApplicationServiceAccessPoint
+from .netservice import NetworkServiceAccessPoint, NetworkServiceElement
+from .bvllservice import BIPSimple, AnnexJCodec, UDPMultiplexer, \
+    _MultiplexServer
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# ring header, the write and read positions
+_ring_header = struct.Struct('<QQ')
+_ring_position = struct.Struct('<Q')
+_ring_length = struct.Struct('<I')
+_RING_WRAP = 0xFFFFFFFF
+
+# datagram header, flags, IPv4 address and port
+_datagram_header = struct.Struct('!B4sH')
+_BROADCAST_FLAG = 0x01
+
+#
+#   ShmRing
+#
+#   A ring buffer of variable length records in shared memory with one
+#   writer and one reader, which may be in different processes.  The
+#   writer only changes the write position and the reader only changes the
+#   read position, and the positions only increase.  Records that do not
+#   fit in the rest of the buffer start over at the beginning.
+#
+
+@bacpypes_debugging
+class ShmRing(DebugContents):
+
+    _debug_contents = ('name', 'size', 'dropped')
+
+    def __init__(self, name=None, size=1048576):
+        if _debug: ShmRing._debug("__init__ name=%r size=%r", name, size)
+
+        if name is None:
+            self.shm = SharedMemory(create=True, size=_ring_header.size + size)
+            self.owner = True
+            _ring_header.pack_into(self.shm.buf, 0, 0, 0)
+        else:
+            self.shm = SharedMemory(name=name)
+            self.owner = False
+
+        self.name = self.shm.name
+        self.size = self.shm.size - _ring_header.size
+        self.data = self.shm.buf[_ring_header.size:]
+
+        # records that did not fit
+        self.dropped = 0
+
+    def _positions(self):
+        # read until consistent, the other side may be changing one
+        positions = _ring_header.unpack_from(self.shm.buf, 0)
+        while True:
+            check = _ring_header.unpack_from(self.shm.buf, 0)
+            if check == positions:
+                return positions
+            positions = check
+
+    def put(self, record):
+        """Append a record, return false if there is no room."""
+        head, tail = self._positions()
+
+        need = _ring_length.size + len(record)
+        pos = head % self.size
+        contiguous = self.size - pos
+
+        # skip over the end if it doesn't fit
+        skip = contiguous if (contiguous < need) else 0
+        if skip + need > self.size - (head - tail):
+            self.dropped += 1
+            return False
+
+        if skip:
+            if contiguous >= _ring_length.size:
+                _ring_length.pack_into(self.data, pos, _RING_WRAP)
+            head += skip
+            pos = 0
+
+        _ring_length.pack_into(self.data, pos, len(record))
+        pos += _ring_length.size
+        self.data[pos:pos + len(record)] = record
+
+        # the record is written, now it can be read
+        _ring_position.pack_into(self.shm.buf, 0, head + need)
+        return True
+
+    def get(self):
+        """Return the next record, or None if there isn't one."""
+        head, tail = self._positions()
+
+        while tail != head:
+            pos = tail % self.size
+            contiguous = self.size - pos
+
+            # the writer skipped over the end
+            if contiguous < _ring_length.size:
+                tail += contiguous
+                continue
+            length, = _ring_length.unpack_from(self.data, pos)
+            if length == _RING_WRAP:
+                tail += contiguous
+                continue
+
+            pos += _ring_length.size
+            record = bytes(self.data[pos:pos + length])
+            tail += _ring_length.size + length
+
+            _ring_position.pack_into(self.shm.buf, 8, tail)
+            return record
+
+        # caught up with the skipping
+        _ring_position.pack_into(self.shm.buf, 8, tail)
+        return None
+
+    def close(self):
+        """Detach from the shared memory, and remove it if this created it."""
+        if _debug: ShmRing._debug("close")
+
+        self.data.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+#
+#   _Doorbell
+#
+#   When one side of a ring has put records in it, it rings the doorbell
+#   so the other side wakes up and reads them.  The doorbell is one end of
+#   a multiprocessing pipe, which is a socket pair on POSIX platforms.
+#
+
+@bacpypes_debugging
+class _Doorbell(asyncore.dispatcher):
+
+    def __init__(self, connection, fn):
+        if _debug: _Doorbell._debug("__init__ %r %r", connection, fn)
+        asyncore.dispatcher.__init__(self)
+
+        # take over the descriptor, ringing must never block
+        self.set_socket(socket.socket(fileno=os.dup(connection.fileno())))
+        self.socket.setblocking(False)
+        connection.close()
+
+        # called when the doorbell rings
+        self.fn = fn
+        self.closed = False
+
+    def ring(self):
+        try:
+            self.socket.send(b'\x00')
+        except BlockingIOError:
+            # lots of ringing, the other side will wake up
+            pass
+        except OSError as err:
+            _Doorbell._warning("doorbell error: %s", err)
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return False
+
+    def handle_read(self):
+        if not self.recv(4096):
+            return
+        self.fn()
+
+    def handle_close(self):
+        if _debug: _Doorbell._debug("handle_close")
+
+        self.close()
+        self.closed = True
+        self.fn()
+
+#
+#   _pack_datagram, _unpack_datagram
+#
+
+def _pack_datagram(addr, data, flags=0):
+    return _datagram_header.pack(flags, socket.inet_aton(addr[0] or '0.0.0.0'), addr[1]) + data
+
+def _unpack_datagram(record):
+    flags, ip, port = _datagram_header.unpack_from(record)
+    return flags, (socket.inet_ntoa(ip), port), record[_datagram_header.size:]
+
+#
+#   _npdu_addresses
+#
+
+def _npdu_addresses(data, npdu):
+    """Return the destination network and address, the source network and
+    address, and the offset of the APDU in the NPDU that starts at npdu.
+    The networks are None when they are not in the NPDU.  Returns None for
+    network layer messages and NPDUs that are too short."""
+    if (len(data) < npdu + 2) or (data[npdu] != 0x01):
+        return None
+    control = data[npdu + 1]
+    if control & 0x80:
+        return None
+
+    dnet = dadr = snet = sadr = None
+    offset = npdu + 2
+
+    # destination specifier
+    if control & 0x20:
+        if len(data) < offset + 3:
+            return None
+        dnet = (data[offset] << 8) + data[offset + 1]
+        dlen = data[offset + 2]
+        dadr = bytes(data[offset + 3:offset + 3 + dlen])
+        offset += 3 + dlen
+
+    # source specifier
+    if control & 0x08:
+        if len(data) < offset + 3:
+            return None
+        snet = (data[offset] << 8) + data[offset + 1]
+        slen = data[offset + 2]
+        sadr = bytes(data[offset + 3:offset + 3 + slen])
+        offset += 3 + slen
+
+    # hop count
+    if control & 0x20:
+        offset += 1
+
+    return dnet, dadr, snet, sadr, offset
+
+#
+#   FarmWorker
+#
+#   An instance of this class in the front end keeps track of a worker
+#   process and the rings going to and coming from it.
+#
+
+@bacpypes_debugging
+class FarmWorker(DebugContents):
+
+    _debug_contents = ('index', 'process', 'inbound', 'outbound')
+
+    def __init__(self, farm, index, appFactory, ringSize):
+        if _debug: FarmWorker._debug("__init__ %r %r %r %r", farm, index, appFactory, ringSize)
+
+        self.farm = farm
+        self.index = index
+
+        # datagrams going in to the worker and coming back out
+        self.inbound = ShmRing(size=ringSize)
+        self.outbound = ShmRing(size=ringSize)
+
+        connection, worker_connection = multiprocessing.Pipe()
+        self.doorbell = _Doorbell(connection, self.outbound_ready)
+
+        # start it up, fresh
+        context = multiprocessing.get_context('spawn')
+        self.process = context.Process(
+            target=_worker_main,
+            args=(index, farm.address, farm.addrBroadcastTuple, self.inbound.name, self.outbound.name, worker_connection, appFactory),
+            name="bacpypes-farm-%d" % (index,),
+            daemon=True,
+            )
+        self.process.start()
+
+        # the worker has its own copy
+        worker_connection.close()
+
+    def send(self, record):
+        """Pass a datagram to the worker."""
+        if self.inbound.put(record):
+            self.doorbell.ring()
+        elif _debug:
+            FarmWorker._debug("    - inbound ring full, dropped")
+
+    def outbound_ready(self):
+        """The worker has datagrams to send."""
+        while True:
+            record = self.outbound.get()
+            if record is None:
+                break
+
+            flags, addr, data = _unpack_datagram(record)
+            self.farm.worker_request(self, addr, data)
+
+        if self.doorbell.closed and self.farm.running:
+            FarmWorker._error("worker %d has stopped", self.index)
+
+    def close(self):
+        if _debug: FarmWorker._debug("close")
+
+        if not self.doorbell.closed:
+            self.doorbell.close()
+            self.doorbell.closed = True
+        self.process.join(5.0)
+        if self.process.is_alive():
+            self.process.terminate()
+
+        self.inbound.close()
+        self.outbound.close()
+
+#
+#   FarmMultiplexer
+#
+#   In the front end this takes the place of a UDPMultiplexer for BACnet/IP
+#   (Annex J) traffic.  It looks at just enough of each datagram to decide
+#   which worker should get it, so all of the traffic for one transaction
+#   goes to the same worker, and sends the datagrams that come back.
+#
+
+@bacpypes_debugging
+class FarmMultiplexer(UDPMultiplexer):
+
+    def __init__(self, addr=None, workers=2, appFactory=None, ringSize=1048576, noBroadcast=False):
+        if _debug: FarmMultiplexer._debug("__init__ %r workers=%r appFactory=%r ringSize=%r noBroadcast=%r", addr, workers, appFactory, ringSize, noBroadcast)
+        UDPMultiplexer.__init__(self, addr, noBroadcast)
+
+        if workers < 1:
+            raise ValueError("at least one worker required")
+        if appFactory is None:
+            raise ValueError("appFactory required")
+
+        # the worker that sent each confirmed request, by the peer and
+        # the invoke ID, so the responses go back to the same one
+        self.transactions = {}
+
+        self.running = True
+        self.workers = [FarmWorker(self, i, appFactory, ringSize) for i in range(workers)]
+
+    def worker_index(self, source, data):
+        """Return the index of the worker that gets the datagram, or None
+        for all of them.  Broadcasts go to all of them, responses to a
+        confirmed request go to the worker that sent the request, and the
+        rest are hashed on the address of the device that sent them, or on
+        the destination address when they are routed to a station on
+        another network, like a virtual device."""
+        function = data[1] if len(data) > 1 else None
+
+        if function == 0x04:
+            # forwarded NPDU, a broadcast from the original source
+            source = (socket.inet_ntoa(data[4:8]), (data[8] << 8) + data[9])
+            broadcast = True
+            npdu = 10
+        elif function in (0x0A, 0x0B):
+            # original unicast or broadcast NPDU
+            broadcast = (function == 0x0B)
+            npdu = 4
+        else:
+            # BVLL control messages go to the first worker
+            return 0
+
+        key = source
+        addresses = _npdu_addresses(data, npdu)
+        if addresses:
+            dnet, dadr, snet, sadr, apdu = addresses
+
+            if dadr:
+                # routed to a specific station
+                key = dadr
+            elif broadcast or (dnet is not None):
+                # local, remote or global broadcast
+                return None
+            elif len(data) > apdu + 1:
+                # responses from the server side of a transaction
+                pdu_type = data[apdu] >> 4
+                if (pdu_type in (2, 3, 5, 6)) or ((pdu_type in (4, 7)) and (data[apdu] & 0x01)):
+                    transaction = (source, snet, sadr, data[apdu + 1])
+                    index = self.transactions.get(transaction)
+                    if index is not None:
+                        # done unless more segments are coming
+                        if (pdu_type != 4) and not ((pdu_type == 3) and (data[apdu] & 0x0C == 0x0C)):
+                            del self.transactions[transaction]
+                        return index
+        elif broadcast:
+            return None
+
+        return hash(key) % len(self.workers)
+
+    def confirmation(self, client, pdu):
+        if _debug: FarmMultiplexer._debug("confirmation %r %r", client, pdu)
+
+        # if this came from ourselves, dump it
+        if pdu.pduSource == self.addrTuple:
+            if _debug: FarmMultiplexer._debug("    - from us!")
+            return
+
+        data = pdu.pduData
+        if (not data) or (data[0] != 0x81):
+            UDPMultiplexer.confirmation(self, client, pdu)
+            return
+
+        flags = _BROADCAST_FLAG if (client is self.broadcast) else 0
+        record = _pack_datagram(pdu.pduSource, bytes(data), flags)
+
+        index = self.worker_index(pdu.pduSource, data)
+        if _debug: FarmMultiplexer._debug("    - index: %r", index)
+
+        if index is None:
+            for worker in self.workers:
+                worker.send(record)
+        else:
+            self.workers[index].send(record)
+
+    def worker_request(self, worker, addr, data):
+        """A worker has a datagram to send."""
+        if _debug: FarmMultiplexer._debug("worker_request %r %r %r", worker, addr, data)
+
+        # remember who sent a confirmed request
+        if (len(data) > 1) and (data[1] == 0x0A):
+            addresses = _npdu_addresses(data, 4)
+            if addresses:
+                dnet, dadr, snet, sadr, apdu = addresses
+                if (len(data) > apdu + 2) and (data[apdu] >> 4 == 0):
+                    self.transactions[(addr, dnet, dadr, data[apdu + 2])] = worker.index
+
+        self.directPort.indication(PDU(data, destination=addr))
+
+    def close(self):
+        """Stop the workers."""
+        if _debug: FarmMultiplexer._debug("close")
+
+        self.running = False
+        for worker in self.workers:
+            worker.close()
+
+#
+#   FarmWorkerMultiplexer
+#
+#   In a worker process this takes the place of a UDPMultiplexer, the
+#   datagrams come from and go back to the front end.
+#
+
+@bacpypes_debugging
+class FarmWorkerMultiplexer:
+
+    def __init__(self, address, addrBroadcastTuple, index, inbound, outbound, doorbell):
+        if _debug: FarmWorkerMultiplexer._debug("__init__ %r %r %r %r %r %r", address, addrBroadcastTuple, index, inbound, outbound, doorbell)
+
+        self.index = index
+        self.inbound = inbound
+        self.outbound = outbound
+
+        # same addresses as the front end
+        self.address = address
+        self.addrBroadcastTuple = addrBroadcastTuple
+
+        self.doorbell = _Doorbell(doorbell, self.inbound_ready)
+
+        # only Annex J
+        self.annexJ = _MultiplexServer(self)
+
+    def indication(self, server, pdu):
+        if _debug: FarmWorkerMultiplexer._debug("indication %r %r", server, pdu)
+
+        # check for a broadcast message
+        if pdu.pduDestination.addrType == Address.localBroadcastAddr:
+            dest = self.addrBroadcastTuple
+        elif pdu.pduDestination.addrType == Address.localStationAddr:
+            dest = pdu.pduDestination.addrTuple
+        else:
+            raise RuntimeError("invalid destination address type")
+
+        if self.outbound.put(_pack_datagram(dest, pdu.pduData)):
+            self.doorbell.ring()
+        elif _debug:
+            FarmWorkerMultiplexer._debug("    - outbound ring full, dropped")
+
+    def inbound_ready(self):
+        """The front end has datagrams for this worker."""
+        while True:
+            record = self.inbound.get()
+            if record is None:
+                break
+
+            flags, addr, data = _unpack_datagram(record)
+            if flags & _BROADCAST_FLAG:
+                dest = LocalBroadcast()
+            else:
+                dest = self.address
+
+            if self.annexJ.serverPeer:
+                self.annexJ.response(PDU(data, source=Address(addr), destination=dest))
+
+        # the front end has gone away
+        if self.doorbell.closed:
+            core.stop()
+
+#
+#   BIPFarmApplication
+#
+
+@bacpypes_debugging
+class BIPFarmApplication(Application):
+
+    """Like a BIPSimpleApplication, but bound to a FarmWorkerMultiplexer
+    rather than a socket."""
+
+    def __init__(self, localDevice, mux, deviceInfoCache=None, aseID=None):
+        if _debug: BIPFarmApplication._debug("__init__ %r %r deviceInfoCache=%r aseID=%r", localDevice, mux, deviceInfoCache, aseID)
+        Application.__init__(self, localDevice, mux.address, deviceInfoCache, aseID)
+
+        # include a application decoder
+        self.asap = ApplicationServiceAccessPoint()
+
+        # pass the device object to the state machine access point so it
+        # can know if it should support segmentation
+        self.smap = StateMachineAccessPoint(localDevice)
+
+        # the segmentation state machines need access to the same device
+        # information cache as the application
+        self.smap.deviceInfoCache = self.deviceInfoCache
+
+        # a network service access point will be needed
+        self.nsap = NetworkServiceAccessPoint()
+
+        # give the NSAP a generic network layer service element
+        self.nse = NetworkServiceElement()
+        bind(self.nse, self.nsap)
+
+        # bind the top layers
+        bind(self, self.asap, self.smap, self.nsap)
+
+        # create a generic BIP stack, bound to the worker multiplexer
+        self.bip = BIPSimple()
+        self.annexj = AnnexJCodec()
+        self.mux = mux
+
+        # bind the bottom layers
+        bind(self.bip, self.annexj, self.mux.annexJ)
+
+        # bind the BIP stack to the network, no network number
+        self.nsap.bind(self.bip)
+
+#
+#   _worker_main
+#
+
+def _worker_main(index, address, addrBroadcastTuple, inboundName, outboundName, doorbell, appFactory):
+    """Run in a new worker process."""
+    inbound = ShmRing(inboundName)
+    outbound = ShmRing(outboundName)
+
+    mux = FarmWorkerMultiplexer(address, addrBroadcastTuple, index, inbound, outbound, doorbell)
+
+    # the application keeps references to the stack
+    app = appFactory(mux)
+
+    try:
+        core.run()
+    finally:
+        inbound.close()
+        outbound.close()
@@ -0,0 +1,144 @@
+#!/usr/bin/python
+
+"""
+Loop Statistics
+"""
+
+from time import time as _time
+from bisect import bisect_right
+
+from .debugging import bacpypes_debugging, DebugContents, ModuleLogger
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   Histogram
+#
+
+@bacpypes_debugging
+class Histogram(DebugContents):
+
+    _debug_contents = ('count', 'total', 'maximum', 'counts')
+
+    # upper bounds of the buckets in seconds, the last one is open
+    bounds = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+    def __init__(self):
+        if _debug: Histogram._debug("__init__")
+
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def record(self, value):
+        """Add a value, in seconds, to the histogram."""
+        if value < 0.0:
+            value = 0.0
+
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+        self.counts[bisect_right(self.bounds, value)] += 1
+
+    def snapshot(self):
+        """Return the contents as a dict."""
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': (self.total / self.count) if self.count else 0.0,
+            'max': self.maximum,
+            'buckets': list(zip(self.bounds + (None,), self.counts)),
+            }
+
+#
+#   LoopStats
+#
+#   An instance of this class collects the timing of the core loop, the
+#   lateness of tasks compared to when they were scheduled, how long each
+#   task and deferred function takes, and how long the loop waits for
+#   socket activity.  The time spent in tasks and deferred functions is
+#   also totalled by name to find the slow ones.
+#
+
+@bacpypes_debugging
+class LoopStats(DebugContents):
+
+    _debug_contents = ('iterations', 'lateness', 'tasks', 'deferred', 'poll')
+
+    def __init__(self):
+        if _debug: LoopStats._debug("__init__")
+        self.reset()
+
+    def reset(self):
+        """Start over."""
+        if _debug: LoopStats._debug("reset")
+
+        self.started = _time()
+        self.iterations = 0
+
+        self.lateness = Histogram()
+        self.tasks = Histogram()
+        self.deferred = Histogram()
+        self.poll = Histogram()
+
+        # name -> [count, total, maximum]
+        self.byName = {}
+
+    def _by_name(self, name, elapsed):
+        entry = self.byName.get(name)
+        if entry is None:
+            self.byName[name] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+    def process_task(self, task_manager, task):
+        """Process a task for the task manager, recording how late it is
+        and how long it takes."""
+        self.lateness.record(task_manager.get_time() - task.taskTime)
+
+        # function tasks are named by their function
+        fn = getattr(task, 'fn', None)
+        if fn is None:
+            name = task.__class__.__name__
+        else:
+            name = getattr(fn, '__qualname__', None) or repr(fn)
+
+        start = _time()
+        try:
+            task_manager.process_task(task)
+        finally:
+            elapsed = _time() - start
+            self.tasks.record(elapsed)
+            self._by_name(name, elapsed)
+
+    def call(self, fn, args, kwargs):
+        """Call a deferred function, recording how long it takes."""
+        start = _time()
+        try:
+            fn(*args, **kwargs)
+        finally:
+            elapsed = _time() - start
+            self.deferred.record(elapsed)
+            self._by_name(getattr(fn, '__qualname__', None) or repr(fn), elapsed)
+
+    def snapshot(self):
+        """Return the statistics as a dict."""
+        return {
+            'elapsed': _time() - self.started,
+            'iterations': self.iterations,
+            'lateness': self.lateness.snapshot(),
+            'tasks': self.tasks.snapshot(),
+            'deferred': self.deferred.snapshot(),
+            'poll': self.poll.snapshot(),
+            'byName': dict(
+                (name, {'count': count, 'total': total, 'max': maximum})
+                for name, (count, total, maximum) in self.byName.items()
+                ),
+            }
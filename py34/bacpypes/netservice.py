@@ -554,7 +554,6 @@ class NetworkServiceAccessPoint(ServiceAccessPoint, Server, DebugContents):
         # encode it as a generic NPDU
         xpdu = NPDU(user_data=npdu.pduUserData)
         npdu.encode(xpdu)
-        npdu._xpdu = xpdu
 
         # tell the adapter to process the NPDU
         adapter.process_npdu(xpdu)
@@ -565,7 +564,6 @@ class NetworkServiceAccessPoint(ServiceAccessPoint, Server, DebugContents):
         # encode it as a generic NPDU
         xpdu = NPDU(user_data=npdu.pduUserData)
         npdu.encode(xpdu)
-        npdu._xpdu = xpdu
 
         # tell the adapter to process the NPDU
         adapter.process_npdu(xpdu)
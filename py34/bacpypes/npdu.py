@@ -27,6 +27,10 @@ def register_npdu_type(klass):
 @bacpypes_debugging
 class NPCI(PCI, DebugContents):
 
+    __slots__ = ('npduVersion', 'npduControl', 'npduDADR', 'npduSADR'
+        , 'npduHopCount', 'npduNetMessage', 'npduVendorID'
+        )
+
     _debug_contents = ('npduVersion', 'npduControl', 'npduDADR', 'npduSADR'
         , 'npduHopCount', 'npduNetMessage', 'npduVendorID'
         )
@@ -257,6 +261,8 @@ class NPCI(PCI, DebugContents):
 @bacpypes_debugging
 class NPDU(NPCI, PDUData):
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super(NPDU, self).__init__(*args, **kwargs)
 
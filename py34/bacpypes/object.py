@@ -222,11 +222,14 @@ class Property:
             # seems to be OK, let the array object take over
             if _debug: Property._debug("    - forwarding to array")
             arry[arrayIndex] = value
+        else:
+            # seems to be OK
+            obj._values[self.identifier] = value
 
-            return
-
-        # seems to be OK
-        obj._values[self.identifier] = value
+        # responses encoded with the old value are out of date
+        app = getattr(obj, '_app', None)
+        if app:
+            app.invalidate_responses(obj)
 
 #
 #   StandardProperty
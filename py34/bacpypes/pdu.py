@@ -8,8 +8,10 @@ import re
 import socket
 import struct
 
+from collections import OrderedDict
+
 from .debugging import ModuleLogger, bacpypes_debugging, btox, xtob
-from .comm import PCI as _PCI, PDUData
+from .comm import PCI as _PCI, PDUData, PDUCursor as _PDUCursor
 
 # pack/unpack constants
 _short_mask = 0xFFFF
@@ -28,6 +30,12 @@ ethernet_re = re.compile(r'^([0-9A-Fa-f][0-9A-Fa-f][:]){5}([0-9A-Fa-f][0-9A-Fa-f
 
 @bacpypes_debugging
 class Address:
+
+    __slots__ = ('addrType', 'addrNet', 'addrAddr', 'addrLen',
+        'addrIP', 'addrMask', 'addrHost', 'addrSubnet', 'addrPort',
+        'addrTuple', 'addrBroadcastTuple',
+        )
+
     nullAddr = 0
     localBroadcastAddr = 1
     localStationAddr = 2
@@ -306,9 +314,13 @@ class Address:
         return hash( (self.addrType, self.addrNet, self.addrAddr) )
 
     def __eq__(self,arg):
+        # the same address, which is likely when they are shared
+        if arg is self:
+            return True
+
         # try an coerce it into an address
         if not isinstance(arg, Address):
-            arg = Address(arg)
+            arg = intern_address(arg)
 
         # all of the components must match
         return (self.addrType == arg.addrType) and (self.addrNet == arg.addrNet) and (self.addrAddr == arg.addrAddr)
@@ -323,6 +335,42 @@ class Address:
         # exception to the rule of returning a dict
         return str(self)
 
+#
+#   intern_address
+#
+#   Addresses built from the same string, tuple or octets are the same, so
+#   the ones built by intern_address() are kept and shared rather than
+#   parsed again.  The least recently used ones are dropped when there are
+#   more than addressCacheSize of them, so packets from many sources do not
+#   grow the cache without limit.
+#
+
+addressCacheSize = 1024
+_address_cache = OrderedDict()
+
+def intern_address(arg):
+    """Return the address of a string, tuple or octet string like Address(arg)
+    does, but the same instance every time.  Shared addresses must not be
+    changed."""
+    if isinstance(arg, bytearray):
+        arg = bytes(arg)
+    elif not isinstance(arg, (str, tuple, bytes)):
+        return Address(arg)
+
+    try:
+        addr = _address_cache[arg]
+    except KeyError:
+        addr = _address_cache[arg] = Address(arg)
+        if len(_address_cache) > addressCacheSize:
+            _address_cache.popitem(last=False)
+    except TypeError:
+        # a tuple with something unhashable in it
+        return Address(arg)
+    else:
+        _address_cache.move_to_end(arg)
+
+    return addr
+
 #
 #   pack_ip_addr, unpack_ip_addr
 #
@@ -345,6 +393,8 @@ def unpack_ip_addr(addr):
 
 class LocalStation(Address):
 
+    __slots__ = ()
+
     def __init__(self, addr):
         self.addrType = Address.localStationAddr
         self.addrNet = None
@@ -371,6 +421,8 @@ class LocalStation(Address):
 
 class RemoteStation(Address):
 
+    __slots__ = ()
+
     def __init__(self, net, addr):
         if not isinstance(net, int):
             raise TypeError("integer network required")
@@ -402,6 +454,8 @@ class RemoteStation(Address):
 
 class LocalBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self):
         self.addrType = Address.localBroadcastAddr
         self.addrNet = None
@@ -414,6 +468,8 @@ class LocalBroadcast(Address):
 
 class RemoteBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self, net):
         if not isinstance(net, int):
             raise TypeError("integer network required")
@@ -431,6 +487,8 @@ class RemoteBroadcast(Address):
 
 class GlobalBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self):
         self.addrType = Address.globalBroadcastAddr
         self.addrNet = None
@@ -444,6 +502,8 @@ class GlobalBroadcast(Address):
 @bacpypes_debugging
 class PCI(_PCI):
 
+    __slots__ = ('pduExpectingReply', 'pduNetworkPriority')
+
     _debug_contents = ('pduExpectingReply', 'pduNetworkPriority')
 
     def __init__(self, *args, **kwargs):
@@ -500,6 +560,33 @@ class PCI(_PCI):
 
         return self.pci_contents(use_dict=use_dict, as_class=as_class)
 
+#
+#   PDUCursor
+#
+
+@bacpypes_debugging
+class PDUCursor(_PDUCursor):
+
+    __slots__ = ('pduExpectingReply', 'pduNetworkPriority')
+
+    def __init__(self, data, **kwargs):
+        if _debug: PDUCursor._debug("__init__ %r %r", data, kwargs)
+
+        # pick up some optional kwargs
+        expecting_reply = kwargs.pop('expectingReply', 0)
+        network_priority = kwargs.pop('networkPriority', 0)
+
+        # carry them from another PDU
+        if isinstance(data, PCI):
+            expecting_reply = expecting_reply or data.pduExpectingReply
+            network_priority = network_priority or data.pduNetworkPriority
+
+        _PDUCursor.__init__(self, data, **kwargs)
+
+        # the BACnet PCI fields
+        self.pduExpectingReply = expecting_reply
+        self.pduNetworkPriority = network_priority
+
 #
 #   PDU
 #
@@ -507,6 +594,8 @@ class PCI(_PCI):
 @bacpypes_debugging
 class PDU(PCI, PDUData):
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         if _debug: PDU._debug("__init__ %r %r", args, kwargs)
         super(PDU, self).__init__(*args, **kwargs)
@@ -12,18 +12,23 @@ import re
 from .debugging import ModuleLogger, btox
 
 from .errors import DecodingError, InvalidTag, InvalidParameterDatatype
-from .pdu import PDUData
+from .pdu import PDUData, PDUCursor
 
 # some debugging
 _debug = 0
 _log = ModuleLogger(globals())
 
+_short_struct = struct.Struct('>H')
+_long_struct = struct.Struct('>L')
+
 #
 #   Tag
 #
 
 class Tag(object):
 
+    __slots__ = ('tagClass', 'tagNumber', 'tagLVT', 'tagData')
+
     applicationTagClass     = 0
     contextTagClass         = 1
     openingTagClass         = 2
@@ -94,46 +99,19 @@ class Tag(object):
 
     def encode(self, pdu):
         """Encode a tag on the end of the PDU."""
-        # check for special encoding
-        if (self.tagClass == Tag.contextTagClass):
-            data = 0x08
-        elif (self.tagClass == Tag.openingTagClass):
-            data = 0x0E
-        elif (self.tagClass == Tag.closingTagClass):
-            data = 0x0F
-        else:
-            data = 0x00
+        tlvt = self.tagLVT
 
-        # encode the tag number part
-        if (self.tagNumber < 15):
-            data += (self.tagNumber << 4)
-        else:
-            data += 0xF0
-
-        # encode the length/value/type part
-        if (self.tagLVT < 5):
-            data += self.tagLVT
-        else:
-            data += 0x05
-
-        # save this and the extended tag value
-        pdu.put( data )
-        if (self.tagNumber >= 15):
-            pdu.put(self.tagNumber)
-
-        # really short lengths are already done
-        if (self.tagLVT >= 5):
-            if (self.tagLVT <= 253):
-                pdu.put( self.tagLVT )
-            elif (self.tagLVT <= 65535):
-                pdu.put( 254 )
-                pdu.put_short( self.tagLVT )
-            else:
-                pdu.put( 255 )
-                pdu.put_long( self.tagLVT )
+        # look up the header, short ones are kept
+        key = (self.tagClass, self.tagNumber, tlvt)
+        try:
+            header = _tag_headers[key]
+        except KeyError:
+            header = _tag_header(*key)
+            if (tlvt <= 253):
+                _tag_headers[key] = header
 
-        # now put the data
-        pdu.put_data(self.tagData)
+        # put the header and the data in one go
+        pdu.put_data(header + self.tagData)
 
     def decode(self, pdu):
         """Decode a tag from the PDU."""
@@ -264,12 +242,75 @@ class Tag(object):
         # data
         file.write("%stagData = '%s'\n" % ("    " * indent, btox(self.tagData,'.')))
 
+#
+#   Tag Headers
+#
+#   The octets in front of the data of a tag only depend on its class, number
+#   and length, so the header is built once for each combination and kept in
+#   a table.  The common ones are built here and the rest are added when they
+#   are first encoded.  Long lengths do not go in the table.
+#
+
+_tag_headers = {}
+
+def _tag_header(tclass, tnum, tlvt):
+    """Return the octets of the header of a tag."""
+    # check for special encoding
+    if (tclass == Tag.contextTagClass):
+        data = 0x08
+    elif (tclass == Tag.openingTagClass):
+        data = 0x0E
+    elif (tclass == Tag.closingTagClass):
+        data = 0x0F
+    else:
+        data = 0x00
+
+    # encode the tag number part
+    if (tnum < 15):
+        data += (tnum << 4)
+    else:
+        data += 0xF0
+
+    # encode the length/value/type part
+    if (tlvt < 5):
+        data += tlvt
+    else:
+        data += 0x05
+
+    # save this and the extended tag value
+    header = bytearray((data,))
+    if (tnum >= 15):
+        header.append(tnum)
+
+    # really short lengths are already done
+    if (tlvt >= 5):
+        if (tlvt <= 253):
+            header.append(tlvt)
+        elif (tlvt <= 65535):
+            header.append(254)
+            header += _short_struct.pack(tlvt)
+        else:
+            header.append(255)
+            header += _long_struct.pack(tlvt)
+
+    return bytes(header)
+
+for _tnum in range(15):
+    for _tlvt in range(5):
+        for _tclass in (Tag.applicationTagClass, Tag.contextTagClass):
+            _tag_headers[(_tclass, _tnum, _tlvt)] = _tag_header(_tclass, _tnum, _tlvt)
+    for _tclass in (Tag.openingTagClass, Tag.closingTagClass):
+        _tag_headers[(_tclass, _tnum, 0)] = _tag_header(_tclass, _tnum, 0)
+del _tnum, _tlvt, _tclass
+
 #
 #   ApplicationTag
 #
 
 class ApplicationTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, *args):
         if len(args) == 1 and isinstance(args[0], PDUData):
             Tag.__init__(self, args[0])
@@ -287,6 +328,8 @@ class ApplicationTag(Tag):
 
 class ContextTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, *args):
         if len(args) == 1 and isinstance(args[0], PDUData):
             Tag.__init__(self, args[0])
@@ -304,6 +347,8 @@ class ContextTag(Tag):
 
 class OpeningTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, context):
         if isinstance(context, PDUData):
             Tag.__init__(self, context)
@@ -320,6 +365,8 @@ class OpeningTag(Tag):
 
 class ClosingTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, context):
         if isinstance(context, PDUData):
             Tag.__init__(self, context)
@@ -336,32 +383,53 @@ class ClosingTag(Tag):
 
 class TagList(object):
 
+    """A list of tags that are consumed from the front.  Popping a tag
+    moves an index along rather than shifting the list, and a position can
+    be saved with tell() and returned to with seek()."""
+
     def __init__(self, arg=None):
-        self.tagList = []
+        # the tags and the index of the first one not consumed
+        self._tags = []
+        self._index = 0
 
         if isinstance(arg, list):
-            self.tagList = arg
+            self._tags = arg
         elif isinstance(arg, TagList):
-            self.tagList = arg.tagList[:]
+            self._tags = arg.tagList[:]
         elif isinstance(arg, PDUData):
             self.decode(arg)
 
+    @property
+    def tagList(self):
+        """The list of tags that have not been consumed.  The consumed tags
+        are removed first, so saved positions are no longer valid."""
+        if self._index:
+            del self._tags[:self._index]
+            self._index = 0
+
+        return self._tags
+
+    @tagList.setter
+    def tagList(self, tags):
+        self._tags = tags
+        self._index = 0
+
     def append(self, tag):
-        self.tagList.append(tag)
+        self._tags.append(tag)
 
     def extend(self, taglist):
-        self.tagList.extend(taglist)
+        self._tags.extend(taglist)
 
     def __getitem__(self, item):
         return self.tagList[item]
 
     def __len__(self):
-        return len(self.tagList)
+        return len(self._tags) - self._index
 
     def Peek(self):
         """Return the tag at the front of the list."""
-        if self.tagList:
-            tag = self.tagList[0]
+        if self._index < len(self._tags):
+            tag = self._tags[self._index]
         else:
             tag = None
 
@@ -369,24 +437,39 @@ class TagList(object):
 
     def push(self, tag):
         """Return a tag back to the front of the list."""
-        self.tagList = [tag] + self.tagList
+        if self._index:
+            self._index -= 1
+            self._tags[self._index] = tag
+        else:
+            self._tags.insert(0, tag)
 
     def Pop(self):
         """Remove the tag from the front of the list and return it."""
-        if self.tagList:
-            tag = self.tagList[0]
-            del self.tagList[0]
+        if self._index < len(self._tags):
+            tag = self._tags[self._index]
+            self._index += 1
         else:
             tag = None
 
         return tag
 
+    def tell(self):
+        """Return the position of the front of the list."""
+        return self._index
+
+    def seek(self, position):
+        """Return to a position from tell(), putting back the tags that were
+        popped since then."""
+        self._index = position
+
     def get_context(self, context):
         """Return a tag or a list of tags context encoded."""
+        tagList = self.tagList
+
         # forward pass
         i = 0
-        while i < len(self.tagList):
-            tag = self.tagList[i]
+        while i < len(tagList):
+            tag = tagList[i]
 
             # skip application stuff
             if tag.tagClass == Tag.applicationTagClass:
@@ -403,8 +486,8 @@ class TagList(object):
                 rslt = []
                 i += 1
                 lvl = 0
-                while i < len(self.tagList):
-                    tag = self.tagList[i]
+                while i < len(tagList):
+                    tag = tagList[i]
                     if tag.tagClass == Tag.openingTagClass:
                         lvl += 1
                     elif tag.tagClass == Tag.closingTagClass:
@@ -437,8 +520,14 @@ class TagList(object):
 
     def decode(self, pdu):
         """decode the tags from a PDU."""
-        while pdu.pduData:
-            self.tagList.append( Tag(pdu) )
+        cursor = PDUCursor(pdu.pduData)
+        try:
+            while cursor.pduOffset < cursor.pduLength:
+                self._tags.append( Tag(cursor) )
+        finally:
+            # the octets that were read are consumed, even after an error
+            pdu.pduData = bytearray(cursor.pduData)
+            cursor.release()
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         for tag in self.tagList:
@@ -588,6 +677,23 @@ class Boolean(Atomic):
     def __str__(self):
         return "Boolean(%s)" % (str(self.value), )
 
+#
+#   _unsigned_octets
+#
+#   Most unsigned and enumerated values fit in one octet, so those
+#   encodings are built once.  Larger values are packed and the leading
+#   zeros dropped.
+#
+
+_small_unsigned_octets = [bytes((i,)) for i in range(256)]
+
+def _unsigned_octets(value):
+    """Return the octets of an unsigned value in the fewest octets."""
+    if 0 <= value < 256:
+        return _small_unsigned_octets[value]
+
+    return _long_struct.pack(value).lstrip(b'\x00')
+
 #
 #   Unsigned
 #
@@ -613,15 +719,8 @@ class Unsigned(Atomic):
             raise TypeError("invalid constructor datatype")
 
     def encode(self, tag):
-        # rip apart the number
-        data = bytearray(struct.pack('>L', self.value))
-
-        # reduce the value to the smallest number of octets
-        while (len(data) > 1) and (data[0] == 0):
-            del data[0]
-
         # encode the tag
-        tag.set_app_data(Tag.unsignedAppTag, data)
+        tag.set_app_data(Tag.unsignedAppTag, _unsigned_octets(self.value))
 
     def decode(self, tag):
         if (tag.tagClass != Tag.applicationTagClass) or (tag.tagNumber != Tag.unsignedAppTag):
@@ -630,13 +729,31 @@ class Unsigned(Atomic):
             raise InvalidTag("invalid tag length")
 
         # get the data
-        rslt = 0
-        for c in tag.tagData:
-            rslt = (rslt << 8) + c
+        rslt = int.from_bytes(tag.tagData, 'big')
 
         # save the result
         self.value = rslt
 
+    @classmethod
+    def encode_octets(cls, arg):
+        """Return the encoded octets of a value without creating an
+        instance."""
+        if not isinstance(arg, int):
+            raise TypeError("invalid constructor datatype")
+        if (arg < 0):
+            raise ValueError("unsigned integer required")
+
+        return _unsigned_octets(arg)
+
+    @classmethod
+    def decode_octets(cls, data):
+        """Return the value of the encoded octets without creating an
+        instance."""
+        if len(data) == 0:
+            raise InvalidTag("invalid tag length")
+
+        return int.from_bytes(data, 'big')
+
     @classmethod
     def is_valid(cls, arg):
         """Return True if arg is valid value for the class."""
@@ -916,6 +1033,14 @@ class CharacterString(Atomic):
 #   BitString
 #
 
+# bits and the digits of their binary representation
+_bit_values = frozenset([0, 1])
+_bits_to_digits = bytes.maketrans(b'\x00\x01', b'01')
+_digits_to_bits = bytes.maketrans(b'01', b'\x00\x01')
+
+# decoded bits of the one octet strings, which are most of them
+_short_bit_strings = {}
+
 class BitString(Atomic):
 
     _app_tag = Tag.bitStringAppTag
@@ -930,14 +1055,9 @@ class BitString(Atomic):
         elif isinstance(arg, Tag):
             self.decode(arg)
         elif isinstance(arg, list):
-            allInts = allStrings = True
-            for elem in arg:
-                allInts = allInts and ((elem == 0) or (elem == 1))
-                allStrings = allStrings and elem in self.bitNames
-
-            if allInts:
+            if _bit_values.issuperset(arg):
                 self.value = arg
-            elif allStrings:
+            elif all(elem in self.bitNames for elem in arg):
                 for bit in arg:
                     bit = self.bitNames[bit]
                     if (bit < 0) or (bit > len(self.value)):
@@ -950,21 +1070,36 @@ class BitString(Atomic):
         else:
             raise TypeError("invalid constructor datatype")
 
+    def get_long(self):
+        """Return the bits as an unsigned integer, the first bit is the most
+        significant one like it is in the encoding."""
+        if not self.value:
+            return 0
+
+        # the bits are the binary digits of the number
+        return int(bytes(self.value).translate(_bits_to_digits), 2)
+
+    def set_long(self, value, length=None):
+        """Set the bits from an unsigned integer, the first bit is the most
+        significant one.  The length defaults to the current length."""
+        if length is None:
+            length = len(self.value)
+        if (value < 0) or (value >> length):
+            raise ValueError("value does not fit in %d bits" % (length,))
+
+        if length == 0:
+            self.value = []
+        else:
+            self.value = list(format(value, '0%db' % (length,)).encode('ascii').translate(_digits_to_bits))
+
     def encode(self, tag):
         # compute the unused bits to fill out the string
         _, used = divmod(len(self.value), 8)
         unused = used and (8 - used) or 0
 
-        # start with the number of unused bits
-        data = bytearray([unused])
-
-        # build and append each packed octet
-        bits = self.value + [0] * unused
-        for i in range(0,len(bits),8):
-            x = 0
-            for j in range(0,8):
-                x |= bits[i + j] << (7 - j)
-            data.append(x)
+        # the number of unused bits followed by the packed octets
+        data = bytes([unused]) + (self.get_long() << unused).to_bytes(
+            (len(self.value) + unused) // 8, 'big')
 
         # encode the tag
         tag.set_app_data(Tag.bitStringAppTag, data)
@@ -975,25 +1110,29 @@ class BitString(Atomic):
         if len(tag.tagData) == 0:
             raise InvalidTag("invalid tag length")
 
-        tag_data = bytearray(tag.tagData)
+        tag_data = tag.tagData
+
+        # there are not many short ones, keep them
+        short = (len(tag_data) <= 2)
+        if short:
+            tag_data = bytes(tag_data)
+            bits = _short_bit_strings.get(tag_data)
+            if bits is not None:
+                self.value = list(bits)
+                return
 
         # extract the number of unused bits
         unused = tag_data[0]
 
-        # extract the data
-        data = []
-        for x in tag_data[1:]:
-            for i in range(8):
-                if (x & (1 << (7 - i))) != 0:
-                    data.append( 1 )
-                else:
-                    data.append( 0 )
-
-        # trim off the unused bits
-        if unused:
-            self.value = data[:-unused]
+        # extract the data and trim off the unused bits
+        length = (len(tag_data) - 1) * 8 - unused
+        if length <= 0:
+            self.value = []
         else:
-            self.value = data
+            self.set_long(int.from_bytes(tag_data[1:], 'big') >> unused, length)
+
+        if short:
+            _short_bit_strings[tag_data] = tuple(self.value)
 
     @classmethod
     def is_valid(cls, arg):
@@ -1071,6 +1210,8 @@ class Enumerated(Atomic):
 
     enumerations = {}
     _xlate_table = {}
+    _value_table = {}
+    _name_table = {}
 
     def __init__(self, arg=None):
         self.value = int(0)
@@ -1089,10 +1230,10 @@ class Enumerated(Atomic):
                 raise ValueError("unsigned integer required")
 
             # convert it to a string if you can
-            self.value = self._xlate_table.get(arg, arg)
+            self.value = self._name_table.get(arg, arg)
 
         elif isinstance(arg, str):
-            if arg not in self._xlate_table:
+            if arg not in self._value_table:
                 raise ValueError("undefined enumeration '%s'" % (arg,))
             self.value = arg
         elif isinstance(arg, Enumerated):
@@ -1107,20 +1248,19 @@ class Enumerated(Atomic):
         if isinstance(self.value, int):
             return self.value
         elif isinstance(self.value, str):
-            return int(self._xlate_table[self.value])
+            return self._value_table[self.value]
         else:
             raise TypeError("%s is an invalid enumeration value datatype" % (type(self.value),))
 
     def keylist(self):
         """Return a list of names in order by value."""
-        items = self.enumerations.items()
-        items.sort(lambda a, b: self.cmp(a[1], b[1]))
+        names = self._name_table
 
         # last item has highest value
-        rslt = [None] * (items[-1][1] + 1)
+        rslt = [None] * (max(names) + 1)
 
         # map the values
-        for key, value in items:
+        for value, key in names.items():
             rslt[value] = key
 
         # return the result
@@ -1149,19 +1289,12 @@ class Enumerated(Atomic):
         if isinstance(self.value, int):
             value = int(self.value)
         elif isinstance(self.value, str):
-            value = self._xlate_table[self.value]
+            value = self._value_table[self.value]
         else:
             raise TypeError("%s is an invalid enumeration value datatype" % (type(self.value),))
 
-        # rip apart the number
-        data = bytearray(struct.pack('>L', value))
-
-        # reduce the value to the smallest number of octets
-        while (len(data) > 1) and (data[0] == 0):
-            del data[0]
-
         # encode the tag
-        tag.set_app_data(Tag.enumeratedAppTag, data)
+        tag.set_app_data(Tag.enumeratedAppTag, _unsigned_octets(value))
 
     def decode(self, tag):
         if (tag.tagClass != Tag.applicationTagClass) or (tag.tagNumber != Tag.enumeratedAppTag):
@@ -1170,16 +1303,43 @@ class Enumerated(Atomic):
             raise InvalidTag("invalid tag length")
 
         # get the data
-        rslt = 0
-        for c in tag.tagData:
-            rslt = (rslt << 8) + c
+        rslt = int.from_bytes(tag.tagData, 'big')
 
         # translate to a string if possible
-        rslt = self._xlate_table.get(rslt, rslt)
+        rslt = self._name_table.get(rslt, rslt)
 
         # save the result
         self.value = rslt
 
+    @classmethod
+    def encode_octets(cls, arg):
+        """Return the encoded octets of a name or a value, the same ones an
+        instance would encode but without creating one."""
+        if isinstance(arg, str):
+            value = cls._value_table.get(arg)
+            if value is None:
+                raise ValueError("undefined enumeration '%s'" % (arg,))
+        elif isinstance(arg, int):
+            if (arg < 0):
+                raise ValueError("unsigned integer required")
+            value = arg
+        elif isinstance(arg, Enumerated):
+            return cls.encode_octets(arg.value)
+        else:
+            raise TypeError("invalid constructor datatype")
+
+        return _unsigned_octets(value)
+
+    @classmethod
+    def decode_octets(cls, data):
+        """Return the name, or the value if it has no name, of the encoded
+        octets without creating an instance."""
+        if len(data) == 0:
+            raise InvalidTag("invalid tag length")
+
+        value = int.from_bytes(data, 'big')
+        return cls._name_table.get(value, value)
+
     @classmethod
     def is_valid(cls, arg):
         """Return True if arg is valid value for the class.  If the string
@@ -1213,6 +1373,24 @@ def expand_enumerations(klass):
     # save the dictionary in the class
     setattr(klass, '_xlate_table', xlateTable)
 
+    # split it into values by name and names by value, so the encoders and
+    # decoders look in the one they need.  Values in the vendor range that
+    # have no name are not in either one and stay integers.
+    setattr(klass, '_value_table', dict(
+        (k, v) for k, v in xlateTable.items() if isinstance(k, str)
+        ))
+    setattr(klass, '_name_table', dict(
+        (k, v) for k, v in xlateTable.items() if isinstance(k, int)
+        ))
+
+def enumeration_tables(klass):
+    """Return the values by name and the names by value of an enumeration
+    class without creating an instance, expanding it if necessary."""
+    if '_value_table' not in klass.__dict__:
+        expand_enumerations(klass)
+
+    return (klass._value_table, klass._name_table)
+
 #
 #   Date
 #
@@ -1583,6 +1761,10 @@ expand_enumerations(ObjectType)
 #   ObjectIdentifier
 #
 
+# encoded object identifiers by object type class and value
+_object_identifier_octets = {}
+_object_identifier_cache_size = 4096
+
 class ObjectIdentifier(Atomic):
 
     _app_tag = Tag.objectIdentifierAppTag
@@ -1613,13 +1795,15 @@ class ObjectIdentifier(Atomic):
             raise ValueError("invalid constructor parameters")
 
     def set_tuple(self, objType, objInstance):
+        values, names = enumeration_tables(self.objectTypeClass)
+
         # allow a type name as well as an integer
         if isinstance(objType, int):
             # try and make it pretty
-            objType = self.objectTypeClass._xlate_table.get(objType, objType)
+            objType = names.get(objType, objType)
         elif isinstance(objType, str):
             # make sure the type is known
-            if objType not in self.objectTypeClass._xlate_table:
+            if objType not in values:
                 raise ValueError("unrecognized object type '%s'" % (objType,))
         else:
             raise TypeError("invalid datatype for objType: %r, %r" % (type(objType), objType))
@@ -1639,7 +1823,7 @@ class ObjectIdentifier(Atomic):
             pass
         elif isinstance(objType, str):
             # turn it back into an integer
-            objType = self.objectTypeClass()[objType]
+            objType = enumeration_tables(self.objectTypeClass)[0][objType]
         else:
             raise TypeError("invalid datatype for objType")
 
@@ -1651,7 +1835,7 @@ class ObjectIdentifier(Atomic):
         objType = (value >> 22) & 0x03FF
 
         # try and make it pretty
-        objType = self.objectTypeClass()[objType] or objType
+        objType = enumeration_tables(self.objectTypeClass)[1].get(objType, objType)
 
         # suck out the instance
         objInstance = value & 0x003FFFFF
@@ -1667,8 +1851,19 @@ class ObjectIdentifier(Atomic):
         return ((objType << 22) + objInstance)
 
     def encode(self, tag):
+        # the same identifiers are encoded over and over
+        key = (self.objectTypeClass, self.value)
+        data = _object_identifier_octets.get(key)
+        if data is None:
+            data = struct.pack('>L', self.get_long())
+
+            # start over rather than grow without limit
+            if len(_object_identifier_octets) >= _object_identifier_cache_size:
+                _object_identifier_octets.clear()
+            _object_identifier_octets[key] = data
+
         # encode the tag
-        tag.set_app_data(Tag.objectIdentifierAppTag, struct.pack('>L', self.get_long()))
+        tag.set_app_data(Tag.objectIdentifierAppTag, data)
 
     def decode(self, tag):
         if (tag.tagClass != Tag.applicationTagClass) or (tag.tagNumber != Tag.objectIdentifierAppTag):
@@ -1677,7 +1872,7 @@ class ObjectIdentifier(Atomic):
             raise InvalidTag("invalid tag length")
 
         # extract the data
-        self.set_long(struct.unpack('>L',tag.tagData)[0])
+        self.set_long(int.from_bytes(tag.tagData, 'big'))
 
     @classmethod
     def is_valid(cls, arg):
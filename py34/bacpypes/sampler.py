@@ -0,0 +1,129 @@
+#!/usr/bin/python
+
+"""
+Stack Sampler
+"""
+
+import os
+import sys
+import time
+
+from threading import Thread, main_thread
+
+from .debugging import bacpypes_debugging, ModuleLogger
+from .comm import Client, Server, ServiceAccessPoint, ApplicationServiceElement
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# classes that make up the layers of a stack
+_layer_classes = (Client, Server, ServiceAccessPoint, ApplicationServiceElement)
+
+#
+#   StackSampler
+#
+#   An instance of this class is a thread that looks at the stack of
+#   another thread, usually the one running the core, many times a second
+#   for a while.  The stacks are counted and written to a file in the
+#   collapsed stack format used by flame graph tools, one stack per line
+#   with the frames separated by semicolons and followed by the count.
+#   The first frame is the name of the innermost layer that was running,
+#   the class of the Client, Server, ServiceAccessPoint or
+#   ApplicationServiceElement that was 'self' in the frame.
+#
+
+@bacpypes_debugging
+class StackSampler(Thread):
+
+    def __init__(self, threadId=None, rate=100.0, duration=10.0, filename=None):
+        if _debug: StackSampler._debug("__init__ threadId=%r rate=%r duration=%r filename=%r", threadId, rate, duration, filename)
+        Thread.__init__(self, name="bacpypes-sampler", daemon=True)
+
+        if rate <= 0.0:
+            raise ValueError("rate must be positive")
+        if duration <= 0.0:
+            raise ValueError("duration must be positive")
+
+        if threadId is None:
+            threadId = main_thread().ident
+        if filename is None:
+            filename = "bacpypes-%d-%s.collapsed" % (os.getpid(), time.strftime("%Y%m%d-%H%M%S"))
+
+        self.threadId = threadId
+        self.rate = rate
+        self.duration = duration
+        self.filename = filename
+
+        # collapsed stack -> count
+        self.stacks = {}
+        self.samples = 0
+
+    def run(self):
+        if _debug: StackSampler._debug("run")
+
+        interval = 1.0 / self.rate
+        next_sample = time.time()
+        end_time = next_sample + self.duration
+
+        while next_sample < end_time:
+            frame = sys._current_frames().get(self.threadId)
+            if frame is None:
+                break
+
+            stack = self.collapse(frame)
+            del frame
+
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+            # stay on schedule, but don't try to catch up
+            next_sample += interval
+            delay = next_sample - time.time()
+            if delay > 0.0:
+                time.sleep(delay)
+            else:
+                next_sample = time.time()
+
+        self.write()
+
+    def collapse(self, frame):
+        """Return the frame and those that called it as a line of text,
+        outermost first, with the name of the innermost layer."""
+        names = []
+        layer = None
+
+        while frame:
+            code = frame.f_code
+            names.append("%s:%s" % (
+                os.path.basename(code.co_filename),
+                getattr(code, 'co_qualname', code.co_name),
+                ))
+
+            # look for the innermost layer
+            if (layer is None) and code.co_varnames and (code.co_varnames[0] == 'self'):
+                obj = frame.f_locals.get('self')
+                if isinstance(obj, _layer_classes):
+                    layer = obj.__class__.__name__
+
+            frame = frame.f_back
+
+        names.append(layer or "-")
+        names.reverse()
+
+        return ';'.join(name.replace(';', ':').replace(' ', '_') for name in names)
+
+    def write(self):
+        """Write the stacks to the file."""
+        if _debug: StackSampler._debug("write")
+
+        try:
+            with open(self.filename, 'w') as f:
+                for stack, count in sorted(self.stacks.items()):
+                    f.write("%s %d\n" % (stack, count))
+        except OSError as err:
+            StackSampler._error("unable to write %s: %s", self.filename, err)
+            return
+
+        sys.stderr.write("==== %d samples written to %s\n" % (self.samples, self.filename))
+        sys.stderr.flush()
@@ -48,12 +48,18 @@ else:
 
 class _Task(DebugContents, Logging):
 
+    __slots__ = ('taskTime', 'isScheduled', '_taskEntry', '_wheelEntry')
     _debug_contents = ('taskTime', 'isScheduled')
 
     def __init__(self):
         self.taskTime = None
         self.isScheduled = False
 
+        # the entry in the task manager heap or the timing wheel slot
+        # when this is scheduled
+        self._taskEntry = None
+        self._wheelEntry = None
+
     def install_task(self, when=None, delta=None):
         global _task_manager, _unscheduled_tasks
 
@@ -103,6 +109,8 @@ class _Task(DebugContents, Logging):
 
 class OneShotTask(_Task):
 
+    __slots__ = ()
+
     def __init__(self, when=None):
         _Task.__init__(self)
         self.taskTime = when
@@ -113,28 +121,48 @@ class OneShotTask(_Task):
 
 class OneShotDeleteTask(_Task):
 
+    __slots__ = ()
+
     def __init__(self, when=None):
         _Task.__init__(self)
         self.taskTime = when
 
 #
-#   OneShotFunction
+#   CallableTask
+#
+#   A one-shot task that calls a function with some arguments.
 #
 
 @bacpypes_debugging
-def OneShotFunction(fn, *args, **kwargs):
+class CallableTask(OneShotDeleteTask):
+
+    __slots__ = ('fn', 'args', 'kwargs')
+    _debug_contents = ('fn', 'args', 'kwargs')
 
-    class OneShotFunctionTask(OneShotDeleteTask):
+    def __init__(self, fn, *args, **kwargs):
+        OneShotDeleteTask.__init__(self)
 
-        def process_task(self):
-            OneShotFunction._debug("process_task %r %s %s", fn, repr(args), repr(kwargs))
-            fn(*args, **kwargs)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
 
-    task = OneShotFunctionTask()
+    def process_task(self):
+        if _debug: CallableTask._debug("process_task %r %r %r", self.fn, self.args, self.kwargs)
+        self.fn(*self.args, **self.kwargs)
+
+#
+#   OneShotFunction
+#
+
+@bacpypes_debugging
+def OneShotFunction(fn, *args, **kwargs):
+    if _debug: OneShotFunction._debug("OneShotFunction %r %r %r", fn, args, kwargs)
+
+    task = CallableTask(fn, *args, **kwargs)
 
     # if there is no task manager, postpone the install
     if not _task_manager:
-        _unscheduled_tasks.append(task)
+        task.install_task(0.0)
     else:
         task.install_task(_task_manager.get_time())
 
@@ -144,19 +172,11 @@ def OneShotFunction(fn, *args, **kwargs):
 #   FunctionTask
 #
 
+@bacpypes_debugging
 def FunctionTask(fn, *args, **kwargs):
-    _log.debug("FunctionTask %r %r %r", fn, args, kwargs)
-
-    class _FunctionTask(OneShotDeleteTask):
+    if _debug: FunctionTask._debug("FunctionTask %r %r %r", fn, args, kwargs)
 
-        def process_task(self):
-            _log.debug("process_task (%r %r %r)", fn, args, kwargs)
-            fn(*args, **kwargs)
-
-    task = _FunctionTask()
-    _log.debug("    - task: %r", task)
-
-    return task
+    return CallableTask(fn, *args, **kwargs)
 
 #
 #   RecurringTask
@@ -165,6 +185,7 @@ def FunctionTask(fn, *args, **kwargs):
 @bacpypes_debugging
 class RecurringTask(_Task):
 
+    __slots__ = ('taskInterval',)
     _debug_contents = ('taskInterval',)
 
     def __init__(self, interval=None):
@@ -202,25 +223,41 @@ class RecurringTask(_Task):
             _task_manager.install_task(self)
 
 #
-#   RecurringFunctionTask
+#   RecurringCallableTask
+#
+#   A recurring task that calls a function with some arguments.  Calling
+#   the task calls the function directly, so it can stand in for it.
 #
 
 @bacpypes_debugging
-def RecurringFunctionTask(interval, fn, *args, **kwargs):
-    if _debug: RecurringFunctionTask._debug("RecurringFunctionTask %r %r %r", fn, args, kwargs)
+class RecurringCallableTask(RecurringTask):
 
-    class _RecurringFunctionTask(RecurringTask):
-        def __init__(self, interval):
-            RecurringTask.__init__(self, interval)
+    __slots__ = ('fn', 'args', 'kwargs')
+    _debug_contents = ('fn', 'args', 'kwargs')
 
-        def process_task(self):
-            if _debug: RecurringFunctionTask._debug("process_task %r %r %r", fn, args, kwargs)
-            fn(*args, **kwargs)
+    def __init__(self, interval, fn, *args, **kwargs):
+        RecurringTask.__init__(self, interval)
 
-    task = _RecurringFunctionTask(interval)
-    if _debug: RecurringFunctionTask._debug("    - task: %r", task)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
 
-    return task
+    def process_task(self):
+        if _debug: RecurringCallableTask._debug("process_task %r %r %r", self.fn, self.args, self.kwargs)
+        self.fn(*self.args, **self.kwargs)
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+#
+#   RecurringFunctionTask
+#
+
+@bacpypes_debugging
+def RecurringFunctionTask(interval, fn, *args, **kwargs):
+    if _debug: RecurringFunctionTask._debug("RecurringFunctionTask %r %r %r", fn, args, kwargs)
+
+    return RecurringCallableTask(interval, fn, *args, **kwargs)
 
 #
 #   recurring_function
@@ -229,13 +266,9 @@ def RecurringFunctionTask(interval, fn, *args, **kwargs):
 @bacpypes_debugging
 def recurring_function(interval):
     def recurring_function_decorator(fn):
-        class _RecurringFunctionTask(RecurringTask):
-            def process_task(self):
-                if _debug: recurring_function._debug("process_task %r", fn)
-                fn()
-            def __call__(self, *args, **kwargs):
-                fn(*args, **kwargs)
-        task = _RecurringFunctionTask(interval)
+        if _debug: recurring_function._debug("recurring_function_decorator %r", fn)
+
+        task = RecurringCallableTask(interval, fn)
         task.install_task()
 
         return task
@@ -245,16 +278,27 @@ def recurring_function(interval):
 #
 #   TaskManager
 #
+#   The scheduled tasks are kept in a heap of (when, task) entries.  Rather
+#   than searching the heap when a task is suspended or rescheduled, the
+#   entry is left in place as a tombstone and the task forgets about it,
+#   so entries that are not the current entry of their task are skipped
+#   when they reach the top.  When more than half of the heap is made up
+#   of tombstones it is compacted.
+#
 
 # @bacpypes_debugging - implicit via metaclass
 class TaskManager(SingletonLogging):
 
+    # compacting a small heap isn't worth the effort
+    _compact_threshold = 64
+
     def __init__(self):
         if _debug: TaskManager._debug("__init__")
         global _task_manager, _unscheduled_tasks
 
         # initialize
         self.tasks = []
+        self.tombstones = 0
         if _Trigger:
             self.trigger = _Trigger()
         else:
@@ -282,12 +326,13 @@ class TaskManager(SingletonLogging):
         if task.taskTime is None:
             raise RuntimeError("task time is None")
 
-        # if this is already installed, suspend it
+        # if this is already installed, forget the old entry
         if task.isScheduled:
-            self.suspend_task(task)
+            self._remove_entry(task)
 
         # save this in the task list
-        heappush( self.tasks, (task.taskTime, task) )
+        task._taskEntry = entry = (task.taskTime, task)
+        heappush(self.tasks, entry)
         if _debug: TaskManager._debug("    - tasks: %r", self.tasks)
 
         task.isScheduled = True
@@ -300,14 +345,9 @@ class TaskManager(SingletonLogging):
         if _debug: TaskManager._debug("suspend_task %r", task)
 
         # remove this guy
-        for i, (when, curtask) in enumerate(self.tasks):
-            if task is curtask:
-                if _debug: TaskManager._debug("    - task found")
-                del self.tasks[i]
-
-                task.isScheduled = False
-                heapify(self.tasks)
-                break
+        if task.isScheduled:
+            if _debug: TaskManager._debug("    - task found")
+            self._remove_entry(task)
         else:
             if _debug: TaskManager._debug("    - task not found")
 
@@ -321,6 +361,47 @@ class TaskManager(SingletonLogging):
         # just re-install it
         self.install_task(task)
 
+    def _remove_entry(self, task):
+        """Turn the heap entry of a scheduled task into a tombstone."""
+        task._taskEntry = None
+        task.isScheduled = False
+
+        # compact the heap when it is mostly tombstones
+        self.tombstones += 1
+        if (self.tombstones > self._compact_threshold) and (self.tombstones * 2 > len(self.tasks)):
+            self.tasks = [entry for entry in self.tasks if entry[1]._taskEntry is entry]
+            heapify(self.tasks)
+            self.tombstones = 0
+
+    def peek_task(self):
+        """Return the (when, task) entry of the next task to be processed,
+        or (None, None) if there are no tasks scheduled."""
+        tasks = self.tasks
+
+        # toss out the tombstones that have made it to the top
+        while tasks:
+            entry = tasks[0]
+            if entry[1]._taskEntry is entry:
+                return entry
+
+            heappop(tasks)
+            self.tombstones -= 1
+
+        return (None, None)
+
+    def pop_task(self):
+        """Remove the next task to be processed and mark that it's no
+        longer scheduled, returning its (when, task) entry."""
+        when, task = self.peek_task()
+        if task is None:
+            raise RuntimeError("no tasks")
+
+        heappop(self.tasks)
+        task._taskEntry = None
+        task.isScheduled = False
+
+        return (when, task)
+
     def get_next_task(self):
         """get the next task if there's one that should be processed,
         and return how long it will be until the next one should be
@@ -333,18 +414,16 @@ class TaskManager(SingletonLogging):
         task = None
         delta = None
 
-        if self.tasks:
-            # look at the first task
-            when, nxttask = self.tasks[0]
+        # look at the first task
+        when, nxttask = self.peek_task()
+        if nxttask:
             if when <= now:
                 # pull it off the list and mark that it's no longer scheduled
-                heappop(self.tasks)
-                task = nxttask
-                task.isScheduled = False
+                when, task = self.pop_task()
 
-                if self.tasks:
-                    when, nxttask = self.tasks[0]
-                    # peek at the next task, return how long to wait
+                # peek at the next task, return how long to wait
+                when, nxttask = self.peek_task()
+                if nxttask:
                     delta = max(when - now, 0.0)
             else:
                 delta = when - now
@@ -363,3 +442,247 @@ class TaskManager(SingletonLogging):
             task.install_task()
         elif isinstance(task, OneShotDeleteTask):
             del task
+
+#
+#   TimingWheel
+#
+#   A timing wheel is a ring of slots, each slot is a set of the tasks
+#   that are due during one tick.  The wheels are arranged in levels,
+#   each level coarser than the one below it, and when a slot in one of
+#   the upper levels comes due its tasks are moved down into the finer
+#   levels.  Tasks that are due in less than one tick of the finest level
+#   or farther away than the coarsest level can reach are not accepted.
+#
+
+@bacpypes_debugging
+class TimingWheel:
+
+    # (resolution, slots) of each level, 10ms, second and minute wheels
+    default_levels = ((0.01, 100), (1.0, 60), (60.0, 60))
+
+    def __init__(self, now, levels=None):
+        if _debug: TimingWheel._debug("__init__ %r levels=%r", now, levels)
+
+        if levels is None:
+            levels = self.default_levels
+
+        # each level has a resolution, a ring of slots, the last tick that
+        # has been processed, and a count of the tasks in it
+        self.levels = []
+        for resolution, slots in levels:
+            self.levels.append(
+                [resolution, [set() for i in range(slots)], int(now / resolution), 0]
+                )
+
+        # the earliest time a slot with tasks comes due, found again by
+        # next_time() when that slot is emptied
+        self.earliest = None
+        self.earliestValid = True
+
+    def __len__(self):
+        return sum(level[3] for level in self.levels)
+
+    def add(self, task, now):
+        """Put the task in a slot and return the time the slot comes due,
+        or None if the task should be kept somewhere else."""
+        when = task.taskTime
+
+        for level in self.levels:
+            resolution, slots = level[0], level[1]
+
+            tick = int(when / resolution)
+            ticks_away = tick - int(now / resolution)
+            if ticks_away < 1:
+                return None
+            if ticks_away < len(slots):
+                slot = slots[tick % len(slots)]
+                slot.add(task)
+                level[3] += 1
+
+                due = tick * resolution
+                if self.earliestValid and ((self.earliest is None) or (due < self.earliest)):
+                    self.earliest = due
+
+                task._wheelEntry = (level, slot, due)
+                return due
+
+        return None
+
+    def discard(self, task):
+        """Take a task out of its slot."""
+        level, slot, due = task._wheelEntry
+        slot.discard(task)
+        level[3] -= 1
+
+        # the earliest slot might be empty now
+        if (not slot) and (due == self.earliest):
+            self.earliestValid = False
+
+        task._wheelEntry = None
+
+    def advance(self, now):
+        """Move the tasks in the slots that have come due down to the finer
+        levels, returning a list of the ones that are no longer accepted."""
+        due = []
+
+        # coarsest first so tasks moved down are picked up by finer levels
+        for level in reversed(self.levels):
+            resolution, slots, last_tick, count = level
+
+            tick = int(now / resolution)
+            if tick <= last_tick:
+                continue
+            level[2] = tick
+
+            if not count:
+                continue
+
+            # visit each slot that has come due, but no more than once
+            for t in range(max(last_tick + 1, tick - len(slots) + 1), tick + 1):
+                i = t % len(slots)
+                slot = slots[i]
+                if not slot:
+                    continue
+
+                # replace the slot so it can be refilled while moving these
+                slots[i] = set()
+                level[3] -= len(slot)
+                self.earliestValid = False
+
+                for task in slot:
+                    task._wheelEntry = None
+                    if self.add(task, now) is None:
+                        due.append(task)
+
+        return due
+
+    def next_time(self):
+        """Return the earliest time a slot comes due that has tasks in it,
+        or None if the wheels are empty."""
+        if self.earliestValid:
+            return self.earliest
+
+        # look for it
+        next_when = None
+
+        for resolution, slots, last_tick, count in self.levels:
+            if not count:
+                continue
+
+            for t in range(last_tick + 1, last_tick + 1 + len(slots)):
+                if slots[t % len(slots)]:
+                    when = t * resolution
+                    if (next_when is None) or (when < next_when):
+                        next_when = when
+                    break
+
+        self.earliest = next_when
+        self.earliestValid = True
+
+        return next_when
+
+#
+#   TimingWheelTaskManager
+#
+#   Most protocol timers are coarse and are rescheduled or suspended long
+#   before they are due, so this task manager puts them in timing wheels
+#   where that is O(1).  When a task comes within one tick of being due it
+#   moves into the heap, so it is still processed at its exact time.  Like
+#   other task managers, create one of these before calling run().
+#
+
+# @bacpypes_debugging - implicit via metaclass
+class TimingWheelTaskManager(TaskManager):
+
+    def __init__(self, levels=None):
+        if _debug: TimingWheelTaskManager._debug("__init__ levels=%r", levels)
+
+        # the wheels must exist before the unscheduled tasks are installed
+        self.wheel = TimingWheel(self.get_time(), levels)
+
+        # the time the loop will wake up and get the next task
+        self.wakeTime = None
+
+        # continue with initialization
+        TaskManager.__init__(self)
+
+    def install_task(self, task):
+        if _debug: TimingWheelTaskManager._debug("install_task %r @ %r", task, task.taskTime)
+
+        # if the taskTime is None is hasn't been computed correctly
+        if task.taskTime is None:
+            raise RuntimeError("task time is None")
+
+        # put it in the wheel if it is far enough away
+        if task._wheelEntry:
+            self.wheel.discard(task)
+            task.isScheduled = False
+        when = self.wheel.add(task, self.get_time())
+        if when is None:
+            TaskManager.install_task(self, task)
+            return
+
+        # it might have been in the heap
+        if task.isScheduled:
+            self._remove_entry(task)
+        task.isScheduled = True
+
+        # only break out of the loop if it would sleep past the slot
+        if self.trigger and ((self.wakeTime is None) or (when < self.wakeTime)):
+            self.trigger.set()
+
+    def suspend_task(self, task):
+        if _debug: TimingWheelTaskManager._debug("suspend_task %r", task)
+
+        # take it out of the wheel or let the heap deal with it
+        if task._wheelEntry:
+            self.wheel.discard(task)
+            task.isScheduled = False
+        else:
+            TaskManager.suspend_task(self, task)
+
+    def get_next_task(self):
+        """get the next task if there's one that should be processed,
+        and return how long it will be until the next one should be
+        processed."""
+        if _debug: TimingWheelTaskManager._debug("get_next_task")
+
+        # get the time
+        now = self.get_time()
+
+        # tasks that are almost due go into the heap
+        for task in self.wheel.advance(now):
+            task.isScheduled = False
+            TaskManager.install_task(self, task)
+
+        task = None
+        delta = None
+
+        # look at the first task in the heap, using the same time
+        when, nxttask = self.peek_task()
+        if nxttask:
+            if when <= now:
+                # pull it off the list and mark that it's no longer scheduled
+                when, task = self.pop_task()
+
+                # peek at the next task, return how long to wait
+                when, nxttask = self.peek_task()
+                if nxttask:
+                    delta = max(when - now, 0.0)
+            else:
+                delta = when - now
+
+        # wake up in time for the wheel
+        when = self.wheel.next_time()
+        if when is not None:
+            wheel_delta = max(when - now, 0.0)
+            if (delta is None) or (wheel_delta < delta):
+                delta = wheel_delta
+
+        if delta is None:
+            self.wakeTime = None
+        else:
+            self.wakeTime = now + delta
+
+        # return the task to run and how long to wait for the next one
+        return (task, delta)
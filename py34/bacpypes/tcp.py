@@ -5,6 +5,7 @@ TCP Communications Module
 """
 
 import asyncore
+import asyncio
 import socket
 import pickle
 from time import time as _time, sleep as _sleep
@@ -12,6 +13,7 @@ from io import StringIO
 
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
 
+from . import core
 from .core import deferred
 from .task import FunctionTask, OneShotFunction
 from .comm import PDU, Client, Server
@@ -79,6 +81,56 @@ class PickleActorMixIn:
         else:
             self.pickleBuffer = ''
 
+#
+#   _TCPProtocol
+#
+#   When the core is running on an asyncio event loop, this protocol
+#   passes data received by the transport up to a client or server
+#   dispatcher and tells it when the connection is closed.
+#
+
+@bacpypes_debugging
+class _TCPProtocol(asyncio.Protocol):
+
+    def __init__(self, dispatcher):
+        if _debug: _TCPProtocol._debug("__init__ %r", dispatcher)
+        self.dispatcher = dispatcher
+
+    def data_received(self, data):
+        if _debug: _TCPProtocol._debug("data_received %d octets", len(data))
+
+        # already in the event loop, send the data upstream
+        self.dispatcher.response(PDU(data))
+
+    def connection_lost(self, err):
+        if _debug: _TCPProtocol._debug("connection_lost %r", err)
+
+        # closed by the peer rather than by the dispatcher
+        if self.dispatcher.transport:
+            self.dispatcher.handle_close()
+
+#
+#   _TCPServerProtocol
+#
+
+@bacpypes_debugging
+class _TCPServerProtocol(_TCPProtocol):
+
+    def __init__(self, director):
+        if _debug: _TCPServerProtocol._debug("__init__ %r", director)
+        _TCPProtocol.__init__(self, None)
+
+        # keep track of the director
+        self.director = director
+
+    def connection_made(self, transport):
+        peer = transport.get_extra_info('peername')
+        if _debug: _TCPServerProtocol._debug("connection_made %r", peer)
+
+        # create a server, which will add itself to the director
+        self.dispatcher = self.director.actorClass(self.director, None, peer)
+        self.dispatcher.transport = transport
+
 #
 #   TCPClient
 #
@@ -95,23 +147,51 @@ class TCPClient(asyncore.dispatcher):
         if _debug: TCPClient._debug("__init__ %r", peer)
         asyncore.dispatcher.__init__(self)
 
-        # ask the dispatcher for a socket
-        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
-
         # save the peer
         self.peer = peer
 
         # create a request buffer
-        self.request = ''
+        self.request = b''
 
         # hold the socket error if there was one
         self.socketError = None
 
+        # an asyncio event loop makes the connection and owns the socket
+        self.transport = None
+        if core.asyncioLoop:
+            if _debug: TCPClient._debug("    - create connection")
+            task = core.asyncioLoop.create_task(
+                core.asyncioLoop.create_connection(lambda: _TCPProtocol(self), *peer)
+                )
+            task.add_done_callback(self._connection_made)
+            return
+
+        # ask the dispatcher for a socket
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+
         # try to connect the socket
         if _debug: TCPClient._debug("    - try to connect")
         self.connect(peer)
         if _debug: TCPClient._debug("    - connected (maybe)")
 
+    def _connection_made(self, task):
+        """The asyncio connection has been made or failed."""
+        if _debug: TCPClient._debug("_connection_made %r", task)
+
+        try:
+            self.transport, _ = task.result()
+            self.socketError = None
+        except socket.error as err:
+            TCPClient._error("connection to %r failed: %s", self.peer, err)
+            self.socketError = err
+            self.handle_close()
+            return
+
+        # send anything that was queued while waiting
+        if self.request:
+            self.transport.write(self.request)
+            self.request = b''
+
     def handle_connect(self):
         if _debug: deferred(TCPClient._debug, "handle_connect")
 
@@ -165,6 +245,11 @@ class TCPClient(asyncore.dispatcher):
     def handle_close(self):
         if _debug: deferred(TCPClient._debug, "handle_close")
 
+        # the transport closes the socket
+        if self.transport:
+            transport, self.transport = self.transport, None
+            transport.close()
+
         # close the socket
         self.close()
 
@@ -175,7 +260,13 @@ class TCPClient(asyncore.dispatcher):
         """Requests are queued for delivery."""
         if _debug: TCPClient._debug("indication %r", pdu)
 
+        # the transport buffers if the socket is busy
+        if self.transport:
+            self.transport.write(pdu.pduData)
+            return
+
         self.request += pdu.pduData
+        core.update_interest(self)
 
 #
 #   TCPClientActor
@@ -399,11 +490,14 @@ class TCPServer(asyncore.dispatcher):
         self.peer = peer
 
         # create a request buffer
-        self.request = ''
+        self.request = b''
 
         # hold the socket error if there was one
         self.socketError = None
 
+        # the director provides a transport when running on an asyncio event loop
+        self.transport = None
+
     def handle_connect(self):
         if _debug: deferred(TCPServer._debug, "handle_connect")
 
@@ -456,6 +550,13 @@ class TCPServer(asyncore.dispatcher):
         if not self:
             deferred(TCPServer._warning, "handle_close: self is None")
             return
+
+        # the transport closes the socket
+        if self.transport:
+            transport, self.transport = self.transport, None
+            transport.close()
+            return
+
         if not self.socket:
             deferred(TCPServer._warning, "handle_close: socket already closed")
             return
@@ -467,7 +568,13 @@ class TCPServer(asyncore.dispatcher):
         """Requests are queued for delivery."""
         if _debug: TCPServer._debug("indication %r", pdu)
 
+        # the transport buffers if the socket is busy
+        if self.transport:
+            self.transport.write(pdu.pduData)
+            return
+
         self.request += pdu.pduData
+        core.update_interest(self)
 
 #
 #   TCPServerActor
@@ -627,6 +734,25 @@ class TCPServerDirector(asyncore.dispatcher, Server, ServiceAccessPoint, DebugCo
 
         self.listen(listeners)
 
+        # an asyncio event loop accepts connections rather than asyncore
+        self.asyncioServer = None
+        if core.asyncioLoop:
+            self.del_channel()
+
+            task = core.asyncioLoop.create_task(
+                core.asyncioLoop.create_server(lambda: _TCPServerProtocol(self), sock=self.socket)
+                )
+            task.add_done_callback(self._server_created)
+
+    def _server_created(self, task):
+        """The asyncio server is ready."""
+        if _debug: TCPServerDirector._debug("_server_created %r", task)
+
+        try:
+            self.asyncioServer = task.result()
+        except Exception as err:
+            TCPServerDirector._error("server error: %s", err)
+
     def handle_accept(self):
         if _debug: TCPServerDirector._debug("handle_accept")
 
@@ -652,6 +778,11 @@ class TCPServerDirector(asyncore.dispatcher, Server, ServiceAccessPoint, DebugCo
     def handle_close(self):
         if _debug: TCPServerDirector._debug("handle_close")
 
+        # the asyncio server closes the socket
+        if self.asyncioServer:
+            asyncioServer, self.asyncioServer = self.asyncioServer, None
+            asyncioServer.close()
+
         # close the socket
         self.close()
 
@@ -5,6 +5,7 @@ UDP Communications Module
 """
 
 import asyncore
+import asyncio
 import socket
 import pickle
 import queue
@@ -13,6 +14,7 @@ from time import time as _time
 
 from .debugging import ModuleLogger, bacpypes_debugging
 
+from . import core
 from .core import deferred
 from .task import FunctionTask
 from .comm import PDU, Server
@@ -68,6 +70,12 @@ class UDPActor:
         # put it in the outbound queue for the director
         self.director.request.put(pdu)
 
+        # a transport is always ready to send
+        if self.director.transport:
+            self.director.handle_write()
+        else:
+            core.update_interest(self.director)
+
     def response(self, pdu):
         if _debug: UDPActor._debug("response %r", pdu)
 
@@ -111,6 +119,29 @@ class UDPPickleActor(UDPActor):
         # continue as usual
         UDPActor.response(self, pdu)
 
+#
+#   _UDPProtocol
+#
+#   When the core is running on an asyncio event loop, this protocol
+#   passes datagrams received by the transport up to the director.
+#
+
+@bacpypes_debugging
+class _UDPProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, director):
+        if _debug: _UDPProtocol._debug("__init__ %r", director)
+        self.director = director
+
+    def datagram_received(self, data, addr):
+        if _debug: _UDPProtocol._debug("datagram_received %d octets from %s", len(data), addr)
+
+        # already in the event loop, send the PDU up to the client
+        self.director._response(PDU(data, source=addr))
+
+    def error_received(self, err):
+        _UDPProtocol._error("error_received: %s", err)
+
 #
 #   UDPDirector
 #
@@ -156,6 +187,30 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         # start with an empty peer pool
         self.peers = {}
 
+        # an asyncio event loop owns the socket rather than asyncore
+        self.transport = None
+        if core.asyncioLoop:
+            self.del_channel()
+
+            task = core.asyncioLoop.create_task(
+                core.asyncioLoop.create_datagram_endpoint(lambda: _UDPProtocol(self), sock=self.socket)
+                )
+            task.add_done_callback(self._endpoint_created)
+
+    def _endpoint_created(self, task):
+        """The asyncio datagram endpoint is ready."""
+        if _debug: UDPDirector._debug("_endpoint_created %r", task)
+
+        try:
+            self.transport, _ = task.result()
+        except Exception as err:
+            UDPDirector._error("endpoint error: %s", err)
+            return
+
+        # send anything that was queued while waiting
+        while not self.request.empty():
+            self.handle_write()
+
     def AddActor(self, actor):
         """Add an actor when a new one is connected."""
         if _debug: UDPDirector._debug("AddActor %r", actor)
@@ -214,6 +269,11 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         try:
             pdu = self.request.get()
 
+            # the transport buffers if the socket is busy
+            if self.transport:
+                self.transport.sendto(pdu.pduData, pdu.pduDestination)
+                return
+
             sent = self.socket.sendto(pdu.pduData, pdu.pduDestination)
             if _debug: deferred(UDPDirector._debug, "    - sent %d octets to %s", sent, pdu.pduDestination)
 
@@ -224,6 +284,11 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         """Remove this from the monitor when it's closed."""
         if _debug: deferred(UDPDirector._debug, "handle_close")
 
+        # the transport closes the socket
+        if self.transport:
+            transport, self.transport = self.transport, None
+            transport.close()
+
         self.close()
         self.socket = None
 
@@ -0,0 +1,176 @@
+#!/usr/bin/python
+
+"""
+Worker Pool
+"""
+
+import threading
+
+from time import time as _time
+from concurrent.futures import ThreadPoolExecutor
+
+from .debugging import bacpypes_debugging, DebugContents, ModuleLogger
+
+from . import core
+from .loopstats import Histogram
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# set in the worker threads
+_local = threading.local()
+
+#
+#   blocking
+#
+
+def blocking(fn):
+    """Decorator for application service helper functions (do_*) and
+    property ReadProperty and WriteProperty methods that may take a long
+    time, like reading a value from a database.  When the application has
+    a worker pool they are called in one of its threads."""
+    fn._blocking = True
+    return fn
+
+#
+#   is_blocking
+#
+
+def is_blocking(fn):
+    """Return true if the function or method has been marked as blocking."""
+    return getattr(fn, '_blocking', False)
+
+#
+#   in_worker_thread
+#
+
+def in_worker_thread():
+    """Return true if this is called from a worker pool thread."""
+    return getattr(_local, 'worker', False)
+
+def _worker_init():
+    _local.worker = True
+
+#
+#   WorkerPool
+#
+#   Functions submitted to the pool are called in a thread and when they
+#   are finished the callback is called with the future in the thread
+#   running the core, so it can continue with the rest of the stack.  The
+#   number of functions that are waiting for or running in a thread is
+#   limited, and when the pool is saturated submit() returns None so the
+#   caller can turn the request away rather than queue it up.
+#
+
+@bacpypes_debugging
+class WorkerPool(DebugContents):
+
+    _debug_contents = ('maxWorkers', 'maxPending', 'pending', 'highWater',
+        'submitted', 'completed', 'rejected',
+        )
+
+    def __init__(self, maxWorkers=4, maxPending=None):
+        if _debug: WorkerPool._debug("__init__ maxWorkers=%r maxPending=%r", maxWorkers, maxPending)
+
+        if maxWorkers < 1:
+            raise ValueError("maxWorkers must be at least one")
+        if (maxPending is not None) and (maxPending < 1):
+            raise ValueError("maxPending must be at least one")
+
+        self.maxWorkers = maxWorkers
+        self.maxPending = maxPending
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=maxWorkers,
+            thread_name_prefix="bacpypes-worker",
+            initializer=_worker_init,
+            )
+
+        # number of functions waiting for or running in a thread
+        self.pending = 0
+
+        self.reset()
+
+    def reset(self):
+        """Start collecting the statistics over again."""
+        if _debug: WorkerPool._debug("reset")
+
+        self.highWater = self.pending
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+        # time waiting for a thread and time running in it
+        self.wait = Histogram()
+        self.run = Histogram()
+
+    def submit(self, callback, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) in a thread then callback(future) in the
+        core thread, or return None if the pool is saturated."""
+        if _debug: WorkerPool._debug("submit %r %r %r %r", callback, fn, args, kwargs)
+
+        if (self.maxPending is not None) and (self.pending >= self.maxPending):
+            if _debug: WorkerPool._debug("    - saturated")
+            self.rejected += 1
+            return None
+
+        self.pending += 1
+        if self.pending > self.highWater:
+            self.highWater = self.pending
+        self.submitted += 1
+
+        # submitted, started and finished times
+        times = [_time(), None, None]
+
+        future = self.executor.submit(self._call, times, fn, args, kwargs)
+        future.add_done_callback(lambda future: core.call_soon_threadsafe(self._done, times, callback, future))
+
+        return future
+
+    def _call(self, times, fn, args, kwargs):
+        """Call the function in a worker thread and time it."""
+        times[1] = _time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            times[2] = _time()
+
+    def _done(self, times, callback, future):
+        """The function has finished, back in the core thread."""
+        if _debug: WorkerPool._debug("_done %r %r", callback, future)
+
+        self.pending -= 1
+        self.completed += 1
+
+        # cancelled functions never started
+        if times[2] is not None:
+            self.wait.record(times[1] - times[0])
+            self.run.record(times[2] - times[1])
+
+        if callback:
+            callback(future)
+
+    def stats(self, reset=False):
+        """Return the pool statistics as a dict."""
+        stats = {
+            'maxWorkers': self.maxWorkers,
+            'maxPending': self.maxPending,
+            'pending': self.pending,
+            'highWater': self.highWater,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'wait': self.wait.snapshot(),
+            'run': self.run.snapshot(),
+            }
+        if reset:
+            self.reset()
+
+        return stats
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads."""
+        if _debug: WorkerPool._debug("shutdown wait=%r", wait)
+
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+"""
+This sample application is a server that spreads the work across a number
+of worker processes.  The front end process owns the BACnet/IP port and
+passes each request to a worker, picked by the address of the client, and
+each worker has its own copy of the device and application.
+"""
+
+from functools import partial
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ConfigArgumentParser
+
+from bacpypes.core import run
+
+from bacpypes.app import LocalDeviceObject
+from bacpypes.farm import FarmMultiplexer, BIPFarmApplication
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   FarmServerApplication
+#
+
+@bacpypes_debugging
+class FarmServerApplication(BIPFarmApplication):
+
+    def do_WhoIsRequest(self, apdu):
+        """Broadcasts go to every worker and they are all the same device,
+        so only the first one answers."""
+        if _debug: FarmServerApplication._debug("do_WhoIsRequest %r", apdu)
+
+        if self.mux.index == 0:
+            BIPFarmApplication.do_WhoIsRequest(self, apdu)
+
+#
+#   make_application
+#
+
+def make_application(ini, mux):
+    """Called in each worker process to build its application."""
+    if _debug: _log.debug("make_application %r %r", ini, mux)
+
+    # make a device object
+    this_device = LocalDeviceObject(
+        objectName=ini['objectname'],
+        objectIdentifier=int(ini['objectidentifier']),
+        maxApduLengthAccepted=int(ini['maxapdulengthaccepted']),
+        segmentationSupported=ini['segmentationsupported'],
+        vendorIdentifier=int(ini['vendoridentifier']),
+        )
+
+    # make a simple application bound to the front end
+    this_application = FarmServerApplication(this_device, mux)
+
+    # get the services supported
+    services_supported = this_application.get_services_supported()
+    if _debug: _log.debug("    - services_supported: %r", services_supported)
+
+    # let the device object know
+    this_device.protocolServicesSupported = services_supported.value
+
+    return this_application
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ConfigArgumentParser(description=__doc__)
+
+    # add an argument for the number of workers
+    parser.add_argument('--workers', type=int, default=2,
+        help='number of worker processes',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    # the workers get a copy of the settings
+    ini = dict(
+        (key, getattr(args.ini, key))
+        for key in ('objectname', 'objectidentifier', 'maxapdulengthaccepted',
+            'segmentationsupported', 'vendoridentifier')
+        )
+
+    # the front end, which starts the workers
+    this_farm = FarmMultiplexer(args.ini.address,
+        workers=args.workers,
+        appFactory=partial(make_application, ini),
+        )
+    if _debug: _log.debug("    - this_farm: %r", this_farm)
+
+    _log.debug("running")
+
+    try:
+        run()
+    finally:
+        this_farm.close()
+
+    _log.debug("fini")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+"""
+Callable Task Benchmark
+
+This application compares creating function tasks by defining a new class
+for each one, the way FunctionTask used to, with creating instances of
+CallableTask, reporting the time and memory allocated per task.
+"""
+
+import tracemalloc
+
+from time import time as _time
+
+from bacpypes.debugging import ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.task import OneShotDeleteTask, CallableTask
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   class_per_call
+#
+
+def class_per_call(fn, *args, **kwargs):
+    """Build a task the old way, with a new class for every call."""
+    class _FunctionTask(OneShotDeleteTask):
+
+        def process_task(self):
+            fn(*args, **kwargs)
+
+    return _FunctionTask()
+
+#
+#   measure
+#
+
+def measure(label, count, factory):
+    """Create count tasks and print the time and memory per task."""
+    def sample(*args):
+        pass
+
+    # time it without tracing
+    start = _time()
+    tasks = [factory(sample, i) for i in range(count)]
+    elapsed = _time() - start
+    del tasks
+
+    # now check the memory
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [factory(sample, i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tasks
+
+    print("%-16s %8.2fus/task %8d bytes/task" % (
+        label, elapsed * 1000000.0 / count, (after - before) // count,
+        ))
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the number of tasks
+    parser.add_argument('--count', type=int, default=100000,
+        help='number of tasks',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    measure("class per call", args.count, class_per_call)
+    measure("CallableTask", args.count, CallableTask)
+
+if __name__ == "__main__":
+    main()
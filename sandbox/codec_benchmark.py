@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+
+"""
+Codec Benchmark
+
+This application encodes and decodes the atomic types, the bit strings in
+COV notifications and the device object, tags and tag lists, the
+constructed types and complete APDUs for the common services, and
+reports the number of operations per second and the memory allocated by
+each one.  The results can be saved as JSON and compared with the results
+of an earlier run, when any of them are slower than the tolerance the
+application exits with a non-zero status.
+
+    $ python codec_benchmark.py --output baseline.json
+    ... make some changes ...
+    $ python codec_benchmark.py --baseline baseline.json
+"""
+
+import re
+import sys
+import gc
+import json
+import platform
+import tracemalloc
+
+from time import time as _time
+
+from bacpypes.debugging import ModuleLogger, xtob
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import PDU, PDUData
+from bacpypes.primitivedata import Tag, TagList, Null, Boolean, Unsigned, \
+    Integer, Real, Double, OctetString, CharacterString, BitString, \
+    Enumerated, Date, Time, ObjectType, ObjectIdentifier
+from bacpypes.constructeddata import Any, ArrayOf, SequenceOf
+from bacpypes.basetypes import DateTime, LogRecord, LogRecordLogDatum, \
+    PropertyReference, PropertyValue, ResultFlags, StatusFlags, TimeStamp, \
+    EventTransitionBits, ServicesSupported, ObjectTypesSupported
+from bacpypes.apdu import APDU, apdu_types, ReadPropertyRequest, \
+    ReadPropertyACK, ReadPropertyMultipleRequest, ReadPropertyMultipleACK, \
+    ReadAccessSpecification, ReadAccessResult, ReadAccessResultElement, \
+    ReadAccessResultElementChoice, WhoIsRequest, IAmRequest, \
+    ConfirmedCOVNotificationRequest, UnconfirmedCOVNotificationRequest, \
+    ReadRangeACK
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   Helper Functions
+#
+
+def any_value(value):
+    """Return an Any with the value cast in."""
+    propertyValue = Any()
+    propertyValue.cast_in(value)
+    return propertyValue
+
+def encode_atomic(value):
+    tag = Tag()
+    value.encode(tag)
+    return tag
+
+def encode_tags(tags):
+    pdu = PDUData()
+    tags.encode(pdu)
+    return bytes(pdu.pduData)
+
+def decode_tags(data):
+    tags = TagList()
+    tags.decode(PDUData(data))
+    return tags
+
+def encode_constructed(value):
+    tags = TagList()
+    value.encode(tags)
+    return tags
+
+def decode_constructed(klass, tags):
+    value = klass()
+    value.decode(TagList(list(tags)))
+    return value
+
+def encode_apdu(service):
+    """Encode a service all the way to the octets the network layer gets."""
+    xpdu = apdu_types[service.apduType]()
+    service.encode(xpdu)
+    apdu = APDU()
+    xpdu.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+    return bytes(pdu.pduData)
+
+def decode_apdu(klass, data):
+    """Decode the octets all the way to the service."""
+    apdu = APDU()
+    apdu.decode(PDU(data))
+    xpdu = apdu_types[apdu.apduType]()
+    xpdu.decode(apdu)
+    service = klass()
+    service.decode(xpdu)
+    return service
+
+#
+#   Cases
+#
+
+def atomic_cases():
+    """Encode and decode each of the atomic types."""
+    for value in (
+            Null(),
+            Boolean(True),
+            Unsigned(1234567),
+            Integer(-1234567),
+            Real(72.5),
+            Double(72.5),
+            OctetString(xtob('0102030405060708')),
+            CharacterString('the quick brown fox'),
+            BitString([1, 0, 1, 1, 0, 0, 1, 0, 1]),
+            Enumerated(7),
+            Date((126, 10, 16, 5)),
+            Time((12, 30, 15, 0)),
+            ObjectType('analogValue'),
+            ObjectIdentifier(('analogValue', 1)),
+            ):
+        klass = value.__class__
+        tag = encode_atomic(value)
+        name = "atomic." + klass.__name__
+
+        yield (name + ".encode", lambda value=value: encode_atomic(value))
+        yield (name + ".decode", lambda klass=klass, tag=tag: klass(tag))
+
+def bitstring_cases():
+    """Encode and decode the bit strings that are in COV notifications and
+    the device object properties."""
+    for value in (
+            StatusFlags([0, 1, 0, 0]),
+            EventTransitionBits([1, 1, 1]),
+            ObjectTypesSupported([1] * 51),
+            ServicesSupported([1] * 40),
+            ):
+        klass = value.__class__
+        tag = encode_atomic(value)
+        name = "bitstring." + klass.__name__
+
+        yield (name + ".encode", lambda value=value: encode_atomic(value))
+        yield (name + ".decode", lambda klass=klass, tag=tag: klass(tag))
+
+def tag_cases():
+    """Encode and decode a tag and a list of them."""
+    tag = encode_atomic(Unsigned(1234))
+    data = encode_tags(TagList([tag]))
+
+    yield ("tag.encode", lambda: tag.encode(PDUData()))
+    yield ("tag.decode", lambda: Tag(PDUData(data)))
+
+    tags = encode_constructed(PropertyValue(
+        propertyIdentifier='presentValue',
+        value=any_value(Real(72.5)),
+        priority=8,
+        ))
+    data = encode_tags(tags)
+
+    yield ("taglist.encode", lambda: encode_tags(tags))
+    yield ("taglist.decode", lambda: decode_tags(data))
+
+def constructed_cases():
+    """Encode and decode a sequence, a list, an array and a choice."""
+    sequenceOfPropertyReference = SequenceOf(PropertyReference)
+    arrayOfReal = ArrayOf(Real)
+
+    for name, value in (
+            ("sequence", PropertyValue(
+                propertyIdentifier='presentValue',
+                value=any_value(Real(72.5)),
+                priority=8,
+                )),
+            ("sequenceof", sequenceOfPropertyReference([
+                PropertyReference(propertyIdentifier=i)
+                for i in range(10)
+                ])),
+            ("arrayof", arrayOfReal([i * 1.5 for i in range(100)])),
+            ("choice", TimeStamp(
+                dateTime=DateTime(date=(126, 10, 16, 5), time=(12, 30, 15, 0)),
+                )),
+            ):
+        klass = value.__class__
+        tags = encode_constructed(value).tagList
+        name = "constructed." + name
+
+        yield (name + ".encode", lambda value=value: encode_constructed(value))
+        yield (name + ".decode", lambda klass=klass, tags=tags: decode_constructed(klass, tags))
+
+def read_property_multiple_ack(count):
+    """Return an ACK with the present value of a number of objects."""
+    return ReadPropertyMultipleACK(listOfReadAccessResults=[
+        ReadAccessResult(
+            objectIdentifier=('analogValue', i),
+            listOfResults=[
+                ReadAccessResultElement(
+                    propertyIdentifier='presentValue',
+                    readResult=ReadAccessResultElementChoice(
+                        propertyValue=any_value(Real(i * 1.5)),
+                        ),
+                    ),
+                ],
+            )
+        for i in range(count)
+        ])
+
+def read_range_ack(count):
+    """Return an ACK with a number of records from a trend log."""
+    return ReadRangeACK(
+        objectIdentifier=('trendLog', 1),
+        propertyIdentifier='logBuffer',
+        resultFlags=ResultFlags([1, 1, 0]),
+        itemCount=count,
+        itemData=[
+            any_value(LogRecord(
+                timestamp=DateTime(
+                    date=(126, 10, 16, 5),
+                    time=(i // 3600 % 24, i // 60 % 60, i % 60, 0),
+                    ),
+                logDatum=LogRecordLogDatum(realValue=i * 1.5),
+                statusFlags=StatusFlags([0, 0, 0, 0]),
+                ))
+            for i in range(count)
+            ],
+        firstSequenceNumber=1,
+        )
+
+def cov_notification(klass):
+    """Return a notification with the present value and status flags."""
+    return klass(
+        subscriberProcessIdentifier=1,
+        initiatingDeviceIdentifier=('device', 1),
+        monitoredObjectIdentifier=('analogValue', 1),
+        timeRemaining=300,
+        listOfValues=[
+            PropertyValue(propertyIdentifier='presentValue', value=any_value(Real(72.5))),
+            PropertyValue(propertyIdentifier='statusFlags', value=any_value(StatusFlags([0, 0, 0, 0]))),
+            ],
+        )
+
+def apdu_cases():
+    """Encode and decode complete APDUs."""
+    services = [
+        ("ReadPropertyRequest", ReadPropertyRequest(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            )),
+        ("ReadPropertyACK", ReadPropertyACK(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            propertyValue=any_value(Real(72.5)),
+            )),
+        ("ReadPropertyMultipleRequest", ReadPropertyMultipleRequest(
+            listOfReadAccessSpecs=[
+                ReadAccessSpecification(
+                    objectIdentifier=('analogValue', i),
+                    listOfPropertyReferences=[
+                        PropertyReference(propertyIdentifier='presentValue'),
+                        ],
+                    )
+                for i in range(10)
+                ],
+            )),
+        ]
+    for count in (10, 100, 1000):
+        services.append(("ReadPropertyMultipleACK.%d" % (count,), read_property_multiple_ack(count)))
+    services.extend([
+        ("WhoIsRequest", WhoIsRequest(
+            deviceInstanceRangeLowLimit=1,
+            deviceInstanceRangeHighLimit=4194302,
+            )),
+        ("IAmRequest", IAmRequest(
+            iAmDeviceIdentifier=('device', 1),
+            maxAPDULengthAccepted=1476,
+            segmentationSupported='segmentedBoth',
+            vendorID=15,
+            )),
+        ("ConfirmedCOVNotificationRequest", cov_notification(ConfirmedCOVNotificationRequest)),
+        ("UnconfirmedCOVNotificationRequest", cov_notification(UnconfirmedCOVNotificationRequest)),
+        ])
+    for count in (100, 1000):
+        services.append(("ReadRangeACK.%d" % (count,), read_range_ack(count)))
+
+    for name, service in services:
+        service.apduInvokeID = 1
+        service.apduMaxResp = 1476
+        klass = service.__class__
+        data = encode_apdu(service)
+        name = "apdu." + name
+
+        yield (name + ".encode", lambda service=service: encode_apdu(service))
+        yield (name + ".decode", lambda klass=klass, data=data: decode_apdu(klass, data))
+
+def all_cases():
+    for cases in (atomic_cases, bitstring_cases, tag_cases, constructed_cases, apdu_cases):
+        for case in cases():
+            yield case
+
+#
+#   measure
+#
+
+def measure(fn, duration, repeat):
+    """Return the best number of calls per second and the peak number of
+    octets allocated by one call."""
+    # a first call to warm up and to see how many fit in the duration
+    start = _time()
+    fn()
+    count = max(1, int(duration / max(_time() - start, 1e-7)))
+
+    best = None
+    for i in range(repeat):
+        start = _time()
+        for j in range(count):
+            fn()
+        elapsed = _time() - start
+        if (best is None) or (elapsed < best):
+            best = elapsed
+
+    # the memory allocated while the function runs, only what is allocated
+    # after tracing starts is counted
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return (count / max(best, 1e-9), peak)
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add arguments for the cases and how long to run them
+    parser.add_argument('--filter', type=str, default=None,
+        help='regular expression to select cases by name',
+        )
+    parser.add_argument('--duration', type=float, default=0.1,
+        help='seconds to run each case for each repetition',
+        )
+    parser.add_argument('--repeat', type=int, default=3,
+        help='number of repetitions, the best one is reported',
+        )
+
+    # add arguments for the results
+    parser.add_argument('--output', type=str, default=None,
+        help='save the results in this JSON file',
+        )
+    parser.add_argument('--baseline', type=str, default=None,
+        help='compare the results with this JSON file',
+        )
+    parser.add_argument('--tolerance', type=float, default=10.0,
+        help='percentage slower than the baseline that is a regression',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+    pattern = args.filter and re.compile(args.filter)
+
+    results = {}
+    regressions = []
+
+    print("%-48s %12s %10s %10s %8s" % ("", "ops/sec", "us/op", "peak", "change"))
+    for name, fn in all_cases():
+        if pattern and not pattern.search(name):
+            continue
+
+        ops, peak = measure(fn, args.duration, args.repeat)
+        results[name] = {'ops': ops, 'peak': peak}
+
+        # compare with the baseline
+        change = ""
+        if name in baseline:
+            percent = (ops / baseline[name]['ops'] - 1.0) * 100.0
+            change = "%+.1f%%" % (percent,)
+            if percent < -args.tolerance:
+                regressions.append(name)
+                change += " !"
+
+        print("%-48s %12.0f %10.2f %10d %8s" % (
+            name, ops, 1000000.0 / ops, peak, change,
+            ))
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'duration': args.duration,
+                'repeat': args.repeat,
+                'results': results,
+                }, output_file, indent=2, sort_keys=True)
+
+    if regressions:
+        print("")
+        print("%d slower than the baseline:" % (len(regressions),))
+        for name in regressions:
+            print("    " + name)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
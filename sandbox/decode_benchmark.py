@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+"""
+Decode Benchmark
+
+This application builds a large ReadPropertyMultiple ACK, like one that
+would be reassembled from segments, and reports how long it takes to
+decode the octets into tags and into the complete service ACK.  The
+octets and tags are decoded both by taking them off the front of the PDU
+data and by moving a PDUCursor along it.
+"""
+
+from time import time as _time
+
+from bacpypes.debugging import ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import PDU, PDUCursor
+from bacpypes.primitivedata import Tag, Real, TagList
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import StatusFlags
+from bacpypes.apdu import APDU, ComplexAckPDU, ReadPropertyMultipleACK, \
+    ReadAccessResult, ReadAccessResultElement, ReadAccessResultElementChoice
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   build_ack
+#
+
+def build_ack(count):
+    """Return the octets of an ACK with the present value and status flags
+    of a number of analog values."""
+    results = []
+    for i in range(count):
+        elements = []
+        for propertyIdentifier, value in (
+                ('presentValue', Real(i * 1.5)),
+                ('statusFlags', StatusFlags([0, 0, 0, 0])),
+                ):
+            propertyValue = Any()
+            propertyValue.cast_in(value)
+            elements.append(ReadAccessResultElement(
+                propertyIdentifier=propertyIdentifier,
+                readResult=ReadAccessResultElementChoice(propertyValue=propertyValue),
+                ))
+        results.append(ReadAccessResult(
+            objectIdentifier=('analogValue', i),
+            listOfResults=elements,
+            ))
+
+    ack = ReadPropertyMultipleACK(listOfReadAccessResults=results)
+    ack.apduInvokeID = 1
+
+    xpdu = ComplexAckPDU()
+    ack.encode(xpdu)
+    apdu = APDU()
+    xpdu.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+
+    return bytes(pdu.pduData)
+
+#
+#   decode_octets, decode_tags, decode_ack
+#
+
+def decode_octets(data):
+    pdu = PDU(data)
+    while pdu.pduData:
+        pdu.get()
+
+def decode_cursor_octets(data):
+    cursor = PDUCursor(data)
+    while cursor.pduOffset < cursor.pduLength:
+        cursor.get()
+
+def decode_pdu_tags(data):
+    pdu = PDU(data)
+    apdu = APDU()
+    apdu.decode(pdu)
+    tagList = TagList()
+    while apdu.pduData:
+        tagList.append(Tag(apdu))
+
+def decode_tags(data):
+    pdu = PDU(data)
+    apdu = APDU()
+    apdu.decode(pdu)
+    TagList().decode(apdu)
+
+def decode_ack(data):
+    pdu = PDU(data)
+    apdu = APDU()
+    apdu.decode(pdu)
+    xpdu = ComplexAckPDU()
+    xpdu.decode(apdu)
+    ack = ReadPropertyMultipleACK()
+    ack.decode(xpdu)
+    return ack
+
+#
+#   timed
+#
+
+def timed(label, count, fn, *args):
+    """Call a function a number of times and print how long each one took."""
+    start = _time()
+    for i in range(count):
+        fn(*args)
+    elapsed = _time() - start
+
+    print("%-14s %10.1fus" % (label, elapsed * 1000000.0 / count))
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the number of objects
+    parser.add_argument('--objects', type=int, default=80,
+        help='number of objects in the ACK',
+        )
+
+    # add an argument for the number of repetitions
+    parser.add_argument('--count', type=int, default=200,
+        help='number of times to decode it',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    data = build_ack(args.objects)
+    print("%d objects, %d octets" % (args.objects, len(data)))
+
+    # make sure it decodes
+    ack = decode_ack(data)
+    assert len(ack.listOfReadAccessResults) == args.objects
+
+    timed("octets", args.count, decode_octets, data)
+    timed("octets/cursor", args.count, decode_cursor_octets, data)
+    timed("tags", args.count, decode_pdu_tags, data)
+    timed("tags/cursor", args.count, decode_tags, data)
+    timed("ack", args.count, decode_ack, data)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+"""
+Encode Benchmark
+
+This application sends a ReadProperty ACK with an octet string value of
+a given size down through a network service access point and a BACnet/IP
+stack to a server that counts the octets rather than sending them, and
+reports how long each one takes and how many times the octets of the
+packet were copied on the way down.
+"""
+
+from time import time as _time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes import comm
+from bacpypes.comm import PDUData, Server, bind
+from bacpypes.pdu import Address
+from bacpypes.primitivedata import OctetString
+from bacpypes.constructeddata import Any
+from bacpypes.apdu import ReadPropertyACK, ComplexAckPDU
+from bacpypes.netservice import NetworkServiceAccessPoint
+from bacpypes.bvllservice import BIPSimple, AnnexJCodec
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   count_copies
+#
+#   Count the number of times the data is copied by put_data() or by the
+#   PDUData copy constructor by wrapping them.
+#
+
+copied = [0, 0]
+
+def count_copies(fn):
+    def _count(*args):
+        data = args[-1]
+        copied[0] += 1
+        copied[1] += len(data)
+        return fn(*args)
+    return _count
+
+#
+#   Sink
+#
+
+@bacpypes_debugging
+class Sink(Server):
+
+    def __init__(self):
+        if _debug: Sink._debug("__init__")
+        Server.__init__(self)
+
+        self.packets = 0
+        self.octets = 0
+
+    def indication(self, pdu):
+        self.packets += 1
+        self.octets += len(pdu.pduData)
+
+#
+#   build_ack
+#
+
+def build_ack(size):
+    """Return a complex ACK PDU with an octet string value."""
+    ack = ReadPropertyACK(
+        objectIdentifier=('device', 1),
+        propertyIdentifier='description',
+        )
+    ack.propertyValue = Any()
+    ack.propertyValue.cast_in(OctetString(b'x' * size))
+    ack.pduDestination = Address('10.0.0.2')
+    ack.apduInvokeID = 1
+
+    xpdu = ComplexAckPDU()
+    ack.encode(xpdu)
+
+    return xpdu
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the size of the value
+    parser.add_argument('--size', type=int, default=1400,
+        help='number of octets in the value',
+        )
+
+    # add an argument for the number of packets
+    parser.add_argument('--count', type=int, default=10000,
+        help='number of packets to send',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    # network layer on top of a BACnet/IP stack
+    nsap = NetworkServiceAccessPoint()
+    bip = BIPSimple()
+    annexj = AnnexJCodec()
+    sink = Sink()
+    bind(bip, annexj, sink)
+    nsap.bind(bip)
+
+    xpdu = build_ack(args.size)
+
+    # count the copies of one packet
+    put_data, _copy = PDUData.put_data, comm._copy
+    PDUData.put_data = count_copies(put_data)
+    comm._copy = count_copies(_copy)
+    nsap.indication(xpdu)
+    PDUData.put_data, comm._copy = put_data, _copy
+    print("%d octet packet, %d copies of %d octets" % (sink.octets, copied[0], copied[1]))
+
+    start = _time()
+    for i in range(args.count):
+        nsap.indication(xpdu)
+    elapsed = _time() - start
+
+    print("%.1fus per packet" % (elapsed * 1000000.0 / args.count,))
+
+if __name__ == "__main__":
+    main()
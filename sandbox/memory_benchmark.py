@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+"""
+Memory Benchmark
+
+This application decodes a number of BACnet/IP packets, each with a
+ReadProperty ACK in it, down to the APDU and its tags and keeps them all,
+then builds the same number of addresses and keeps those.  It reports the
+memory each one takes and how long it took to build them.
+"""
+
+import gc
+import tracemalloc
+
+from time import time as _time
+
+from bacpypes.debugging import ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import Address, PDU
+from bacpypes.primitivedata import Real, TagList
+from bacpypes.constructeddata import Any
+from bacpypes.apdu import APDU, ReadPropertyACK, ComplexAckPDU
+from bacpypes.npdu import NPDU
+from bacpypes.bvll import BVLPDU, OriginalUnicastNPDU
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   build_datagram
+#
+
+def build_datagram():
+    """Return the octets of a BVLL message with an ACK in it."""
+    ack = ReadPropertyACK(
+        objectIdentifier=('analogValue', 1),
+        propertyIdentifier='presentValue',
+        )
+    ack.propertyValue = Any()
+    ack.propertyValue.cast_in(Real(72.5))
+    ack.apduInvokeID = 1
+
+    xpdu = ComplexAckPDU()
+    ack.encode(xpdu)
+    apdu = APDU()
+    xpdu.encode(apdu)
+    npdu = NPDU()
+    apdu.encode(npdu)
+    pdu = PDU()
+    npdu.encode(pdu)
+
+    rpdu = OriginalUnicastNPDU(pdu)
+    bvlpdu = BVLPDU()
+    rpdu.encode(bvlpdu)
+    pdu = PDU()
+    bvlpdu.encode(pdu)
+
+    return bytes(pdu.pduData)
+
+#
+#   decode_datagram
+#
+
+def decode_datagram(data, source):
+    """Decode the datagram like the stack does on the way up and return the
+    decoded PDUs and the tags of the ACK."""
+    pdu = PDU(data, source=source)
+
+    bvlpdu = BVLPDU()
+    bvlpdu.decode(pdu)
+    rpdu = OriginalUnicastNPDU()
+    rpdu.decode(bvlpdu)
+    npdu = NPDU()
+    npdu.decode(rpdu)
+    apdu = APDU()
+    apdu.decode(npdu)
+    xpdu = ComplexAckPDU()
+    xpdu.decode(apdu)
+    tags = TagList()
+    tags.decode(xpdu)
+
+    return (bvlpdu, rpdu, npdu, apdu, xpdu, tags)
+
+#
+#   measure
+#
+
+def measure(label, count, fn):
+    """Call the function count times keeping the results, and print the
+    memory they take and the time it took."""
+    gc.collect()
+    tracemalloc.start()
+
+    start = _time()
+    keep = [fn(i) for i in range(count)]
+    elapsed = _time() - start
+
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("%-10s %10.1fMB %8.1f octets each %8.2fus each" % (
+        label,
+        size / 1048576.0,
+        float(size) / count,
+        elapsed * 1000000.0 / count,
+        ))
+
+    del keep
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the number of objects
+    parser.add_argument('--count', type=int, default=100000,
+        help='number of packets and addresses',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    data = build_datagram()
+    source = Address('10.0.0.2')
+
+    measure("packets", args.count,
+        lambda i: decode_datagram(data, source),
+        )
+    measure("addresses", args.count,
+        lambda i: Address('10.%d.%d.%d' % (i >> 16, (i >> 8) & 255, i & 255)),
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+
+"""
+Receive Benchmark
+
+This application passes ReadProperty ACKs with an octet string value of a
+given size up through a BACnet/IP stack and a network service access point
+to an application layer that decodes them, and reports how long each one
+takes and how many octets were copied on the way up.  With the --bbmd
+option the node is a BBMD with some peers and the ACKs are broadcasts, so
+each one is also forwarded to the peers.
+"""
+
+from time import time as _time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.comm import PDUData, Client, Server, bind
+from bacpypes.pdu import Address, LocalBroadcast, PDU
+from bacpypes.primitivedata import OctetString
+from bacpypes.constructeddata import Any
+from bacpypes.apdu import APDU, ReadPropertyACK, ComplexAckPDU
+from bacpypes.npdu import NPDU
+from bacpypes.bvll import BVLPDU, OriginalUnicastNPDU, OriginalBroadcastNPDU
+from bacpypes.netservice import NetworkServiceAccessPoint
+from bacpypes.bvllservice import BIPSimple, BIPBBMD, AnnexJCodec
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   count_copies
+#
+#   Count the number of octets copied by the PDUData copy constructor and
+#   by get_data() by wrapping them.
+#
+
+copied = [0]
+
+def count_init(fn):
+    def _init(self, data=None, *args, **kwargs):
+        fn(self, data, *args, **kwargs)
+        if data is not None:
+            copied[0] += len(self.pduData)
+    return _init
+
+def count_get_data(fn):
+    def _get_data(self, dlen):
+        pduData = self.pduData
+        data = fn(self, dlen)
+        if data is not pduData:
+            copied[0] += len(data)
+        return data
+    return _get_data
+
+#
+#   Link
+#
+#   Stands in for the UDP multiplexer, datagrams are given to it to send up
+#   the stack and the ones that go down are counted.
+#
+
+@bacpypes_debugging
+class Link(Server):
+
+    def __init__(self):
+        if _debug: Link._debug("__init__")
+        Server.__init__(self)
+
+        self.forwarded = 0
+
+    def indication(self, pdu):
+        self.forwarded += 1
+
+#
+#   Application
+#
+#   Decodes the ACKs like an application service access point.
+#
+
+@bacpypes_debugging
+class Application(Client):
+
+    def __init__(self):
+        if _debug: Application._debug("__init__")
+        Client.__init__(self)
+
+        self.received = 0
+
+    def confirmation(self, apdu):
+        xpdu = ComplexAckPDU()
+        xpdu.decode(apdu)
+        ack = ReadPropertyACK()
+        ack.decode(xpdu)
+
+        self.received += 1
+
+#
+#   build_datagram
+#
+
+def build_datagram(size, broadcast):
+    """Return the octets of a BVLL message with an ACK in it."""
+    ack = ReadPropertyACK(
+        objectIdentifier=('device', 1),
+        propertyIdentifier='description',
+        )
+    ack.propertyValue = Any()
+    ack.propertyValue.cast_in(OctetString(b'x' * size))
+    ack.apduInvokeID = 1
+
+    xpdu = ComplexAckPDU()
+    ack.encode(xpdu)
+    apdu = APDU()
+    xpdu.encode(apdu)
+    npdu = NPDU()
+    apdu.encode(npdu)
+    pdu = PDU()
+    npdu.encode(pdu)
+
+    if broadcast:
+        rpdu = OriginalBroadcastNPDU(pdu)
+    else:
+        rpdu = OriginalUnicastNPDU(pdu)
+    bvlpdu = BVLPDU()
+    rpdu.encode(bvlpdu)
+    pdu = PDU()
+    bvlpdu.encode(pdu)
+
+    return bytes(pdu.pduData)
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the size of the value
+    parser.add_argument('--size', type=int, default=1400,
+        help='number of octets in the value',
+        )
+
+    # add an argument for the number of packets
+    parser.add_argument('--count', type=int, default=10000,
+        help='number of packets to receive',
+        )
+
+    # add an argument for a BBMD
+    parser.add_argument('--bbmd', type=int, default=0,
+        help='be a BBMD with this many peers',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    local = Address('10.0.0.1')
+
+    # application on top of a BACnet/IP stack
+    if args.bbmd:
+        bip = BIPBBMD(local)
+        bip.add_peer(local)
+        for i in range(args.bbmd):
+            bip.add_peer(Address('10.0.%d.1' % (i + 1,)))
+        destination = LocalBroadcast()
+    else:
+        bip = BIPSimple()
+        destination = local
+
+    nsap = NetworkServiceAccessPoint()
+    annexj = AnnexJCodec()
+    link = Link()
+    application = Application()
+    bind(bip, annexj, link)
+    nsap.bind(bip)
+    bind(application, nsap)
+
+    data = build_datagram(args.size, args.bbmd)
+    source = Address('10.0.0.2')
+
+    # count the copies of one packet
+    __init__, get_data = PDUData.__init__, PDUData.get_data
+    PDUData.__init__ = count_init(__init__)
+    PDUData.get_data = count_get_data(get_data)
+    link.response(PDU(data, source=source, destination=destination))
+    PDUData.__init__, PDUData.get_data = __init__, get_data
+    print("%d octet packet, %d octets copied" % (len(data), copied[0]))
+
+    start = _time()
+    for i in range(args.count):
+        link.response(PDU(data, source=source, destination=destination))
+    elapsed = _time() - start
+
+    print("%d received, %d forwarded" % (application.received, link.forwarded))
+    print("%.1fus per packet" % (elapsed * 1000000.0 / args.count,))
+
+if __name__ == "__main__":
+    main()
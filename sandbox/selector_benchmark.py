@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+"""
+Selector Benchmark
+
+This application opens a large number of idle TCP connections to a server
+and then counts how many datagrams a UDP director can receive each second
+while another process sends them as fast as it can.  Run it with and
+without --selectors to compare select() with the platform selector.  Both
+ends of each connection are in this process, so select() fails with more
+than about 500 connections; try --connections 400 to compare them.
+"""
+
+import sys
+import socket
+import subprocess
+
+from time import time as _time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.core import run, stop, enable_selectors
+from bacpypes.comm import Client, bind
+from bacpypes.task import TaskManager, FunctionTask
+from bacpypes.udp import UDPDirector
+from bacpypes.tcp import TCPServerDirector
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# sender, runs in a separate process
+SENDER = """
+import socket, sys
+s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+addr = ('127.0.0.1', int(sys.argv[1]))
+data = b'x' * 32
+while True:
+    try:
+        s.sendto(data, addr)
+    except OSError:
+        pass
+"""
+
+#
+#   Counter
+#
+
+@bacpypes_debugging
+class Counter(Client):
+
+    def __init__(self):
+        if _debug: Counter._debug("__init__")
+        Client.__init__(self)
+        self.count = 0
+
+    def confirmation(self, pdu):
+        self.count += 1
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the number of connections
+    parser.add_argument('--connections', type=int, default=2000,
+        help='number of idle TCP connections',
+        )
+
+    # add an argument for how long to run
+    parser.add_argument('--duration', type=float, default=5.0,
+        help='number of seconds to count datagrams',
+        )
+
+    # add an option to use selectors
+    parser.add_argument('--selectors', action='store_true',
+        help='use the platform selector rather than select()',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    if args.selectors:
+        enable_selectors()
+
+    TaskManager()
+
+    # a server with lots of idle clients
+    server = TCPServerDirector(('127.0.0.1', 0), listeners=1024)
+    server_address = server.socket.getsockname()
+
+    # connect without waiting, the server accepts them when it is running
+    clients = []
+    for i in range(args.connections):
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        client.setblocking(False)
+        client.connect_ex(server_address)
+        clients.append(client)
+
+    # a busy UDP director
+    counter = Counter()
+    director = UDPDirector(('127.0.0.1', 0))
+    bind(counter, director)
+    udp_port = director.socket.getsockname()[1]
+
+    # start counting when the connections are accepted
+    def start():
+        if len(server.servers) < args.connections:
+            FunctionTask(start).install_task(delta=0.1)
+            return
+        print("%d connections accepted" % (len(server.servers),))
+        counter.count = 0
+        start.time = _time()
+
+        sender = subprocess.Popen([sys.executable, '-c', SENDER, str(udp_port)])
+
+        def finish():
+            elapsed = _time() - start.time
+            sender.kill()
+            print("%d datagrams in %.2fs, %.0f/s" % (counter.count, elapsed, counter.count / elapsed))
+            stop()
+
+        FunctionTask(finish).install_task(delta=args.duration)
+
+    FunctionTask(start).install_task(delta=0.1)
+
+    run()
+
+    for client in clients:
+        client.close()
+
+if __name__ == "__main__":
+    main()
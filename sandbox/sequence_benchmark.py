@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+"""
+Sequence Benchmark
+
+This application encodes and decodes some common Sequence classes, first
+with the generic encode_elements() and decode_elements() functions and
+then with the functions built for each class, and reports how long each
+one took.
+"""
+
+from time import time as _time
+
+from bacpypes.debugging import ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes import constructeddata
+from bacpypes.primitivedata import Real, TagList
+from bacpypes.constructeddata import Any, Sequence
+from bacpypes.basetypes import PropertyReference, PropertyValue
+from bacpypes.apdu import ReadPropertyRequest, ReadPropertyACK, \
+    ReadAccessSpecification, ReadAccessResult, ReadAccessResultElement, \
+    ReadAccessResultElementChoice, IAmRequest, COVNotificationParameters
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   build_objects
+#
+
+def build_objects():
+    """Return a list of sequences to encode and decode."""
+    def any_real(value):
+        propertyValue = Any()
+        propertyValue.cast_in(Real(value))
+        return propertyValue
+
+    return [
+        ReadPropertyRequest(
+            objectIdentifier=('analogInput', 1),
+            propertyIdentifier='presentValue',
+            ),
+        ReadPropertyACK(
+            objectIdentifier=('analogInput', 1),
+            propertyIdentifier='presentValue',
+            propertyValue=any_real(12.5),
+            ),
+        ReadAccessSpecification(
+            objectIdentifier=('analogInput', 1),
+            listOfPropertyReferences=[
+                PropertyReference(propertyIdentifier='presentValue'),
+                PropertyReference(propertyIdentifier='statusFlags'),
+                ],
+            ),
+        ReadAccessResult(
+            objectIdentifier=('analogInput', 1),
+            listOfResults=[
+                ReadAccessResultElement(
+                    propertyIdentifier='presentValue',
+                    readResult=ReadAccessResultElementChoice(propertyValue=any_real(12.5)),
+                    ),
+                ],
+            ),
+        IAmRequest(
+            iAmDeviceIdentifier=('device', 1),
+            maxAPDULengthAccepted=1476,
+            segmentationSupported='segmentedBoth',
+            vendorID=15,
+            ),
+        COVNotificationParameters(
+            subscriberProcessIdentifier=1,
+            initiatingDeviceIdentifier=('device', 1),
+            monitoredObjectIdentifier=('analogInput', 1),
+            timeRemaining=0,
+            listOfValues=[
+                PropertyValue(propertyIdentifier='presentValue', value=any_real(12.5)),
+                ],
+            ),
+        ]
+
+#
+#   encode_sequence, decode_sequence
+#
+
+def encode_sequence(obj):
+    tagList = TagList()
+    Sequence.encode(obj, tagList)
+    return tagList
+
+def decode_sequence(klass, tags):
+    obj = klass()
+    Sequence.decode(obj, TagList(list(tags)))
+    return obj
+
+#
+#   timed
+#
+
+def timed(count, fn, *args):
+    """Call a function a number of times and return how long each one
+    took in microseconds."""
+    start = _time()
+    for i in range(count):
+        fn(*args)
+    elapsed = _time() - start
+
+    return elapsed * 1000000.0 / count
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the number of repetitions
+    parser.add_argument('--count', type=int, default=5000,
+        help='number of times to encode and decode each one',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    print("%-28s %17s %17s" % ("", "encode", "decode"))
+    for obj in build_objects():
+        klass = obj.__class__
+        tags = encode_sequence(obj).tagList
+
+        results = []
+        for compiled in (False, True):
+            constructeddata.compileSequences = compiled
+
+            # make sure it round trips
+            assert encode_sequence(decode_sequence(klass, tags)).tagList == tags
+
+            results.append(timed(args.count, encode_sequence, obj))
+            results.append(timed(args.count, decode_sequence, klass, tags))
+
+        print("%-28s %7.2f -> %5.2fus %7.2f -> %5.2fus" % (
+            klass.__name__, results[0], results[2], results[1], results[3],
+            ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+"""
+Task Manager Benchmark
+
+This application schedules, reschedules and cancels a large number of
+tasks and reports how long each pass through them takes.
+"""
+
+from time import time as _time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.task import OneShotTask, TaskManager, TimingWheelTaskManager
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   NullTask
+#
+
+@bacpypes_debugging
+class NullTask(OneShotTask):
+
+    def process_task(self):
+        pass
+
+#
+#   timed
+#
+
+def timed(label, count, fn, *args):
+    """Call a function and print how long it took per operation."""
+    start = _time()
+    fn(*args)
+    elapsed = _time() - start
+
+    print("%-12s %8.3fs %8.2fus/op" % (label, elapsed, elapsed * 1000000.0 / count))
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+
+    # add an argument for the number of tasks
+    parser.add_argument('--count', type=int, default=100000,
+        help='number of tasks',
+        )
+
+    # add an option to use the timing wheels
+    parser.add_argument('--wheel', action='store_true',
+        help='use the timing wheel task manager',
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    if args.wheel:
+        task_manager = TimingWheelTaskManager()
+    else:
+        task_manager = TaskManager()
+    tasks = [NullTask() for i in range(args.count)]
+
+    # schedule them all in the next minute, like protocol timers
+    now = task_manager.get_time() + 1.0
+    spread = 50.0 / args.count
+    def schedule():
+        for i, task in enumerate(tasks):
+            task.install_task(now + i * spread)
+
+    # move each one, like a timer being restarted
+    def reschedule():
+        for i, task in enumerate(tasks):
+            task.install_task(now + (args.count - i) * spread)
+
+    # cancel each one
+    def cancel():
+        for task in tasks:
+            task.suspend_task()
+
+    # schedule them for now and process them
+    def drain():
+        for task in tasks:
+            task.install_task(0.0)
+        while True:
+            task, delta = task_manager.get_next_task()
+            if not task:
+                break
+            task_manager.process_task(task)
+
+    timed("schedule", args.count, schedule)
+    timed("reschedule", args.count, reschedule)
+    timed("cancel", args.count, cancel)
+    timed("drain", args.count, drain)
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,15 @@ from . import time_machine
 from . import extended_tag_list
 from . import trapped_classes
 
+from . import test_app
 from . import test_comm
+from . import test_constructed_data
+from . import test_core
+from . import test_farm
 # from . import test_objects
 from . import test_pdu
 from . import test_primitive_data
+from . import test_task
 from . import test_utilities
 from . import test_vlan
+from . import test_worker
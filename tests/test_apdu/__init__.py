@@ -5,3 +5,4 @@ Test BACpypes APDU Module
 """
 
 from . import test_max_apdu_length_accepted, test_max_segments_accepted
+from . import test_lazy_decoding
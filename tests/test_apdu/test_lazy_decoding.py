@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Lazy Decoding
+------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes.errors import InvalidTag
+
+from bacpypes.pdu import Address
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any
+from bacpypes.apdu import ConfirmedRequestPDU, ComplexAckPDU, \
+    RejectPDU, ReadPropertyRequest, ReadPropertyACK
+from bacpypes.appservice import ApplicationServiceAccessPoint
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def encoded_request(**kwargs):
+    """Return a confirmed request PDU with a ReadProperty in it."""
+    request = ReadPropertyRequest(**kwargs)
+    request.pduSource = Address('1.2.3.5')
+    request.apduInvokeID = 7
+
+    apdu = ConfirmedRequestPDU()
+    request.encode(apdu)
+
+    return apdu
+
+
+def encoded_ack():
+    """Return a complex ack PDU with a ReadProperty ACK in it."""
+    ack = ReadPropertyACK(
+        objectIdentifier=('analogValue', 1),
+        propertyIdentifier='presentValue',
+        )
+    ack.propertyValue = Any()
+    ack.propertyValue.cast_in(Real(72.5))
+    ack.apduInvokeID = 7
+
+    apdu = ComplexAckPDU()
+    ack.encode(apdu)
+
+    return apdu
+
+
+@bacpypes_debugging
+class TestLazyDecoding(unittest.TestCase):
+
+    def test_decode(self):
+        if _debug: TestLazyDecoding._debug("test_decode")
+
+        apdu = encoded_request(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            )
+        data = bytes(apdu.pduData)
+
+        xpdu = ReadPropertyRequest()
+        xpdu.decode(apdu, lazy=True)
+
+        # the header is decoded and the parameters are kept
+        assert xpdu.apduInvokeID == 7
+        assert 'objectIdentifier' not in xpdu.__dict__
+        assert xpdu.get_service_data() == data
+
+        # until one of them is read
+        assert xpdu.propertyIdentifier == 'presentValue'
+        assert xpdu.objectIdentifier == ('analogValue', 1)
+        assert xpdu.propertyArrayIndex is None
+
+        # the parameters are encoded again
+        assert xpdu.get_service_data() == data
+
+    def test_encode(self):
+        if _debug: TestLazyDecoding._debug("test_encode")
+
+        apdu = encoded_ack()
+        data = bytes(apdu.pduData)
+
+        xpdu = ReadPropertyACK()
+        xpdu.decode(apdu, lazy=True)
+
+        # forwarded without decoding the parameters
+        xpdu.apduInvokeID = 8
+        fpdu = ComplexAckPDU()
+        xpdu.encode(fpdu)
+        assert fpdu.apduInvokeID == 8
+        assert bytes(fpdu.pduData) == data
+        assert 'propertyValue' not in xpdu.__dict__
+
+        # changes after they are decoded are encoded
+        assert xpdu.propertyValue.cast_out(Real) == 72.5
+        xpdu.propertyIdentifier = 'description'
+        fpdu = ComplexAckPDU()
+        xpdu.encode(fpdu)
+        assert bytes(fpdu.pduData) != data
+
+    def test_assign(self):
+        if _debug: TestLazyDecoding._debug("test_assign")
+
+        apdu = encoded_request(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            )
+
+        # change an element before any of them are read
+        xpdu = ReadPropertyRequest()
+        xpdu.decode(apdu, lazy=True)
+        xpdu.objectIdentifier = ('analogValue', 2)
+
+        # the value sticks and the rest are still there
+        assert xpdu.objectIdentifier == ('analogValue', 2)
+        assert xpdu.propertyIdentifier == 'presentValue'
+
+        # and it is encoded
+        fpdu = ConfirmedRequestPDU()
+        xpdu.encode(fpdu)
+        assert bytes(fpdu.pduData) == bytes(encoded_request(
+            objectIdentifier=('analogValue', 2),
+            propertyIdentifier='presentValue',
+            ).pduData)
+
+        # the same for octets that were set
+        xpdu.set_service_data(b'')
+        xpdu.propertyIdentifier = 'description'
+        assert xpdu.get_service_data() == bytes(encoded_request(
+            objectIdentifier=('analogValue', 2),
+            propertyIdentifier='description',
+            ).pduData)
+
+    def test_missing_attribute(self):
+        if _debug: TestLazyDecoding._debug("test_missing_attribute")
+
+        xpdu = ReadPropertyRequest()
+        xpdu.decode(encoded_request(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            ), lazy=True)
+
+        # other attributes are still missing
+        with self.assertRaises(AttributeError):
+            xpdu.somethingElse
+        assert xpdu.objectIdentifier == ('analogValue', 1)
+
+    def test_decoding_error(self):
+        if _debug: TestLazyDecoding._debug("test_decoding_error")
+
+        apdu = ConfirmedRequestPDU(choice=12)
+        apdu.put_data(xtob('1c'))
+
+        # a bad tag is found when the parameters are read
+        xpdu = ReadPropertyRequest()
+        xpdu.decode(apdu, lazy=True)
+        with self.assertRaises(InvalidTag):
+            xpdu.objectIdentifier
+        with self.assertRaises(InvalidTag):
+            xpdu.propertyIdentifier
+
+
+@bacpypes_debugging
+class TestLazyServiceAccessPoint(unittest.TestCase):
+
+    def setUp(self):
+        self.asap = ApplicationServiceAccessPoint()
+        self.asap.lazyDecoding = True
+
+        # catch what goes up and back down
+        self.indications = []
+        self.confirmations = []
+        self.asap.serviceElement = self
+        self.asap.elementService = self
+
+    def indication(self, apdu):
+        self.indications.append(apdu)
+
+        # read something from it
+        apdu.objectIdentifier
+
+    def sap_confirmation(self, apdu):
+        self.confirmations.append(apdu)
+
+    def test_confirmed_request(self):
+        if _debug: TestLazyServiceAccessPoint._debug("test_confirmed_request")
+
+        apdu = encoded_request(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            )
+        self.asap.indication(apdu)
+
+        xpdu = self.indications[0]
+        assert isinstance(xpdu, ReadPropertyRequest)
+        assert xpdu.propertyIdentifier == 'presentValue'
+        assert not self.confirmations
+
+    def test_reject(self):
+        if _debug: TestLazyServiceAccessPoint._debug("test_reject")
+
+        apdu = ConfirmedRequestPDU(choice=12)
+        apdu.pduSource = Address('1.2.3.5')
+        apdu.apduInvokeID = 7
+        apdu.put_data(xtob('1c'))
+
+        # the decoding error is found by the application and rejected
+        self.asap.indication(apdu)
+
+        assert len(self.indications) == 1
+        reject = self.confirmations[0]
+        assert isinstance(reject, RejectPDU)
+        assert reject.apduInvokeID == 7
+
+    def test_complex_ack(self):
+        if _debug: TestLazyServiceAccessPoint._debug("test_complex_ack")
+
+        captured = []
+        self.asap.sap_response = captured.append
+
+        self.asap.confirmation(encoded_ack())
+
+        xpdu = captured[0]
+        assert isinstance(xpdu, ReadPropertyACK)
+        assert 'propertyValue' not in xpdu.__dict__
+        assert xpdu.propertyValue.cast_out(Real) == 72.5
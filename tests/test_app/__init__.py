@@ -0,0 +1,8 @@
+#!/usr/bin/python
+
+"""
+Test Application
+----------------
+"""
+
+from . import test_response_cache
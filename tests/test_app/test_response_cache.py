@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Response Cache
+-------------------
+"""
+
+import unittest
+
+from time import time
+from threading import Event, current_thread
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.core import run_once
+from bacpypes.worker import WorkerPool, blocking
+from bacpypes.pdu import Address
+from bacpypes.app import LocalDeviceObject, Application
+from bacpypes.object import AnalogValueObject
+from bacpypes.primitivedata import CharacterString
+from bacpypes.apdu import APDU, ReadPropertyRequest, ReadPropertyACK, \
+    WhoIsRequest, IAmRequest
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def encoded(apdu):
+    """Return the encoded service parameters of a response."""
+    xpdu = APDU()
+    apdu.encode(xpdu)
+    return bytes(xpdu.pduData)
+
+
+@bacpypes_debugging
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.device = LocalDeviceObject(
+            objectName='test', objectIdentifier=('device', 999),
+            vendorIdentifier=999,
+            )
+        self.app = Application(self.device, '1.2.3.4')
+
+        # catch the requests and responses
+        self.requests = []
+        self.responses = []
+        self.app.elementService = self
+
+    def sap_indication(self, apdu):
+        self.requests.append(apdu)
+
+    def sap_confirmation(self, apdu):
+        self.responses.append(apdu)
+
+    def read_property(self, objectIdentifier, propertyIdentifier, invokeID=1):
+        """Ask the application for a property value and return the ack."""
+        apdu = ReadPropertyRequest(
+            objectIdentifier=objectIdentifier,
+            propertyIdentifier=propertyIdentifier,
+            )
+        apdu.pduSource = Address('1.2.3.5')
+        apdu.apduInvokeID = invokeID
+        self.app.indication(apdu)
+
+        resp = self.responses.pop()
+        assert isinstance(resp, ReadPropertyACK)
+        assert resp.pduDestination == apdu.pduSource
+        assert resp.apduInvokeID == invokeID
+
+        return resp
+
+    def test_read_property(self):
+        if _debug: TestResponseCache._debug("test_read_property")
+
+        resp1 = self.read_property(('device', 999), 'objectName', 1)
+        assert self.device in self.app.responseCache
+
+        # the second one is built from the first
+        resp2 = self.read_property(('device', 999), 'objectName', 2)
+        assert resp2.propertyValue.cast_out(CharacterString) == 'test'
+        assert encoded(resp2) == encoded(resp1)
+
+        # the wildcard device identifier is kept separately
+        resp3 = self.read_property(('device', 4194303), 'objectName', 3)
+        assert encoded(resp3) == encoded(resp1)
+
+    def test_write_property(self):
+        if _debug: TestResponseCache._debug("test_write_property")
+
+        resp1 = self.read_property(('device', 999), 'objectName')
+
+        # a write changes the response
+        self.device.objectName = 'other'
+        assert self.device not in self.app.responseCache
+
+        resp2 = self.read_property(('device', 999), 'objectName')
+        assert resp2.propertyValue.cast_out(CharacterString) == 'other'
+        assert encoded(resp2) != encoded(resp1)
+
+    def test_not_cacheable(self):
+        if _debug: TestResponseCache._debug("test_not_cacheable")
+
+        # the time changes all the time
+        self.read_property(('device', 999), 'localTime')
+        assert self.device not in self.app.responseCache
+
+        # the present value is not in the list
+        obj = AnalogValueObject(
+            objectName='av', objectIdentifier=('analogValue', 1),
+            presentValue=1.0,
+            )
+        self.app.add_object(obj)
+        self.read_property(('analogValue', 1), 'presentValue')
+        assert obj not in self.app.responseCache
+
+        # unless the application says so
+        self.app.cachedProperties = Application.cachedProperties | set(['presentValue'])
+        self.read_property(('analogValue', 1), 'presentValue')
+        assert obj in self.app.responseCache
+
+    def test_object_read_property(self):
+        if _debug: TestResponseCache._debug("test_object_read_property")
+
+        # an object that computes its name when it is read
+        class ComputedNameObject(AnalogValueObject):
+
+            _name = 'first'
+
+            def ReadProperty(self, propid, arrayIndex=None):
+                if propid == 'objectName':
+                    return self._name
+                return AnalogValueObject.ReadProperty(self, propid, arrayIndex)
+
+        obj = ComputedNameObject(
+            objectName='av', objectIdentifier=('analogValue', 1),
+            )
+        self.app.add_object(obj)
+
+        for name in ('first', 'second', 'third'):
+            obj._name = name
+            resp = self.read_property(('analogValue', 1), 'objectName')
+            assert resp.propertyValue.cast_out(CharacterString) == name
+        assert obj not in self.app.responseCache
+
+    def test_add_delete_object(self):
+        if _debug: TestResponseCache._debug("test_add_delete_object")
+
+        obj = AnalogValueObject(
+            objectName='av', objectIdentifier=('analogValue', 1),
+            )
+        self.read_property(('device', 999), 'objectName')
+
+        self.app.add_object(obj)
+        assert self.device not in self.app.responseCache
+
+        self.read_property(('analogValue', 1), 'objectName')
+        assert obj in self.app.responseCache
+
+        self.app.delete_object(obj)
+        assert obj not in self.app.responseCache
+
+    def test_who_is(self):
+        if _debug: TestResponseCache._debug("test_who_is")
+
+        for source in (Address('1.2.3.5'), Address('1.2.3.6')):
+            apdu = WhoIsRequest()
+            apdu.pduSource = source
+            self.app.indication(apdu)
+
+        iAm1, iAm2 = self.requests
+        assert isinstance(iAm2, IAmRequest)
+        assert iAm1.pduDestination == Address('1.2.3.5')
+        assert iAm2.pduDestination == Address('1.2.3.6')
+        assert iAm2.iAmDeviceIdentifier == ('device', 999)
+        assert encoded(iAm2) == encoded(iAm1)
+
+        # a new vendor identifier
+        self.device.vendorIdentifier = 998
+        apdu = WhoIsRequest()
+        apdu.pduSource = Address('1.2.3.5')
+        self.app.indication(apdu)
+
+        iAm3 = self.requests[-1]
+        assert iAm3.vendorID == 998
+        assert encoded(iAm3) != encoded(iAm1)
+
+
+class CoreThreadDict(dict):
+
+    """A dictionary that records the threads that change it."""
+
+    def __init__(self):
+        dict.__init__(self)
+        self.threads = set()
+
+    def setdefault(self, key, default=None):
+        self.threads.add(current_thread())
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, default=None):
+        self.threads.add(current_thread())
+        return dict.pop(self, key, default)
+
+
+@bacpypes_debugging
+class WorkerApplication(Application):
+
+    """An application that reads properties in the worker pool."""
+
+    def __init__(self, *args):
+        Application.__init__(self, *args)
+        self.workerPool = WorkerPool(maxWorkers=1)
+        self.responseCache = CoreThreadDict()
+
+        # set when the helper has finished, the rest is up to the core
+        self.read = Event()
+
+    @blocking
+    def do_ReadPropertyRequest(self, apdu):
+        Application.do_ReadPropertyRequest(self, apdu)
+        self.read.set()
+
+
+@bacpypes_debugging
+class TestWorkerPoolCache(unittest.TestCase):
+
+    def setUp(self):
+        self.device = LocalDeviceObject(
+            objectName='test', objectIdentifier=('device', 999),
+            vendorIdentifier=999,
+            )
+        self.app = WorkerApplication(self.device, '1.2.3.4')
+
+        # catch the responses
+        self.responses = []
+        self.app.elementService = self
+
+    def tearDown(self):
+        self.app.workerPool.shutdown()
+
+    def sap_confirmation(self, apdu):
+        self.responses.append(apdu)
+
+    def read_property(self):
+        """Start reading the object name, return when it has been read."""
+        apdu = ReadPropertyRequest(
+            objectIdentifier=('device', 999),
+            propertyIdentifier='objectName',
+            )
+        apdu.pduSource = Address('1.2.3.5')
+        apdu.apduInvokeID = 1
+
+        self.app.read.clear()
+        self.app.indication(apdu)
+        assert self.app.read.wait(5.0)
+
+    def run_until_response(self):
+        """Run the core until the response comes back."""
+        deadline = time() + 5.0
+        while not self.responses:
+            if time() > deadline:
+                raise RuntimeError("timeout")
+            run_once()
+
+        resp = self.responses.pop()
+        assert isinstance(resp, ReadPropertyACK)
+        return resp
+
+    def test_read_property(self):
+        if _debug: TestWorkerPoolCache._debug("test_read_property")
+
+        self.read_property()
+        self.run_until_response()
+
+        # kept by the core thread
+        assert self.device in self.app.responseCache
+        assert self.app.responseCache.threads == set([current_thread()])
+
+        # and used by the worker
+        self.read_property()
+        resp = self.run_until_response()
+        assert resp.propertyValue.cast_out(CharacterString) == 'test'
+
+    def test_write_while_reading(self):
+        if _debug: TestWorkerPoolCache._debug("test_write_while_reading")
+
+        # the name changes after it has been read, before the core keeps it
+        self.read_property()
+        self.device.objectName = 'other'
+        resp = self.run_until_response()
+        assert resp.propertyValue.cast_out(CharacterString) == 'test'
+
+        # the old one is not kept
+        assert self.device not in self.app.responseCache
+
+        self.read_property()
+        resp = self.run_until_response()
+        assert resp.propertyValue.cast_out(CharacterString) == 'other'
@@ -6,6 +6,7 @@ Test BACpypes Comm Module
 
 from . import test_pci
 from . import test_pdudata
+from . import test_pducursor
 from . import test_pdu
 
 from . import test_client
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test PDU Cursor
+---------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes.errors import DecodingError, InvalidTag
+from bacpypes.comm import PDUData, PDUCursor
+from bacpypes.pdu import Address, PDU, PDUCursor as BACnetPDUCursor
+from bacpypes.primitivedata import Tag, TagList
+from bacpypes.bvll import BVLPDU, OriginalUnicastNPDU
+from bacpypes.npdu import NPDU
+from bacpypes.apdu import APDU, ReadPropertyRequest
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestPDUCursor(unittest.TestCase):
+
+    def test_get(self):
+        if _debug: TestPDUCursor._debug("test_get")
+
+        blob = xtob('01.0203.04050607.0809', '.')
+        pdu = PDUData(blob)
+        cursor = PDUCursor(blob)
+
+        # same values as the PDUData
+        for fn in ('get', 'get_short', 'get_long'):
+            assert getattr(cursor, fn)() == getattr(pdu, fn)()
+        assert cursor.get_data(2) == pdu.get_data(2)
+        assert isinstance(cursor.get_data(0), bytes)
+
+        # nothing left
+        assert cursor.pduOffset == cursor.pduLength
+        assert not cursor.pduData
+        with self.assertRaises(DecodingError):
+            cursor.get()
+
+    def test_short_data(self):
+        if _debug: TestPDUCursor._debug("test_short_data")
+
+        cursor = PDUCursor(xtob('010203'))
+        with self.assertRaises(DecodingError):
+            cursor.get_long()
+        with self.assertRaises(DecodingError):
+            cursor.get_data(4)
+
+        # nothing was consumed
+        assert cursor.get_short() == 0x0102
+        assert cursor.pduData.tobytes() == xtob('03')
+
+    def test_read_only(self):
+        if _debug: TestPDUCursor._debug("test_read_only")
+
+        cursor = PDUCursor(xtob('01'))
+        with self.assertRaises(TypeError):
+            cursor.put(2)
+        with self.assertRaises(TypeError):
+            cursor.put_data(xtob('02'))
+
+    def test_tags(self):
+        if _debug: TestPDUCursor._debug("test_tags")
+
+        blob = xtob('2105.3e.2a0102.3f.7506.0068656c6c6f.2100', '.')
+        cursor = PDUCursor(blob)
+        pdu = PDUData(blob)
+
+        # a tag decodes the same from both
+        while pdu.pduData:
+            assert Tag(cursor) == Tag(pdu)
+        assert cursor.pduOffset == len(blob)
+
+    def test_tag_list(self):
+        if _debug: TestPDUCursor._debug("test_tag_list")
+
+        data = bytearray(xtob('2105.3e.2a0102.3f', '.'))
+        pdu = PDUData(data)
+        taglist = TagList()
+        taglist.decode(pdu)
+
+        assert len(taglist) == 4
+        assert pdu.pduData == b''
+
+        # the view has been released
+        data.extend(xtob('00'))
+
+    def test_tag_list_error(self):
+        if _debug: TestPDUCursor._debug("test_tag_list_error")
+
+        # the second tag is short one octet
+        data = bytearray(xtob('2105.2a01', '.'))
+        pdu = PDUData(data)
+        taglist = TagList()
+        with self.assertRaises(InvalidTag):
+            taglist.decode(pdu)
+
+        # the tags and octets that were read are gone
+        assert len(taglist) == 1
+        assert pdu.pduData == xtob('01')
+
+        # the view has been released
+        data.extend(xtob('00'))
+
+    def test_pci(self):
+        if _debug: TestPDUCursor._debug("test_pci")
+
+        pdu = PDU(xtob('01'), source=Address(1), destination=Address(2),
+            user_data=3, expectingReply=1, networkPriority=2)
+
+        # the PCI fields come along
+        cursor = BACnetPDUCursor(pdu)
+        assert (cursor.pduSource, cursor.pduDestination) == (Address(1), Address(2))
+        assert cursor.pduUserData == 3
+        assert (cursor.pduExpectingReply, cursor.pduNetworkPriority) == (1, 2)
+        assert cursor.get() == 1
+
+        # unless they are given
+        cursor = BACnetPDUCursor(pdu, source=Address(4), networkPriority=3)
+        assert cursor.pduSource == Address(4)
+        assert cursor.pduNetworkPriority == 3
+
+        # just data has none
+        cursor = BACnetPDUCursor(xtob('01'))
+        assert cursor.pduSource is None
+        assert cursor.pduExpectingReply == 0
+
+    def test_bvlpdu(self):
+        if _debug: TestPDUCursor._debug("test_bvlpdu")
+
+        pdu = PDU(xtob('810a0008.0104.0001', '.'), source=Address('192.168.0.1'))
+        bvlpdu = BVLPDU()
+        bvlpdu.decode(BACnetPDUCursor(pdu))
+
+        assert bvlpdu.bvlciFunction == OriginalUnicastNPDU.messageType
+        assert bvlpdu.bvlciLength == 8
+        assert bvlpdu.pduSource == Address('192.168.0.1')
+        assert bvlpdu.pduData == xtob('0104.0001', '.')
+
+        # the PDU has not been changed
+        assert pdu.pduData == xtob('810a0008.0104.0001', '.')
+
+    def test_npdu(self):
+        if _debug: TestPDUCursor._debug("test_npdu")
+
+        # routed to network 5, address 0x0a
+        pdu = PDU(xtob('0124.0005.010a.ff.0001', '.'), source=Address(1))
+        npdu = NPDU()
+        npdu.decode(BACnetPDUCursor(pdu))
+
+        assert npdu.pduSource == Address(1)
+        assert npdu.npduDADR == Address('5:10')
+        assert npdu.npduHopCount == 255
+        assert npdu.pduExpectingReply
+        assert npdu.pduData == xtob('0001')
+
+    def test_apdu(self):
+        if _debug: TestPDUCursor._debug("test_apdu")
+
+        pdu = PDU(xtob('0005010c.0c0200000a.1955', '.'), source=Address(1))
+        apdu = APDU()
+        apdu.decode(BACnetPDUCursor(pdu))
+
+        assert apdu.apduType == ReadPropertyRequest.pduType
+        assert apdu.apduInvokeID == 1
+        assert apdu.pduSource == Address(1)
+
+        # and on to the request
+        request = ReadPropertyRequest()
+        request.decode(apdu)
+        assert request.objectIdentifier == ('device', 10)
+        assert request.propertyIdentifier == 'presentValue'
@@ -1 +1,102 @@
-# placeholder
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test PDU Data
+-------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes.comm import PDUData
+from bacpypes.pdu import PDU
+from bacpypes.bvll import BVLPDU, OriginalUnicastNPDU
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestShareData(unittest.TestCase):
+
+    def test_share_empty(self):
+        if _debug: TestShareData._debug("test_share_empty")
+
+        data = bytearray(xtob('0102'))
+        pdu = PDUData()
+        pdu.share_data(data)
+
+        # same octets, not a copy
+        assert pdu.pduData is data
+
+    def test_share_append(self):
+        if _debug: TestShareData._debug("test_share_append")
+
+        data = bytearray(xtob('0102'))
+        pdu = PDUData(xtob('00'))
+        pdu.share_data(data)
+
+        # already had something, so it was appended
+        assert pdu.pduData == xtob('000102')
+        assert data == xtob('0102')
+
+    def test_share_bytes(self):
+        if _debug: TestShareData._debug("test_share_bytes")
+
+        pdu = PDUData()
+        pdu.share_data(xtob('0102'))
+
+        # still a bytearray
+        assert isinstance(pdu.pduData, bytearray)
+        assert pdu.pduData == xtob('0102')
+
+    def test_encode_twice(self):
+        if _debug: TestShareData._debug("test_encode_twice")
+
+        npdu = bytearray(xtob('01.00.1234', '.'))
+        xpdu = OriginalUnicastNPDU()
+        xpdu.share_data(npdu)
+
+        # a BBMD sends the same one to each peer
+        for i in range(2):
+            bvlpdu = BVLPDU()
+            xpdu.encode(bvlpdu)
+            pdu = PDU()
+            bvlpdu.encode(pdu)
+
+            assert pdu.pduData == xtob('810a0008.01.00.1234', '.')
+
+        # the octets from upstream are unchanged
+        assert npdu == xtob('01.00.1234', '.')
+
+
+@bacpypes_debugging
+class TestGetData(unittest.TestCase):
+
+    def test_get_some(self):
+        if _debug: TestGetData._debug("test_get_some")
+
+        pdu = PDUData(xtob('010203'))
+        data = pdu.get_data(2)
+
+        assert data == xtob('0102')
+        assert pdu.pduData == xtob('03')
+
+    def test_get_rest(self):
+        if _debug: TestGetData._debug("test_get_rest")
+
+        pdu = PDUData(xtob('010203'))
+        pdu.get()
+        pduData = pdu.pduData
+        data = pdu.get_data(2)
+
+        # taken rather than copied, and the PDU is empty
+        assert data is pduData
+        assert data == xtob('0203')
+        assert pdu.pduData == b''
+
+        # changing one doesn't change the other
+        pdu.put(4)
+        assert data == xtob('0203')
@@ -0,0 +1,8 @@
+#!/usr/bin/python
+
+"""
+Test Constructed Data Module
+"""
+
+from . import test_sequence_codec
+from . import test_packed_values
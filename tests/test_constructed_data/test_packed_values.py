@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Packed Values
+------------------
+
+Arrays and sequences of Real, Double and Unsigned values are encoded and
+decoded all at once, the tags must be the same as those from the helpers
+one at a time.
+"""
+
+import array
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.errors import InvalidTag
+from bacpypes.primitivedata import Tag, TagList, Unsigned, Real, Double, \
+    CharacterString, ClosingTag
+from bacpypes.constructeddata import ArrayOf, SequenceOf, Any, \
+    encode_values, decode_values
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def helper_tags(klass, values):
+    """Return the tags of the values encoded one at a time."""
+    tags = []
+    for value in values:
+        tag = Tag()
+        klass(value).encode(tag)
+        tags.append(tag)
+    return tags
+
+
+@bacpypes_debugging
+class TestPackedValues(unittest.TestCase):
+
+    def test_encode(self):
+        if _debug: TestPackedValues._debug("test_encode")
+
+        for klass, values in (
+                (Real, [0.0, 1.5, -2.25, 3.0]),
+                (Double, [0.0, 1.5, -2.25, 1e300]),
+                (Unsigned, [0, 1, 255, 256, 2 ** 32 - 1]),
+                (CharacterString, ["a", "bc"]),
+                ):
+            taglist = TagList()
+            encode_values(klass, values, taglist)
+            assert taglist.tagList == helper_tags(klass, values)
+
+            # and back again
+            assert decode_values(klass, taglist) == values
+            assert len(taglist) == 0
+
+        # integers are fine for reals
+        taglist = TagList()
+        encode_values(Real, [1, 2], taglist)
+        assert taglist.tagList == helper_tags(Real, [1, 2])
+
+    def test_encode_instances(self):
+        if _debug: TestPackedValues._debug("test_encode_instances")
+
+        # helper instances are still fine
+        taglist = TagList()
+        encode_values(Real, [Real(1.5), 2.5], taglist)
+        assert taglist.tagList == helper_tags(Real, [1.5, 2.5])
+
+        taglist = TagList()
+        encode_values(Unsigned, [Unsigned(3), 4], taglist)
+        assert taglist.tagList == helper_tags(Unsigned, [3, 4])
+
+    def test_encode_errors(self):
+        if _debug: TestPackedValues._debug("test_encode_errors")
+
+        with self.assertRaises(TypeError):
+            encode_values(Real, [1.5, "x"], TagList())
+        with self.assertRaises(TypeError):
+            encode_values(Unsigned, [1, 2.5], TagList())
+        with self.assertRaises(ValueError):
+            encode_values(Unsigned, [1, -1], TagList())
+
+    def test_decode_stops(self):
+        if _debug: TestPackedValues._debug("test_decode_stops")
+
+        taglist = TagList(helper_tags(Real, [1.5, 2.5]) + [ClosingTag(3)])
+        assert decode_values(Real, taglist) == [1.5, 2.5]
+        assert len(taglist) == 1
+
+    def test_decode_errors(self):
+        if _debug: TestPackedValues._debug("test_decode_errors")
+
+        # wrong type
+        taglist = TagList(helper_tags(Real, [1.5]) + helper_tags(Unsigned, [2]))
+        with self.assertRaises(InvalidTag):
+            decode_values(Real, taglist)
+
+        # wrong length
+        taglist = TagList([Tag(Tag.applicationTagClass, Tag.realAppTag, 2, b'\x00\x00')])
+        with self.assertRaises(InvalidTag):
+            decode_values(Real, taglist)
+
+        taglist = TagList([Tag(Tag.applicationTagClass, Tag.unsignedAppTag, 0, b'')])
+        with self.assertRaises(InvalidTag):
+            decode_values(Unsigned, taglist)
+
+        # only numbers go in arrays
+        with self.assertRaises(TypeError):
+            decode_values(CharacterString, TagList(), as_array=True)
+
+    def test_array_of(self):
+        if _debug: TestPackedValues._debug("test_array_of")
+
+        ArrayOfReal = ArrayOf(Real)
+
+        taglist = TagList()
+        ArrayOfReal([1.5, 2.5, 3.5]).encode(taglist)
+        assert taglist.tagList == helper_tags(Real, [1.5, 2.5, 3.5])
+
+        value = ArrayOfReal()
+        value.decode(taglist)
+        assert value.value == [3, 1.5, 2.5, 3.5]
+
+    def test_sequence_of(self):
+        if _debug: TestPackedValues._debug("test_sequence_of")
+
+        SequenceOfUnsigned = SequenceOf(Unsigned)
+
+        taglist = TagList()
+        SequenceOfUnsigned([1, 300, 70000]).encode(taglist)
+        assert taglist.tagList == helper_tags(Unsigned, [1, 300, 70000])
+
+        value = SequenceOfUnsigned()
+        value.decode(taglist)
+        assert value.value == [1, 300, 70000]
+
+    def test_array_module(self):
+        if _debug: TestPackedValues._debug("test_array_module")
+
+        SequenceOfDouble = SequenceOf(Double)
+        ArrayOfReal = ArrayOf(Real)
+
+        # the array is kept as it is
+        values = SequenceOfDouble(array.array('d', [1.5, 2.5]))
+        assert isinstance(values.value, array.array)
+        assert len(values) == 2
+        assert values[1] == 2.5
+
+        taglist = TagList()
+        values.encode(taglist)
+        assert taglist.tagList == helper_tags(Double, [1.5, 2.5])
+
+        # and becomes a list when it changes
+        values.append(3.5)
+        assert values.value == [1.5, 2.5, 3.5]
+
+        # arrays have the length first
+        reals = ArrayOfReal(array.array('f', [1.5, 2.5]))
+        assert len(reals) == 2
+        assert reals[0] == 2
+        assert reals[2] == 2.5
+        with self.assertRaises(IndexError):
+            reals[3]
+
+        # and so does the value, like the list would
+        assert isinstance(reals.value.values, array.array)
+        assert reals.value[0] == 2
+        assert reals.value[1:] == [1.5, 2.5]
+        assert reals.value[-1] == 2.5
+        assert list(reals.value) == [2, 1.5, 2.5]
+        assert reals.value == [2, 1.5, 2.5]
+        assert reals.index(2.5) == 2
+
+        taglist = TagList()
+        reals.encode(taglist)
+        assert taglist.tagList == helper_tags(Real, [1.5, 2.5])
+
+        reals[1] = 0.5
+        assert reals.value == [2, 0.5, 2.5]
+
+        values = SequenceOfDouble(array.array('d', [1.5, 2.5]))
+        obj = Any()
+        obj.cast_in(values)
+
+        rslt = obj.cast_out(SequenceOfDouble, as_array=True)
+        if numpy is None:
+            assert isinstance(rslt, array.array)
+        assert list(rslt) == [1.5, 2.5]
+
+        # the usual lists
+        assert obj.cast_out(SequenceOfDouble) == [1.5, 2.5]
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        if _debug: TestPackedValues._debug("test_numpy")
+
+        ArrayOfReal = ArrayOf(Real)
+        ArrayOfUnsigned = ArrayOf(Unsigned)
+
+        # the NumPy array is the value, the items are Python values
+        values = ArrayOfReal(numpy.arange(4, dtype=numpy.float32))
+        assert isinstance(values.value.values, numpy.ndarray)
+        assert len(values) == 4
+        assert values[0] == 4
+        assert type(values[2]) is float
+        assert values[2] == 1.0
+
+        # the length is first in the value
+        assert values.value[0] == 4
+        assert values.value[1:] == [0.0, 1.0, 2.0, 3.0]
+        assert type(values.value[1]) is float
+
+        obj = Any()
+        obj.cast_in(values)
+        assert obj.tagList.tagList == helper_tags(Real, [0.0, 1.0, 2.0, 3.0])
+        assert isinstance(values.value.values, numpy.ndarray)
+
+        # the contents do not change it into a list
+        assert values.dict_contents() == [4, 0.0, 1.0, 2.0, 3.0]
+        assert isinstance(values.value.values, numpy.ndarray)
+
+        rslt = obj.cast_out(ArrayOfReal, as_array=True)
+        assert isinstance(rslt, numpy.ndarray)
+        assert rslt.dtype == numpy.float32
+        assert rslt.tolist() == [0.0, 1.0, 2.0, 3.0]
+
+        # encoding a NumPy array directly
+        taglist = TagList()
+        encode_values(Real, numpy.array([1.5, 2.5]), taglist)
+        assert taglist.tagList == helper_tags(Real, [1.5, 2.5])
+
+        # sequences too
+        sequence = SequenceOf(Double)(numpy.array([1.5, 2.5]))
+        assert sequence[0:2] == [1.5, 2.5]
+        taglist = TagList()
+        sequence.encode(taglist)
+        assert taglist.tagList == helper_tags(Double, [1.5, 2.5])
+
+        obj = Any()
+        obj.cast_in(ArrayOfUnsigned(numpy.array([1, 2, 300])))
+        rslt = obj.cast_out(ArrayOfUnsigned, as_array=True)
+        assert rslt.dtype == numpy.uint64
+        assert rslt.tolist() == [1, 2, 300]
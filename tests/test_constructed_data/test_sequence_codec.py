@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Compiled Sequences
+-----------------------
+
+Every Sequence class in the apdu and basetypes modules is filled in with
+some values, then encoded and decoded both ways and the results are
+compared with those from the generic functions.
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import apdu, basetypes, constructeddata
+from bacpypes.primitivedata import TagList, Atomic, Null, Boolean, \
+    Unsigned, Integer, Real, Double, OctetString, CharacterString, \
+    BitString, Enumerated, Date, Time, ObjectIdentifier
+from bacpypes.constructeddata import Sequence, Choice, Any, AnyAtomic, \
+    _sequence_of_classes, _array_of_classes
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# how deep to go filling in nested structures
+MAX_DEPTH = 6
+
+
+def atomic_value(klass):
+    """Return a value for an atomic class."""
+    if issubclass(klass, Null):
+        return ()
+    if issubclass(klass, Boolean):
+        return True
+    if issubclass(klass, Unsigned):
+        return 1
+    if issubclass(klass, Integer):
+        return -2
+    if issubclass(klass, (Real, Double)):
+        return 1.5
+    if issubclass(klass, OctetString):
+        return b'\x01\x02'
+    if issubclass(klass, CharacterString):
+        return "abc"
+    if issubclass(klass, BitString):
+        bit_len = getattr(klass, 'bitLen', 0) or 3
+        return [1] + [0] * (bit_len - 1)
+    if issubclass(klass, Enumerated):
+        enumerations = getattr(klass, 'enumerations', None)
+        if enumerations:
+            return min(enumerations.values())
+        return 0
+    if issubclass(klass, Date):
+        return (121, 2, 3, 3)
+    if issubclass(klass, Time):
+        return (1, 2, 3, 4)
+    if issubclass(klass, ObjectIdentifier):
+        return ('analogValue', 1)
+    raise TypeError("no value for %r" % (klass,))
+
+
+def sample(klass, depth=0, optionals=True):
+    """Return a value for an element of the class."""
+    if depth > MAX_DEPTH:
+        return None
+
+    if klass in _sequence_of_classes:
+        value = sample(klass.subtype, depth + 1, optionals)
+        return [] if value is None else [value]
+    if klass in _array_of_classes:
+        value = sample(klass.subtype, depth + 1, optionals)
+        return klass([] if value is None else [value])
+    if issubclass(klass, Atomic):
+        return atomic_value(klass)
+    if issubclass(klass, AnyAtomic):
+        return Real(2.5)
+    if issubclass(klass, Any):
+        value = Any()
+        value.cast_in(Unsigned(3))
+        return value
+    if issubclass(klass, Choice):
+        for element in klass.choiceElements:
+            value = sample(element.klass, depth + 1, optionals)
+            if value is not None:
+                return klass(**{element.name: value})
+        return None
+    if issubclass(klass, Sequence):
+        kwargs = {}
+        for element in klass.sequenceElements:
+            if element.optional and not optionals:
+                continue
+            kwargs[element.name] = sample(element.klass, depth + 1, optionals)
+        return klass(**kwargs)
+
+    # not something that can be filled in
+    return None
+
+
+def sequence_classes():
+    """Return the Sequence classes in the apdu and basetypes modules."""
+    classes = []
+    for module in (apdu, basetypes):
+        for name, klass in sorted(vars(module).items()):
+            if isinstance(klass, type) and issubclass(klass, Sequence) \
+                    and (klass.__module__ == module.__name__) and klass.sequenceElements:
+                classes.append(klass)
+    return classes
+
+
+def outcome(fn, *args):
+    """Call the function, return the result or the exception."""
+    try:
+        return ('ok', fn(*args))
+    except Exception as err:
+        return ('error', type(err), str(err))
+
+
+def encode(obj, compiled):
+    constructeddata.compileSequences = compiled
+    taglist = TagList()
+    Sequence.encode(obj, taglist)
+    return taglist.tagList
+
+
+def decode(klass, tags, compiled):
+    constructeddata.compileSequences = compiled
+    obj = klass()
+    Sequence.decode(obj, TagList(list(tags)))
+
+    # encode it again, the generic way, to compare
+    return encode(obj, False)
+
+
+@bacpypes_debugging
+class TestSequenceCodec(unittest.TestCase):
+
+    def tearDown(self):
+        constructeddata.compileSequences = True
+
+    def check_class(self, klass, optionals):
+        if _debug: TestSequenceCodec._debug("check_class %r %r", klass, optionals)
+
+        obj = sample(klass, optionals=optionals)
+
+        # encode both ways
+        generic = outcome(encode, obj, False)
+        compiled = outcome(encode, obj, True)
+        assert generic == compiled, klass
+        if generic[0] != 'ok':
+            return 0
+
+        tags = generic[1]
+
+        # decode it both ways, then with the last tag missing
+        for tags in (tags, tags[:-1]):
+            generic = outcome(decode, klass, tags, False)
+            compiled = outcome(decode, klass, tags, True)
+            assert generic == compiled, klass
+
+        return 1
+
+    def test_all_classes(self):
+        if _debug: TestSequenceCodec._debug("test_all_classes")
+
+        classes = sequence_classes()
+        assert len(classes) > 100
+
+        encoded = 0
+        for klass in classes:
+            encoded += self.check_class(klass, True)
+            encoded += self.check_class(klass, False)
+
+        # most of them can be filled in
+        assert encoded > len(classes)
+
+    def test_codec_cached(self):
+        if _debug: TestSequenceCodec._debug("test_codec_cached")
+
+        codec = constructeddata._sequence_codec(apdu.ReadPropertyRequest)
+        assert constructeddata._sequence_codec(apdu.ReadPropertyRequest) is codec
+        assert len(codec.encoders) == len(apdu.ReadPropertyRequest.sequenceElements)
+
+        # classes that share elements have their own
+        assert constructeddata._sequence_codec(apdu.ConfirmedCOVNotificationRequest) \
+            is not constructeddata._sequence_codec(apdu.UnconfirmedCOVNotificationRequest)
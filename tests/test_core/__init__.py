@@ -0,0 +1,12 @@
+#!/usr/bin/python
+
+"""
+Test Core
+---------
+"""
+
+from . import test_deferred
+from . import test_loop_stats
+from . import test_selectors
+from . import test_sampler
+from . import test_asyncio
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Asyncio Event Loop
+-----------------------
+"""
+
+import asyncio
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import core
+from bacpypes.comm import Client, bind
+from bacpypes.pdu import PDU
+from bacpypes.task import OneShotFunction, TaskManager
+from bacpypes.udp import UDPDirector
+from bacpypes.tcp import TCPClientDirector, TCPServerDirector
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class Endpoint(Client):
+
+    """A client at the top of a director that records what comes up and
+    can echo it back."""
+
+    def __init__(self, echo=False):
+        Client.__init__(self)
+        self.echo = echo
+        self.received = []
+
+    def confirmation(self, pdu):
+        self.received.append(pdu)
+
+        if self.echo:
+            self.request(PDU(pdu.pduData, destination=pdu.pduSource))
+        else:
+            core.stop()
+
+
+@bacpypes_debugging
+class TestAsyncio(unittest.TestCase):
+
+    def setUp(self):
+        # the time machine is the task manager, its trigger is replaced
+        self.task_manager = TaskManager()
+        self.trigger = self.task_manager.trigger
+
+        self.loop = core.enable_asyncio()
+
+        # stop even if nothing comes back
+        self.watchdog = self.loop.call_later(10.0, core.stop)
+
+    def tearDown(self):
+        self.watchdog.cancel()
+
+        # let the transports finish closing
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+        core.asyncioLoop = None
+        self.task_manager.trigger = self.trigger
+
+    def test_udp(self):
+        if _debug: TestAsyncio._debug("test_udp")
+
+        a = UDPDirector(('127.0.0.1', 0))
+        a_endpoint = Endpoint()
+        bind(a_endpoint, a)
+
+        b = UDPDirector(('127.0.0.1', 0))
+        b_endpoint = Endpoint(echo=True)
+        bind(b_endpoint, b)
+
+        # asyncio owns the sockets
+        assert a._fileno not in core.asyncore.socket_map
+        b_address = b.socket.getsockname()
+
+        # a task sends the first datagram
+        reset_time_machine()
+        run_time_machine(60.0)
+        OneShotFunction(a_endpoint.request, PDU(b'hello', destination=b_address))
+
+        core.run()
+        assert not core.running
+
+        # around and back again
+        assert [pdu.pduData for pdu in b_endpoint.received] == [b'hello']
+        assert [pdu.pduData for pdu in a_endpoint.received] == [b'hello']
+        assert a_endpoint.received[0].pduSource == b_address
+
+        a.handle_close()
+        b.handle_close()
+        assert a.transport is None
+        assert b.transport is None
+
+    def test_tcp(self):
+        if _debug: TestAsyncio._debug("test_tcp")
+
+        server = TCPServerDirector(('127.0.0.1', 0))
+        server_endpoint = Endpoint(echo=True)
+        bind(server_endpoint, server)
+        server_address = server.socket.getsockname()
+
+        client = TCPClientDirector()
+        client_endpoint = Endpoint()
+        bind(client_endpoint, client)
+
+        # the connection is made when there is something to send
+        core.deferred(client_endpoint.request, PDU(b'hello', destination=server_address))
+
+        core.run()
+
+        assert [pdu.pduData for pdu in server_endpoint.received] == [b'hello']
+        assert [pdu.pduData for pdu in client_endpoint.received] == [b'hello']
+
+        client.disconnect(server_address)
+        assert client.clients == {}
+        server.handle_close()
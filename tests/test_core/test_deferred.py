@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Deferred Functions
+-----------------------
+"""
+
+import unittest
+
+from threading import Thread
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.core import deferred, call_soon_threadsafe, run_once, \
+    call_deferred, deferred_stats
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestDeferred(unittest.TestCase):
+
+    def test_deferred(self):
+        if _debug: TestDeferred._debug("test_deferred")
+
+        calls = []
+
+        # defer a couple of calls
+        deferred(calls.append, 1)
+        deferred(calls.append, 2)
+        assert calls == []
+
+        # they are called in order
+        run_once()
+        assert calls == [1, 2]
+
+    def test_call_soon_threadsafe(self):
+        if _debug: TestDeferred._debug("test_call_soon_threadsafe")
+
+        calls = []
+
+        # lots of threads asking for calls
+        def worker(n):
+            for i in range(100):
+                call_soon_threadsafe(calls.append, (n, i))
+
+        threads = [Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # they are all called, in order for each thread
+        run_once()
+        assert len(calls) == 400
+        for n in range(4):
+            assert [i for m, i in calls if m == n] == list(range(100))
+
+    def test_count_budget(self):
+        if _debug: TestDeferred._debug("test_count_budget")
+
+        calls = []
+
+        # defer some calls, one defers another
+        for i in range(5):
+            deferred(calls.append, i)
+        deferred(deferred, calls.append, 5)
+
+        # only some of them fit in the budget
+        assert call_deferred(count=3) == 3
+        assert calls == [0, 1, 2]
+        assert deferred_stats()['depth'] == 3
+
+        # the rest are carried over, including the one deferred later
+        assert call_deferred() == 4
+        assert calls == [0, 1, 2, 3, 4, 5]
+        assert deferred_stats()['depth'] == 0
+
+    def test_duration_budget(self):
+        if _debug: TestDeferred._debug("test_duration_budget")
+
+        calls = []
+
+        # defer some calls
+        for i in range(5):
+            deferred(calls.append, i)
+
+        # at least one is called even with a tiny budget
+        assert call_deferred(duration=1e-9) >= 1
+        run_once()
+        assert calls == [0, 1, 2, 3, 4]
+
+    def test_high_water(self):
+        if _debug: TestDeferred._debug("test_high_water")
+
+        # start fresh
+        deferred_stats(reset=True)
+
+        # queue up a pile
+        for i in range(50):
+            deferred(lambda: None)
+        run_once()
+
+        # it went away but the mark remains until it is reset
+        stats = deferred_stats(reset=True)
+        assert stats['depth'] == 0
+        assert stats['highWater'] >= 50
+        assert deferred_stats()['highWater'] == 0
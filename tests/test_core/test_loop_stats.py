@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Loop Statistics
+--------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.core import deferred, enable_loop_stats, loop_stats
+from bacpypes.task import FunctionTask
+from bacpypes.loopstats import Histogram
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+def sample_function(*args):
+    if _debug: sample_function._debug("sample_function %r", args)
+
+
+@bacpypes_debugging
+class TestHistogram(unittest.TestCase):
+
+    def test_record(self):
+        if _debug: TestHistogram._debug("test_record")
+
+        histogram = Histogram()
+        for value in (0.000001, 0.0005, 0.0005, 2.0, -1.0):
+            histogram.record(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot['count'] == 5
+        assert snapshot['max'] == 2.0
+        assert dict(snapshot['buckets']) == {
+            0.00001: 2, 0.0001: 0, 0.001: 2, 0.01: 0, 0.1: 0, 1.0: 0, None: 1,
+            }
+
+
+@bacpypes_debugging
+class TestLoopStats(unittest.TestCase):
+
+    def tearDown(self):
+        if _debug: TestLoopStats._debug("tearDown")
+
+        # leave it off for other tests
+        enable_loop_stats(False)
+
+    def test_disabled(self):
+        if _debug: TestLoopStats._debug("test_disabled")
+
+        # nothing to report
+        enable_loop_stats(False)
+        assert loop_stats() is None
+
+    def test_tasks_and_deferred(self):
+        if _debug: TestLoopStats._debug("test_tasks_and_deferred")
+
+        enable_loop_stats()
+
+        # a couple of tasks and a deferred function
+        reset_time_machine()
+        FunctionTask(sample_function, 1).install_task(1.0)
+        FunctionTask(sample_function, 2).install_task(2.0)
+        deferred(sample_function, 3)
+        run_time_machine(5.0)
+
+        stats = loop_stats(reset=True)
+        assert stats['tasks']['count'] == 2
+        assert stats['lateness']['count'] == 2
+        assert stats['lateness']['max'] == 0.0
+        assert stats['deferred']['count'] == 1
+        assert stats['byName']['sample_function']['count'] == 3
+        assert stats['deferredQueue']['depth'] == 0
+
+        # reset
+        assert loop_stats()['tasks']['count'] == 0
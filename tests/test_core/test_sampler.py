@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Stack Sampler
+------------------
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+from threading import get_ident
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import Client, Server, bind
+from bacpypes.pdu import PDU
+from bacpypes.sampler import StackSampler
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class FrameServer(Server):
+
+    """Save the frame when it gets a request."""
+
+    def indication(self, pdu):
+        self.frame = sys._getframe()
+
+
+@bacpypes_debugging
+class TestStackSampler(unittest.TestCase):
+
+    def test_collapse(self):
+        if _debug: TestStackSampler._debug("test_collapse")
+
+        client = Client()
+        server = FrameServer()
+        bind(client, server)
+        client.request(PDU(b''))
+
+        stack = StackSampler().collapse(server.frame).split(';')
+        if _debug: TestStackSampler._debug("    - stack: %r", stack)
+
+        # tagged by the innermost layer, outermost frame first
+        assert stack[0] == 'FrameServer'
+        assert stack[-2] == 'comm.py:Client.request'
+        assert stack[-1] == 'test_sampler.py:FrameServer.indication'
+
+    def test_no_layer(self):
+        if _debug: TestStackSampler._debug("test_no_layer")
+
+        stack = StackSampler().collapse(sys._getframe()).split(';')
+        assert stack[0] == '-'
+
+    def test_sample(self):
+        if _debug: TestStackSampler._debug("test_sample")
+
+        fd, filename = tempfile.mkstemp(suffix='.collapsed')
+        os.close(fd)
+        try:
+            # sample this thread while it waits
+            sampler = StackSampler(get_ident(), rate=1000.0, duration=0.05, filename=filename)
+            sampler.start()
+            sampler.join()
+
+            with open(filename) as f:
+                lines = f.read().splitlines()
+            assert lines
+
+            # each line is a stack and a count
+            counts = [int(line.rsplit(' ', 1)[1]) for line in lines]
+            assert sum(counts) == sampler.samples
+            assert all('test_sampler.py:TestStackSampler.test_sample' in line for line in lines)
+        finally:
+            os.remove(filename)
+
+    def test_invalid(self):
+        if _debug: TestStackSampler._debug("test_invalid")
+
+        with self.assertRaises(ValueError):
+            StackSampler(rate=0.0)
+        with self.assertRaises(ValueError):
+            StackSampler(duration=-1.0)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Selector Map
+-----------------
+"""
+
+import unittest
+
+import asyncore
+import selectors
+import socket
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.core import _SelectorMap
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class Endpoint(asyncore.dispatcher):
+
+    """A dispatcher for one end of a socket pair that records what it
+    reads and sends what it is given."""
+
+    def __init__(self, sock, map):
+        asyncore.dispatcher.__init__(self, sock, map)
+        self.received = []
+        self.outgoing = b''
+
+    def writable(self):
+        return bool(self.outgoing)
+
+    def handle_read(self):
+        self.received.append(self.recv(1024))
+
+    def handle_write(self):
+        sent = self.send(self.outgoing)
+        self.outgoing = self.outgoing[sent:]
+
+
+@bacpypes_debugging
+class TestSelectorMap(unittest.TestCase):
+
+    def setUp(self):
+        self.map = _SelectorMap(selectors.DefaultSelector())
+        a, b = socket.socketpair()
+        self.a = Endpoint(a, self.map)
+        self.b = Endpoint(b, self.map)
+
+    def tearDown(self):
+        self.a.close()
+        self.b.close()
+        self.map.selector.close()
+
+    def test_interest(self):
+        if _debug: TestSelectorMap._debug("test_interest")
+
+        # nothing registered until the first poll
+        assert self.map.events == {}
+        self.map.poll(0.0)
+        assert self.map.events == {
+            self.a._fileno: selectors.EVENT_READ,
+            self.b._fileno: selectors.EVENT_READ,
+            }
+
+        # queue something to send, write interest after an update
+        self.a.outgoing = b'hello'
+        self.map.pending.add(self.a)
+        self.map.poll(0.0)
+        self.map.poll(0.0)
+        assert self.b.received == [b'hello']
+
+        # back to just reading
+        assert self.map.events[self.a._fileno] == selectors.EVENT_READ
+
+    def test_close(self):
+        if _debug: TestSelectorMap._debug("test_close")
+
+        self.map.poll(0.0)
+
+        # closing removes it from the map and the selector
+        fd = self.a._fileno
+        self.a.close()
+        assert fd not in self.map
+        assert fd not in self.map.events
+        assert len(self.map.selector.get_map()) == 1
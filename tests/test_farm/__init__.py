@@ -0,0 +1,8 @@
+#!/usr/bin/python
+
+"""
+Test Farm
+---------
+"""
+
+from . import test_farm
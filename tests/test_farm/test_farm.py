@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Farm
+---------
+"""
+
+import time
+import socket
+import asyncore
+import unittest
+import multiprocessing
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import core
+from bacpypes.app import LocalDeviceObject
+from bacpypes.farm import ShmRing, FarmMultiplexer, BIPFarmApplication, \
+    _Doorbell, _pack_datagram, _unpack_datagram
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestShmRing(unittest.TestCase):
+
+    def setUp(self):
+        self.writer = ShmRing(size=64)
+        self.reader = ShmRing(self.writer.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_empty(self):
+        if _debug: TestShmRing._debug("test_empty")
+
+        assert self.reader.get() is None
+
+    def test_put_get(self):
+        if _debug: TestShmRing._debug("test_put_get")
+
+        assert self.writer.put(b'hello')
+        assert self.writer.put(b'')
+        assert self.writer.put(b'there')
+
+        assert self.reader.get() == b'hello'
+        assert self.reader.get() == b''
+        assert self.reader.get() == b'there'
+        assert self.reader.get() is None
+
+    def test_full(self):
+        if _debug: TestShmRing._debug("test_full")
+
+        # four 16 octet records fill it up
+        for i in range(4):
+            assert self.writer.put(bytes([i]) * 12)
+        assert not self.writer.put(b'x')
+        assert self.writer.dropped == 1
+
+        # room for one more after reading one
+        assert self.reader.get() == bytes([0]) * 12
+        assert self.writer.put(bytes([4]) * 12)
+
+        for i in range(1, 5):
+            assert self.reader.get() == bytes([i]) * 12
+        assert self.reader.get() is None
+
+    def test_wrap(self):
+        if _debug: TestShmRing._debug("test_wrap")
+
+        # records that do not fit at the end start over at the beginning
+        for i in range(100):
+            record = bytes([i]) * (i % 20)
+            assert self.writer.put(record)
+            assert self.reader.get() == record
+            assert self.reader.get() is None
+
+
+@bacpypes_debugging
+class TestDispatch(unittest.TestCase):
+
+    def worker_index(self, source, data):
+        """Call the front end method without the sockets and processes."""
+        return FarmMultiplexer.worker_index(self, source, data)
+
+    def setUp(self):
+        self.workers = [None] * 4
+        self.transactions = {}
+
+    def test_datagram(self):
+        if _debug: TestDispatch._debug("test_datagram")
+
+        record = _pack_datagram(('10.0.0.1', 47808), b'\x81\x0a', 1)
+        assert _unpack_datagram(record) == (1, ('10.0.0.1', 47808), b'\x81\x0a')
+
+    def test_source(self):
+        if _debug: TestDispatch._debug("test_source")
+
+        # same source, same worker
+        unicast = b'\x81\x0a\x00\x08\x01\x04\x00\x00'
+        for i in range(10):
+            source = ('10.0.0.%d' % (i,), 47808)
+            assert self.worker_index(source, unicast) == self.worker_index(source, unicast)
+            assert self.worker_index(source, unicast) is not None
+
+    def test_broadcast(self):
+        if _debug: TestDispatch._debug("test_broadcast")
+
+        source = ('10.0.0.1', 47808)
+
+        # local and global broadcasts go to all of the workers
+        local = b'\x81\x0b\x00\x08\x01\x00\x10\x08'
+        assert self.worker_index(source, local) is None
+        broadcast = b'\x81\x0b\x00\x0c\x01\x20\xff\xff\x00\xff\x10\x08'
+        assert self.worker_index(source, broadcast) is None
+
+        # so do broadcasts forwarded from a BBMD
+        forwarded = b'\x81\x04\x00\x0e\x0a\x00\x00\x01\xba\xc0\x01\x00\x10\x08'
+        assert self.worker_index(source, forwarded) is None
+
+        # and global broadcasts sent directly
+        unicast = b'\x81\x0a\x00\x0c\x01\x20\xff\xff\x00\xff\x10\x08'
+        assert self.worker_index(source, unicast) is None
+
+    def test_transaction(self):
+        if _debug: TestDispatch._debug("test_transaction")
+
+        peer = ('10.0.0.1', 47808)
+
+        # find a worker that is not the one the peer hashes to
+        request = b'\x81\x0a\x00\x11\x01\x04\x00\x05\x07\x0c\x0c\x02\x00\x00\x01\x19\x4d'
+        hashed = self.worker_index(peer, b'\x81\x0a\x00\x08\x01\x00\x10\x08')
+        worker = type('Worker', (), {'index': (hashed + 1) % 4})
+
+        # the worker sends a confirmed request with invoke ID 7
+        self.directPort = type('Port', (), {'indication': lambda pdu: None})
+        FarmMultiplexer.worker_request(self, worker, peer, request)
+        assert self.transactions == {(peer, None, None, 7): worker.index}
+
+        # a segment of the response and the segment ack from the peer
+        segment = b'\x81\x0a\x00\x0a\x01\x00\x3c\x07\x00\x04'
+        assert self.worker_index(peer, segment) == worker.index
+        assert self.worker_index(peer, b'\x81\x0a\x00\x09\x01\x00\x40\x07\x00') == hashed
+
+        # the last segment finishes the transaction
+        response = b'\x81\x0a\x00\x0a\x01\x00\x38\x07\x01\x0c'
+        assert self.worker_index(peer, response) == worker.index
+        assert self.transactions == {}
+
+        # other invoke IDs are hashed
+        assert self.worker_index(peer, b'\x81\x0a\x00\x09\x01\x00\x20\x08\x0f') == hashed
+
+    def test_destination(self):
+        if _debug: TestDispatch._debug("test_destination")
+
+        # routed to a station on a virtual network, same worker for the
+        # same station no matter who sent it
+        def routed(dadr):
+            return b'\x81\x0a\x00\x0c\x01\x24\x00\x64\x01' + bytes([dadr]) + b'\xff\x00'
+
+        for dadr in range(10):
+            indexes = set(
+                self.worker_index(('10.0.0.%d' % (i,), 47808), routed(dadr))
+                for i in range(10)
+                )
+            assert len(indexes) == 1
+
+    def test_control(self):
+        if _debug: TestDispatch._debug("test_control")
+
+        # BVLL control messages go to the first worker
+        assert self.worker_index(('10.0.0.1', 47808), b'\x81\x02\x00\x04') == 0
+
+
+@bacpypes_debugging
+class TestDoorbell(unittest.TestCase):
+
+    def test_ringing(self):
+        if _debug: TestDoorbell._debug("test_ringing")
+
+        rings = []
+        front, back = multiprocessing.Pipe()
+        front_bell = _Doorbell(front, lambda: None)
+        back_bell = _Doorbell(back, lambda: rings.append(1))
+
+        try:
+            # far more rings than the socket buffer holds, never blocks
+            assert not front_bell.socket.getblocking()
+            for i in range(100000):
+                front_bell.ring()
+
+            back_bell.handle_read()
+            assert rings == [1]
+        finally:
+            front_bell.close()
+            back_bell.close()
+
+
+def make_application(mux):
+    """Called in each worker process, each one has a different device."""
+    device = LocalDeviceObject(
+        objectName='farm-%d' % (mux.index,),
+        objectIdentifier=('device', 1000 + mux.index),
+        maxApduLengthAccepted=1024,
+        segmentationSupported='noSegmentation',
+        vendorIdentifier=15,
+        )
+
+    return BIPFarmApplication(device, mux)
+
+
+@bacpypes_debugging
+class TestFarm(unittest.TestCase):
+
+    def test_who_is(self):
+        if _debug: TestFarm._debug("test_who_is")
+
+        # an unused port for the farm
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+        probe.close()
+
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client.bind(('127.0.0.1', 0))
+        client.setblocking(False)
+
+        farm = FarmMultiplexer('127.0.0.1:%d' % (port,), workers=3, appFactory=make_application)
+        try:
+            # a global Who-Is
+            client.sendto(b'\x81\x0b\x00\x0c\x01\x20\xff\xff\x00\xff\x10\x08', ('127.0.0.1', port))
+
+            # collect the I-Am device instances
+            devices = set()
+            deadline = time.time() + 60.0
+            while (len(devices) < 3) and (time.time() < deadline):
+                asyncore.loop(timeout=0.1, count=1)
+                core.call_deferred()
+                try:
+                    data, addr = client.recvfrom(1500)
+                except BlockingIOError:
+                    continue
+
+                # unconfirmed I-Am with the object identifier first
+                assert data[6:8] == b'\x10\x00'
+                devices.add(int.from_bytes(data[9:13], 'big') & 0x3FFFFF)
+
+            assert devices == {1000, 1001, 1002}
+        finally:
+            farm.close()
+            farm.directPort.close()
+            client.close()
@@ -9,8 +9,9 @@ Nose Test PDU Address
 import unittest
 
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes import pdu
 from bacpypes.pdu import Address, LocalStation, RemoteStation, \
-    LocalBroadcast, RemoteBroadcast, GlobalBroadcast
+    LocalBroadcast, RemoteBroadcast, GlobalBroadcast, intern_address
 
 # some debugging
 _debug = 0
@@ -377,3 +378,73 @@ class TestAddressEquality(unittest.TestCase, MatchAddressMixin):
         assert Address("3:4") == RemoteStation(3, 4)
         assert Address("5:*") == RemoteBroadcast(5)
         assert Address("*:*") == GlobalBroadcast()
+
+    def test_address_equality_tuple(self):
+        if _debug: TestAddressEquality._debug("test_address_equality_tuple")
+
+        assert Address("10.0.0.1") == ("10.0.0.1", 47808)
+        assert Address("10.0.0.1:47809") != ("10.0.0.1", 47808)
+        assert Address("10.0.0.1") == xtob('0a000001bac0')
+
+
+@bacpypes_debugging
+class TestInternAddress(unittest.TestCase, MatchAddressMixin):
+
+    def setUp(self):
+        # start with an empty cache
+        pdu._address_cache.clear()
+        self.cache_size = pdu.addressCacheSize
+
+    def tearDown(self):
+        pdu._address_cache.clear()
+        pdu.addressCacheSize = self.cache_size
+
+    def test_intern_address(self):
+        if _debug: TestInternAddress._debug("test_intern_address")
+
+        # same address as the constructor
+        test_addr = intern_address("10.0.0.1")
+        self.match_address(test_addr, 2, None, 6, '0a000001bac0')
+        assert test_addr == Address("10.0.0.1")
+
+        # and the same instance
+        assert intern_address("10.0.0.1") is test_addr
+
+        # tuples and octets
+        test_addr = intern_address(("10.0.0.2", 47809))
+        self.match_address(test_addr, 2, None, 6, '0a000002bac1')
+        assert intern_address(("10.0.0.2", 47809)) is test_addr
+
+        test_addr = intern_address(bytearray(xtob('0102')))
+        self.match_address(test_addr, 2, None, 2, '0102')
+        assert intern_address(xtob('0102')) is test_addr
+
+    def test_intern_other(self):
+        if _debug: TestInternAddress._debug("test_intern_other")
+
+        # other types are not cached
+        test_addr = intern_address(1)
+        self.match_address(test_addr, 2, None, 1, '01')
+        assert intern_address(1) is not test_addr
+        assert not pdu._address_cache
+
+        # errors are the same as the constructor
+        with self.assertRaises(ValueError):
+            intern_address("bad")
+        with self.assertRaises(TypeError):
+            intern_address(None)
+
+    def test_intern_bounded(self):
+        if _debug: TestInternAddress._debug("test_intern_bounded")
+
+        pdu.addressCacheSize = 2
+
+        addr1 = intern_address("10.0.0.1")
+        addr2 = intern_address("10.0.0.2")
+        assert intern_address("10.0.0.1") is addr1
+
+        # the least recently used one is dropped
+        intern_address("10.0.0.3")
+        assert len(pdu._address_cache) == 2
+        assert intern_address("10.0.0.1") is addr1
+        assert intern_address("10.0.0.2") is not addr2
@@ -1 +1,93 @@
-# placeholder
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test PDU Slots
+--------------
+"""
+
+import copy
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes.comm import PCI as _PCI, PDUData
+from bacpypes.pdu import Address, LocalStation, GlobalBroadcast, PCI, PDU
+from bacpypes.primitivedata import Tag, ApplicationTag, OpeningTag
+from bacpypes.apdu import APDU, ConfirmedRequestPDU, ComplexAckPDU, \
+    ReadPropertyRequest
+from bacpypes.npdu import NPDU
+from bacpypes.bvll import BVLPDU, ForwardedNPDU
+from bacpypes.app import DeviceInfo
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestSlots(unittest.TestCase):
+
+    def test_no_instance_dict(self):
+        if _debug: TestSlots._debug("test_no_instance_dict")
+
+        for obj in (
+                _PCI(), PDUData(), PCI(), PDU(),
+                APDU(), ConfirmedRequestPDU(), NPDU(), BVLPDU(),
+                ForwardedNPDU(Address('10.0.0.1')),
+                Address('10.0.0.1'), LocalStation(1), GlobalBroadcast(),
+                Tag(), ApplicationTag(2, b'\x01'), OpeningTag(0),
+                DeviceInfo(),
+                ):
+            assert not hasattr(obj, '__dict__'), obj.__class__.__name__
+
+    def test_unknown_attribute(self):
+        if _debug: TestSlots._debug("test_unknown_attribute")
+
+        # slotted classes only have their own attributes
+        pdu = PDU()
+        with self.assertRaises(AttributeError):
+            pdu.somethingElse = 1
+
+    def test_subclass_attribute(self):
+        if _debug: TestSlots._debug("test_subclass_attribute")
+
+        # a subclass without slots still has a dictionary
+        class MyPDU(PDU):
+            pass
+
+        pdu = MyPDU(xtob('01'), source=Address(1))
+        pdu.somethingElse = 1
+        assert pdu.somethingElse == 1
+        assert pdu.pduSource == Address(1)
+
+        # and so do the service sequences
+        request = ReadPropertyRequest(
+            objectIdentifier=('device', 1),
+            propertyIdentifier='objectName',
+            )
+        assert hasattr(request, '__dict__')
+        assert request.apduInvokeID is None
+
+    def test_unset_data(self):
+        if _debug: TestSlots._debug("test_unset_data")
+
+        # a PCI shares the layout with PDUData but never has data
+        pci = PCI()
+        assert not hasattr(pci, 'pduData')
+
+    def test_copy(self):
+        if _debug: TestSlots._debug("test_copy")
+
+        apdu = ComplexAckPDU(choice=12, invokeID=3)
+        apdu.pduSource = Address('10.0.0.1')
+        apdu.put_data(xtob('0102'))
+
+        # copies carry the slots along
+        xpdu = copy.copy(apdu)
+        assert xpdu.apduInvokeID == 3
+        assert xpdu.pduSource == apdu.pduSource
+        assert xpdu.pduData == apdu.pduData
+
+        xpdu = copy.deepcopy(apdu)
+        assert xpdu.apduService == 12
+        assert xpdu.pduData is not apdu.pduData
@@ -161,4 +161,38 @@ class TestBitString(unittest.TestCase):
         bit_string_endec([0] * 2, '0600')
         bit_string_endec([1] * 2, '06c0')
         bit_string_endec([0] * 10, '060000')
-        bit_string_endec([1] * 10, '06ffc0')
\ No newline at end of file
+        bit_string_endec([1] * 10, '06ffc0')
+        # long ones, and the short ones again after they have been kept
+        bit_string_endec([1, 0] * 40, '00' + 'aa' * 10)
+        bit_string_endec([0, 1] * 33, '06' + '55' * 8 + '40')
+        bit_string_endec([0, 1, 0, 0], '0440')
+        bit_string_endec([0, 1, 0, 0], '0440')
+
+    def test_bit_string_decode_copy(self):
+        if _debug: TestBitString._debug("test_bit_string_decode_copy")
+
+        # decoded values are not shared
+        tag = Tag(Tag.applicationTagClass, Tag.bitStringAppTag, 2, bytearray(xtob('0440')))
+        obj1 = BitString(tag)
+        obj1[0] = 1
+        obj2 = BitString(tag)
+        assert obj2.value == [0, 1, 0, 0]
+
+    def test_bit_string_long(self):
+        if _debug: TestBitString._debug("test_bit_string_long")
+
+        # the first bit is the most significant
+        obj = BitString([1, 0, 1, 1])
+        assert obj.get_long() == 0b1011
+        assert BitString().get_long() == 0
+
+        obj.set_long(0b0110)
+        assert obj.value == [0, 1, 1, 0]
+
+        obj.set_long(0b101, 10)
+        assert obj.value == [0] * 7 + [1, 0, 1]
+
+        with self.assertRaises(ValueError):
+            obj.set_long(1 << 10)
+        with self.assertRaises(ValueError):
+            obj.set_long(-1)
@@ -11,13 +11,23 @@ import unittest
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
 
 from bacpypes.errors import InvalidTag
-from bacpypes.primitivedata import ObjectIdentifier, Tag
+from bacpypes.primitivedata import ObjectIdentifier, ObjectType, Tag
 
 # some debugging
 _debug = 0
 _log = ModuleLogger(globals())
 
 
+class MyObjectType(ObjectType):
+    enumerations = {
+        'myAnalogInput': 128,
+        }
+
+
+class MyObjectIdentifier(ObjectIdentifier):
+    objectTypeClass = MyObjectType
+
+
 @bacpypes_debugging
 def object_identifier_tag(x):
     """Convert a hex string to an object_identifier application tag."""
@@ -137,4 +147,23 @@ class TestObjectIdentifier(unittest.TestCase):
         # test standard types
         object_identifier_endec(('analogInput', 0), '00000000')
 
-        # test vendor types
\ No newline at end of file
+        # test vendor types
+
+    def test_object_identifier_vendor_type(self):
+        if _debug: TestObjectIdentifier._debug("test_object_identifier_vendor_type")
+
+        # the tables of the vendor class are built when they are needed
+        obj = MyObjectIdentifier(('myAnalogInput', 1))
+        assert obj.get_tuple() == (128, 1)
+        assert obj.get_long() == 0x20000001
+
+        obj = MyObjectIdentifier(0x20000002)
+        assert obj.value == ('myAnalogInput', 2)
+
+        obj = MyObjectIdentifier(0x20400003)
+        assert obj.value == (129, 3)
+
+        # the standard class does not know the vendor name
+        with self.assertRaises(ValueError):
+            ObjectIdentifier(('myAnalogInput', 1))
+        assert ObjectIdentifier(0x20000002).value == (128, 2)
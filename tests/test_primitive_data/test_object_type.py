@@ -11,7 +11,8 @@ import unittest
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
 
 from bacpypes.errors import InvalidTag
-from bacpypes.primitivedata import ObjectType, Tag, expand_enumerations
+from bacpypes.primitivedata import ObjectType, Tag, expand_enumerations, \
+    enumeration_tables
 
 # some debugging
 _debug = 0
@@ -174,4 +175,46 @@ class TestObjectType(unittest.TestCase):
         object_type_endec('analogOutput', '01')
 
         object_type_endec(127, '7f')
-        object_type_endec(128, '80')
\ No newline at end of file
+        object_type_endec(128, '80')
+
+    def test_object_type_tables(self):
+        if _debug: TestObjectType._debug("test_object_type_tables")
+
+        values, names = enumeration_tables(MyObjectType)
+        assert values['analogValue'] == 2
+        assert values['myAnalogValue'] == 130
+        assert names[130] == 'myAnalogValue'
+
+        # vendor values without a name are in neither one
+        assert 131 not in names
+
+        # the parent class does not have the extensions
+        values, names = enumeration_tables(ObjectType)
+        assert 'myAnalogValue' not in values
+        assert 130 not in names
+
+        keys = MyObjectType().keylist()
+        assert keys[0] == 'analogInput'
+        assert keys[127] is None
+        assert keys[130] == 'myAnalogValue'
+
+    def test_object_type_octets(self):
+        if _debug: TestObjectType._debug("test_object_type_octets")
+
+        assert MyObjectType.encode_octets('analogOutput') == xtob('01')
+        assert MyObjectType.encode_octets('myAnalogInput') == xtob('80')
+        assert MyObjectType.encode_octets(131) == xtob('83')
+        assert MyObjectType.encode_octets(ObjectType('loop')) == xtob('0c')
+
+        with self.assertRaises(ValueError):
+            MyObjectType.encode_octets('snork')
+        with self.assertRaises(ValueError):
+            MyObjectType.encode_octets(-1)
+        with self.assertRaises(TypeError):
+            MyObjectType.encode_octets(1.0)
+
+        assert MyObjectType.decode_octets(xtob('0c')) == 'loop'
+        assert MyObjectType.decode_octets(xtob('81')) == 'myAnalogOutput'
+        assert MyObjectType.decode_octets(xtob('83')) == 131
+        with self.assertRaises(InvalidTag):
+            MyObjectType.decode_octets(xtob(''))
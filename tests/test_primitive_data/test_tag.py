@@ -265,6 +265,34 @@ class TestTag(unittest.TestCase):
         with self.assertRaises(TypeError):
             tag = Tag(0, 1, 2, 3)
 
+    def test_tag_header(self):
+        if _debug: TestTag._debug("test_tag_header")
+
+        def encoded(*args):
+            data = PDUData()
+            Tag(*args).encode(data)
+            return btox(data.pduData)
+
+        # one octet headers
+        assert encoded(0, 2, 1, xtob('01')) == '2101'
+        assert encoded(1, 3, 2, xtob('0102')) == '3a0102'
+        assert encoded(2, 4) == '4e'
+        assert encoded(3, 4) == '4f'
+
+        # extended tag numbers
+        assert encoded(1, 15, 1, xtob('01')) == 'f90f01'
+        assert encoded(1, 254, 1, xtob('01')) == 'f9fe01'
+        assert encoded(2, 20) == 'fe14'
+
+        # extended lengths, the same twice because the header is kept
+        for i in range(2):
+            assert encoded(0, 6, 5, xtob('0102030405')) == '65050102030405'
+            assert encoded(1, 0, 253, b'\0' * 253) == '0dfd' + '00' * 253
+
+        # long lengths
+        assert encoded(0, 6, 254, b'\0' * 254) == '65fe00fe' + '00' * 254
+        assert encoded(0, 6, 65536, b'\0' * 65536) == '65ff00010000' + '00' * 65536
+
 @bacpypes_debugging
 class TestApplicationTag(unittest.TestCase):
 
@@ -496,6 +524,30 @@ class TestTagList(unittest.TestCase):
         taglist.push(tag1)
         assert taglist.tagList == [tag1]
 
+    def test_tell_seek(self):
+        if _debug: TestTagList._debug("test_tell_seek")
+
+        tag0 = IntegerTag(0)
+        tag1 = IntegerTag(1)
+        tag2 = IntegerTag(2)
+        taglist = TagList([tag0, tag1, tag2])
+
+        # pop one off and save the position
+        assert taglist.Pop() == tag0
+        position = taglist.tell()
+        assert len(taglist) == 2
+
+        # pop the rest, then go back
+        assert taglist.Pop() == tag1
+        assert taglist.Pop() == tag2
+        assert taglist.Pop() is None
+        assert len(taglist) == 0
+
+        taglist.seek(position)
+        assert len(taglist) == 2
+        assert taglist.Peek() == tag1
+        assert taglist.tagList == [tag1, tag2]
+
     def test_get_context(self):
         """Test extracting specific context encoded content.
         """
@@ -138,4 +138,5 @@ class TestUnsigned(unittest.TestCase):
         unsigned_endec(8388608, '800000')
 
         unsigned_endec(2147483647, '7fffffff')
+        unsigned_endec(4294967295, 'ffffffff')
         unsigned_endec(2147483648, '80000000')
\ No newline at end of file
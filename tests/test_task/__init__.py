@@ -0,0 +1,9 @@
+#!/usr/bin/python
+
+"""
+Test Tasks
+----------
+"""
+
+from . import test_task_manager
+from . import test_timing_wheel
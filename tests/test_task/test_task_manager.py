@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Task Manager
+-----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.task import OneShotTask
+
+from ..time_machine import TimeMachine, reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# reference to time machine
+time_machine = None
+
+
+@bacpypes_debugging
+def setup_module(module):
+    if _debug: setup_module._debug("setup_module %r", module)
+    global time_machine
+
+    # this is a singleton
+    time_machine = TimeMachine()
+
+
+@bacpypes_debugging
+def teardown_module():
+    if _debug: teardown_module._debug("teardown_module")
+    global time_machine
+
+    # all done
+    time_machine = None
+
+
+@bacpypes_debugging
+class SampleOneShotTask(OneShotTask):
+
+    def __init__(self):
+        if _debug: SampleOneShotTask._debug("__init__")
+        OneShotTask.__init__(self)
+
+        self.process_task_times = []
+
+    def process_task(self):
+        if _debug: SampleOneShotTask._debug("process_task @ %r", time_machine.current_time)
+        self.process_task_times.append(time_machine.current_time)
+
+
+@bacpypes_debugging
+class TestTaskManager(unittest.TestCase):
+
+    def test_reschedule(self):
+        if _debug: TestTaskManager._debug("test_reschedule")
+
+        # create a task
+        ft = SampleOneShotTask()
+
+        # reset the time machine, install the task then move it
+        reset_time_machine()
+        ft.install_task(1.0)
+        ft.install_task(2.0)
+        ft.install_task(0.5)
+        run_time_machine(60.0)
+
+        # called once at the last time it was given
+        assert ft.process_task_times == [0.5]
+        assert not ft.isScheduled
+
+    def test_suspend(self):
+        if _debug: TestTaskManager._debug("test_suspend")
+
+        # create some tasks
+        ft1 = SampleOneShotTask()
+        ft2 = SampleOneShotTask()
+
+        # reset the time machine, install the tasks, suspend one
+        reset_time_machine()
+        ft1.install_task(1.0)
+        ft2.install_task(2.0)
+        ft1.suspend_task()
+        assert not ft1.isScheduled
+
+        # suspending it again is harmless
+        ft1.suspend_task()
+        run_time_machine(60.0)
+
+        # only the second one called
+        assert ft1.process_task_times == []
+        assert ft2.process_task_times == [2.0]
+
+    def test_resume(self):
+        if _debug: TestTaskManager._debug("test_resume")
+
+        # create a task
+        ft = SampleOneShotTask()
+
+        # reset the time machine, install the task, suspend and resume it
+        reset_time_machine()
+        ft.install_task(3.0)
+        ft.suspend_task()
+        ft.resume_task()
+        run_time_machine(60.0)
+
+        # called once
+        assert ft.process_task_times == [3.0]
+
+    def test_compaction(self):
+        if _debug: TestTaskManager._debug("test_compaction")
+
+        # lots of tasks
+        tasks = [SampleOneShotTask() for i in range(500)]
+
+        # reset the time machine, install the tasks and reschedule them
+        reset_time_machine()
+        for i, ft in enumerate(tasks):
+            ft.install_task(float(i + 1))
+        for i, ft in enumerate(tasks):
+            ft.install_task(float(i + 1) / 2.0)
+
+        # the heap has been compacted along the way
+        assert len(time_machine.tasks) < 1000
+
+        # suspend the odd ones
+        for ft in tasks[1::2]:
+            ft.suspend_task()
+
+        run_time_machine(1000.0)
+
+        # even ones run once at the new time, odd ones not at all
+        for i, ft in enumerate(tasks):
+            if i % 2:
+                assert ft.process_task_times == []
+            else:
+                assert ft.process_task_times == [float(i + 1) / 2.0]
+
+        # nothing left behind
+        assert time_machine.peek_task() == (None, None)
+        assert time_machine.tombstones == 0
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Timing Wheel
+-----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import task as task_module
+from bacpypes.task import OneShotTask, TaskManager, TimingWheel, \
+    TimingWheelTaskManager
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+def wheel_task(when):
+    """Return a task that is not installed but has a time."""
+    if _debug: wheel_task._debug("wheel_task %r", when)
+
+    task = OneShotTask(when)
+    return task
+
+
+@bacpypes_debugging
+class TestTimingWheel(unittest.TestCase):
+
+    def test_not_accepted(self):
+        if _debug: TestTimingWheel._debug("test_not_accepted")
+
+        wheel = TimingWheel(1000.0)
+
+        # less than a tick away and farther than an hour are left out
+        assert wheel.add(wheel_task(1000.001), 1000.0) is None
+        assert wheel.add(wheel_task(999.0), 1000.0) is None
+        assert wheel.add(wheel_task(1000.0 + 3600.0), 1000.0) is None
+        assert len(wheel) == 0
+        assert wheel.next_time() is None
+
+    def test_cascade(self):
+        if _debug: TestTimingWheel._debug("test_cascade")
+
+        wheel = TimingWheel(1000.0)
+
+        # goes in the second wheel
+        task = wheel_task(1005.5)
+        when = wheel.add(task, 1000.0)
+        self.assertAlmostEqual(when, 1005.0)
+        self.assertAlmostEqual(wheel.next_time(), 1005.0)
+        assert len(wheel) == 1
+
+        # nothing due yet
+        assert wheel.advance(1004.0) == []
+
+        # moved down to the first wheel
+        assert wheel.advance(1005.01) == []
+        self.assertAlmostEqual(wheel.next_time(), 1005.5)
+        assert len(wheel) == 1
+
+        # now it is due
+        assert wheel.advance(1005.51) == [task]
+        assert task._wheelEntry is None
+        assert len(wheel) == 0
+        assert wheel.next_time() is None
+
+    def test_minutes(self):
+        if _debug: TestTimingWheel._debug("test_minutes")
+
+        wheel = TimingWheel(0.0)
+
+        # goes in the third wheel
+        task = wheel_task(600.25)
+        self.assertAlmostEqual(wheel.add(task, 0.0), 600.0)
+
+        # skipping far ahead moves it all the way down and out
+        assert wheel.advance(601.0) == [task]
+        assert len(wheel) == 0
+
+    def test_next_time(self):
+        if _debug: TestTimingWheel._debug("test_next_time")
+
+        wheel = TimingWheel(0.0)
+
+        # the earliest is kept as tasks are added
+        later = wheel_task(30.5)
+        sooner = wheel_task(5.5)
+        wheel.add(later, 0.0)
+        wheel.add(sooner, 0.0)
+        assert wheel.earliestValid
+        self.assertAlmostEqual(wheel.next_time(), 5.0)
+
+        # and found again when its slot is emptied
+        wheel.discard(sooner)
+        assert not wheel.earliestValid
+        self.assertAlmostEqual(wheel.next_time(), 30.0)
+        assert wheel.earliestValid
+
+    def test_discard(self):
+        if _debug: TestTimingWheel._debug("test_discard")
+
+        wheel = TimingWheel(0.0)
+
+        # add a few and take one out
+        tasks = [wheel_task(float(i)) for i in range(1, 11)]
+        for task in tasks:
+            wheel.add(task, 0.0)
+        wheel.discard(tasks[4])
+        assert len(wheel) == 9
+
+        # the rest come due
+        due = wheel.advance(20.0)
+        assert len(due) == 9
+        assert tasks[4] not in due
+
+
+# @bacpypes_debugging - implicit via metaclass
+class ClockedTaskManager(TimingWheelTaskManager):
+
+    """A timing wheel task manager with a clock that the test moves."""
+
+    now = 1000.0
+
+    def get_time(self):
+        return self.now
+
+
+class RecordingTrigger:
+
+    """Counts the times the loop would have been woken up."""
+
+    def __init__(self):
+        self.count = 0
+
+    def set(self):
+        self.count += 1
+
+
+@bacpypes_debugging
+class TestTimingWheelTaskManager(unittest.TestCase):
+
+    # task managers are singletons, each class in the chain keeps one
+    singleton_classes = (TaskManager, TimingWheelTaskManager, ClockedTaskManager)
+
+    def setUp(self):
+        # start with a new one and keep the current task manager, the time
+        # machine, for the other tests
+        self.task_manager = task_module._task_manager
+        self.instances = [klass._singleton_instance for klass in self.singleton_classes]
+        for klass in self.singleton_classes:
+            klass._singleton_instance = None
+        ClockedTaskManager.now = 1000.0
+
+        self.manager = ClockedTaskManager()
+        if self.manager.trigger:
+            self.manager.trigger.handle_close()
+        self.manager.trigger = RecordingTrigger()
+
+    def tearDown(self):
+        task_module._task_manager = self.task_manager
+        for klass, instance in zip(self.singleton_classes, self.instances):
+            klass._singleton_instance = instance
+
+    def install(self, task, when):
+        task.taskTime = when
+        self.manager.install_task(task)
+
+    def run_until(self, limit):
+        """Call get_next_task() like the core does, moving the clock along
+        to the time it asks for, and return the tasks and when they ran."""
+        manager = self.manager
+        processed = []
+
+        while True:
+            task, delta = manager.get_next_task()
+            if task:
+                processed.append((task, manager.now))
+                continue
+
+            if (delta is None) or (manager.now + delta > limit):
+                manager.now = limit
+                return processed
+            manager.now += delta
+
+    def test_slots(self):
+        if _debug: TestTimingWheelTaskManager._debug("test_slots")
+
+        tasks = [wheel_task(None) for i in range(4)]
+
+        # one in the heap and one in each of the wheels
+        for task, delta in zip(tasks, (0.005, 0.5, 5.5, 120.25)):
+            self.install(task, 1000.0 + delta)
+        assert tasks[0]._taskEntry and not tasks[0]._wheelEntry
+        for task in tasks[1:]:
+            assert task._wheelEntry and not task._taskEntry
+            assert task.isScheduled
+        assert len(self.manager.wheel) == 3
+
+        # each one runs on time
+        processed = self.run_until(2000.0)
+        assert [task for task, when in processed] == tasks
+        for task, when in processed:
+            self.assertAlmostEqual(when, task.taskTime)
+            assert not task.isScheduled
+        assert len(self.manager.wheel) == 0
+        assert self.manager.get_next_task() == (None, None)
+
+    def test_reschedule(self):
+        if _debug: TestTimingWheelTaskManager._debug("test_reschedule")
+
+        first, second, third = [wheel_task(None) for i in range(3)]
+        self.install(first, 1000.5)
+        self.install(second, 1005.5)
+        self.install(third, 1130.0)
+
+        # move the first one farther out, into a coarser wheel
+        self.install(first, 1070.0)
+        assert first._wheelEntry[0] is self.manager.wheel.levels[2]
+
+        # move the third one in so close it goes into the heap
+        self.install(third, 1000.005)
+        assert third._taskEntry and not third._wheelEntry
+        assert len(self.manager.wheel) == 2
+
+        processed = self.run_until(2000.0)
+        assert [task for task, when in processed] == [third, second, first]
+        self.assertAlmostEqual(processed[2][1], 1070.0)
+
+    def test_suspend(self):
+        if _debug: TestTimingWheelTaskManager._debug("test_suspend")
+
+        first, second = wheel_task(None), wheel_task(None)
+        self.install(first, 1002.5)
+        self.install(second, 1062.505)
+
+        # part way along, the first moved down to the finest wheel
+        assert self.run_until(1002.3) == []
+        assert first._wheelEntry[0] is self.manager.wheel.levels[0]
+
+        # suspending from a slot and then from the heap
+        self.manager.suspend_task(first)
+        assert not first.isScheduled
+        assert self.run_until(1062.502) == []
+        assert second._taskEntry
+        self.manager.suspend_task(second)
+        assert not second.isScheduled
+
+        assert self.run_until(2000.0) == []
+        assert len(self.manager.wheel) == 0
+
+    def test_trigger(self):
+        if _debug: TestTimingWheelTaskManager._debug("test_trigger")
+
+        trigger = self.manager.trigger
+
+        # the loop is going to wake up for this one
+        self.install(wheel_task(None), 1010.5)
+        assert self.manager.get_next_task() == (None, 10.0)
+        trigger.count = 0
+
+        # no need to wake it up for a later task, but for a sooner one
+        self.install(wheel_task(None), 1020.5)
+        assert trigger.count == 0
+        self.install(wheel_task(None), 1005.5)
+        assert trigger.count == 1
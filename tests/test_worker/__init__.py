@@ -0,0 +1,8 @@
+#!/usr/bin/python
+
+"""
+Test Worker
+-----------
+"""
+
+from . import test_worker_pool
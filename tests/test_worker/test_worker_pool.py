@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Worker Pool
+----------------
+"""
+
+import unittest
+
+from time import time
+
+from threading import Event, current_thread
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.core import run_once
+from bacpypes.worker import WorkerPool, blocking
+from bacpypes.errors import OutOfResources
+
+from bacpypes.app import LocalDeviceObject, Application
+from bacpypes.object import Property
+from bacpypes.primitivedata import Real
+from bacpypes.apdu import ReadPropertyRequest, ReadPropertyACK
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def run_until(fn, timeout=5.0):
+    """Run the core until the function returns true."""
+    deadline = time() + timeout
+    while not fn():
+        if time() > deadline:
+            raise RuntimeError("timeout")
+        run_once()
+
+
+def wait_for(future):
+    """Wait for the function to finish then let the core call the
+    callback."""
+    future.result(timeout=5.0)
+    run_until(lambda: future._done_in_core)
+
+
+@bacpypes_debugging
+class TestWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(maxWorkers=2, maxPending=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def submit(self, fn, *args):
+        results = []
+        def callback(future):
+            future._done_in_core = True
+            results.append((current_thread(), future.result()))
+
+        future = self.pool.submit(callback, fn, *args)
+        if future:
+            future._done_in_core = False
+        return future, results
+
+    def test_submit(self):
+        if _debug: TestWorkerPool._debug("test_submit")
+
+        future, results = self.submit(lambda x: (current_thread(), x + 1), 1)
+        wait_for(future)
+
+        # called in a worker thread, the callback in this one
+        (callback_thread, (worker_thread, value)), = results
+        assert value == 2
+        assert callback_thread is current_thread()
+        assert worker_thread is not current_thread()
+
+        stats = self.pool.stats()
+        assert stats['submitted'] == 1
+        assert stats['completed'] == 1
+        assert stats['pending'] == 0
+        assert stats['run']['count'] == 1
+
+    def test_saturated(self):
+        if _debug: TestWorkerPool._debug("test_saturated")
+
+        release = Event()
+
+        # fill it up
+        futures = [self.submit(release.wait)[0] for i in range(2)]
+        assert all(futures)
+
+        # no room for another
+        assert self.submit(release.wait)[0] is None
+
+        release.set()
+        for future in futures:
+            wait_for(future)
+
+        stats = self.pool.stats(reset=True)
+        assert stats['rejected'] == 1
+        assert stats['highWater'] == 2
+        assert self.pool.stats()['rejected'] == 0
+
+
+@bacpypes_debugging
+class HistorianProperty(Property):
+
+    """A property that is slow to read."""
+
+    def __init__(self, identifier):
+        Property.__init__(self, identifier, Real, default=None, optional=True, mutable=False)
+
+    @blocking
+    def ReadProperty(self, obj, arrayIndex=None):
+        if _debug: HistorianProperty._debug("ReadProperty %r", current_thread())
+        self.thread = current_thread()
+        return 75.0
+
+
+@bacpypes_debugging
+class TestApplication(unittest.TestCase):
+
+    def setUp(self):
+        self.device = LocalDeviceObject(
+            objectName='test', objectIdentifier=('device', 999),
+            vendorIdentifier=999,
+            )
+        self.app = Application(self.device, '1.2.3.4')
+        self.app.workerPool = WorkerPool(maxWorkers=1, maxPending=1)
+
+        # a property that reads slowly
+        self.prop = HistorianProperty('presentValue')
+        self.device._properties = dict(self.device._properties, presentValue=self.prop)
+
+        # catch the responses
+        self.responses = []
+        self.app.elementService = self
+
+    def tearDown(self):
+        self.app.workerPool.shutdown()
+
+    def sap_confirmation(self, apdu):
+        self.responses.append((current_thread(), apdu))
+
+    def read_request(self, propertyIdentifier):
+        apdu = ReadPropertyRequest(
+            objectIdentifier=('device', 999),
+            propertyIdentifier=propertyIdentifier,
+            )
+        apdu.pduSource = ('1.2.3.5', 47808)
+        apdu.apduInvokeID = 1
+        return apdu
+
+    def test_inline(self):
+        if _debug: TestApplication._debug("test_inline")
+
+        # not blocking, answered right away
+        self.app.indication(self.read_request('objectName'))
+
+        (thread, resp), = self.responses
+        assert isinstance(resp, ReadPropertyACK)
+        assert self.app.workerPool.submitted == 0
+
+    def test_blocking(self):
+        if _debug: TestApplication._debug("test_blocking")
+
+        self.app.indication(self.read_request('presentValue'))
+        assert self.responses == []
+        assert self.app.workerPool.submitted == 1
+
+        # wait for the response to come back to this thread
+        run_until(lambda: self.responses)
+
+        (thread, resp), = self.responses
+        assert isinstance(resp, ReadPropertyACK)
+        assert thread is current_thread()
+        assert self.prop.thread is not current_thread()
+
+    def test_saturated(self):
+        if _debug: TestApplication._debug("test_saturated")
+
+        self.app.workerPool.pending = 1
+        with self.assertRaises(OutOfResources):
+            self.app.indication(self.read_request('presentValue'))
+        self.app.workerPool.pending = 0
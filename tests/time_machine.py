@@ -5,8 +5,6 @@ Testing Time Machine
 --------------------
 """
 
-from heapq import heappop
-
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger
 
 from bacpypes.core import run_once
@@ -75,12 +73,12 @@ class TimeMachine(_TaskManager):
         if (self.time_limit is not None) and (self.current_time >= self.time_limit):
             if _debug: TimeMachine._debug("    - time limit reached")
 
-        elif not self.tasks:
+        elif self.peek_task()[1] is None:
             if _debug: TimeMachine._debug("    - no more tasks")
 
         else:
             # peek at the next task and see when it is supposed to run
-            when, _ = self.tasks[0]
+            when, _ = self.peek_task()
             if when >= self.time_limit:
                 if _debug: TimeMachine._debug("    - time limit reached")
 
@@ -88,13 +86,10 @@ class TimeMachine(_TaskManager):
                 self.current_time = self.time_limit
 
             else:
-                # pull it off the list
-                when, task = heappop(self.tasks)
+                # pull it off the list, it is no longer scheduled
+                when, task = self.pop_task()
                 if _debug: TimeMachine._debug("    - when, task: %r, %s", when, task)
 
-                # mark that it is no longer scheduled
-                task.isScheduled = False
-
                 # advance the time
                 self.current_time = when
 